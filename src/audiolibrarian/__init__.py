@@ -16,6 +16,14 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
-import importlib.metadata
 
-__version__ = importlib.metadata.version("audiolibrarian")
+
+def __getattr__(name: str) -> str:
+    # Look up the version only when it's asked for; importlib.metadata is slow to import.
+    if name == "__version__":
+        import importlib.metadata  # noqa: PLC0415
+
+        globals()[name] = version = importlib.metadata.version("audiolibrarian")
+        return version
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -16,7 +16,12 @@
 #  If not, see <https://www.gnu.org/licenses/>.
 #
 
-from audiolibrarian.audiofile.audiofile import AudioFile
+from audiolibrarian.audiofile.audiofile import (
+    DEFAULT_PADDING,
+    AudioFile,
+    ReleaseTags,
+    padding_callback,
+)
 from audiolibrarian.audiofile.tags import Tags
 
-__all__ = ["AudioFile", "Tags"]
+__all__ = ["DEFAULT_PADDING", "AudioFile", "ReleaseTags", "Tags", "padding_callback"]
@@ -19,21 +19,118 @@
 import abc
 import importlib
 import pathlib
-from typing import Any, ClassVar
+import threading
+from collections.abc import Callable, Collection
+from typing import Any, ClassVar, Final
 
 import mutagen
 
 from audiolibrarian import records
 
+# The fields that may be read with `AudioFile.read_fields`; named for the record attributes they
+# correspond to.
+FIELDS: Final[frozenset[str]] = frozenset(
+    {
+        "album",  # str
+        "album_artists",  # list[str]
+        "album_artists_sort",  # list[str]
+        "artist",  # str
+        "artists",  # list[str]
+        "bitrate",  # int (kbps)
+        "genres",  # list[str]
+        "medium_count",  # int
+        "medium_number",  # int
+        "musicbrainz_album_artist_ids",  # list[str]
+        "musicbrainz_album_id",  # str
+        "musicbrainz_artist_ids",  # list[str]
+        "musicbrainz_release_group_id",  # str
+        "musicbrainz_track_id",  # str
+        "original_year",  # str
+        "title",  # str
+        "track_count",  # int
+        "track_number",  # int
+    }
+)
+# The fields that may be written with `AudioFile.write_fields`.
+WRITABLE_FIELDS: Final[frozenset[str]] = frozenset({"genres"})  # list[str]
+DEFAULT_PADDING: Final[int] = 8192  # Bytes left after the tags, for them to grow into.
+
+
+def padding_callback(padding: int) -> Callable[[mutagen.PaddingInfo], int]:
+    """Return a mutagen padding callback that updates the tags in place whenever they fit.
+
+    When the new tags fit in the space taken by the old ones and their padding, whatever is left
+    is kept as padding, so the audio doesn't move and only the tags are written. Otherwise, the
+    file is rewritten with the given number of bytes of padding, so the tags fit next time.
+    """
+
+    def get_padding(info: mutagen.PaddingInfo) -> int:
+        return info.padding if info.padding >= 0 else padding
+
+    return get_padding
+
+
+class ReleaseTags:
+    """The tags shared by all the files of one medium of a release, prepared once per format.
+
+    Each format prepares its share of the tags (including the front cover) from the release
+    the first time it's asked for them, and reuses them for every file after that. Pass the same
+    ReleaseTags to `AudioFile.write_tags` for all the medium's files; only the per-track tags are
+    then made for each file. The release must not be changed while it's in use.
+
+    ReleaseTags may be shared by threads.
+    """
+
+    def __init__(self, release: records.Release, medium_number: int | None) -> None:
+        """Initialize a ReleaseTags object.
+
+        Args:
+            release: The release
+            medium_number: The number of the release's medium
+        """
+        self._release = release
+        self._medium_number = medium_number
+        self._lock = threading.Lock()
+        self._prepared: dict[str, Any] = {}
+
+    @property
+    def medium_number(self) -> int | None:
+        """Return the number of the release's medium."""
+        return self._medium_number
+
+    @property
+    def release(self) -> records.Release:
+        """Return the release."""
+        return self._release
+
+    def get[T](self, key: str, prepare: Callable[[records.Release, int | None], T]) -> T:
+        """Return the tags prepared for the given key (e.g. a format), preparing them if needed.
+
+        Args:
+            key: The key for the prepared tags
+            prepare: Called with the release and medium number to prepare the tags
+        """
+        with self._lock:
+            if key not in self._prepared:
+                self._prepared[key] = prepare(self._release, self._medium_number)
+            return self._prepared[key]  # type: ignore[no-any-return]
+
 
 class AudioFile(abc.ABC):
     """Abstract base class for AudioFile classes."""
 
     _subclass_by_extension: ClassVar[dict[str, type["AudioFile"]]] = {}
 
-    def __init__(self, filepath: pathlib.Path) -> None:
-        """Initialize an AudioFile."""
+    def __init__(self, filepath: pathlib.Path, *, padding: int = DEFAULT_PADDING) -> None:
+        """Initialize an AudioFile.
+
+        Args:
+            filepath: The path of the audio file
+            padding: Bytes of padding to leave after the tags, when the file must be rewritten
+                to make room for them (see `padding_callback`)
+        """
         self._filepath = filepath
+        self._padding = padding_callback(padding)
         self._mut_file = mutagen.File(self.filepath.absolute())
         self._one_track = self.read_tags()
 
@@ -50,14 +147,17 @@ class AudioFile(abc.ABC):
     @classmethod
     def extensions(cls) -> set[str]:
         """Return the list of supported extensions."""
+        AudioFile._load_subclasses()
         return set(cls._subclass_by_extension.keys())
 
     @classmethod
-    def open(cls, filename: str | pathlib.Path) -> "AudioFile":
+    def open(cls, filename: str | pathlib.Path, *, padding: int = DEFAULT_PADDING) -> "AudioFile":
         """Return an AudioFile object based on the filename extension (factory method).
 
         Args:
             filename: The filename of a supported audio file.
+            padding: Bytes of padding to leave after the tags, when the file must be rewritten
+                to make room for them.
 
         Returns:
             audiofile.AudioFile: An AudioFile object.
@@ -66,20 +166,85 @@ class AudioFile(abc.ABC):
             FileNotFoundError: If the file cannot be found or is not a file.
             NotImplementedError: If the type of the file is not supported.
         """
-        if not AudioFile._subclass_by_extension:
-            # Dynamically load submodules.
-            for module_path in (pathlib.Path(__file__).parent / "formats").glob("*.py"):
-                if module_path.name == "__init__.py":
-                    continue
-                importlib.import_module(f"audiolibrarian.audiofile.formats.{module_path.stem}")
+        filepath, subclass = AudioFile._get_subclass(filename)
+        return subclass(filepath=filepath, padding=padding)
+
+    @classmethod
+    def read_fields(cls, filename: str | pathlib.Path, fields: Collection[str]) -> dict[str, Any]:
+        """Return the wanted fields of an audio file's tags, without reading the whole file.
+
+        This is much cheaper than opening an AudioFile, when only a few fields are needed;
+        embedded pictures are skipped, and no records are created.
+
+        Args:
+            filename: The filename of a supported audio file.
+            fields: The wanted fields (see `FIELDS`).
 
+        Returns:
+            A dictionary of the wanted fields that the file has (missing fields are left out).
+
+        Raises:
+            FileNotFoundError: If the file cannot be found or is not a file.
+            NotImplementedError: If the type of the file is not supported.
+            ValueError: If any of the fields are unknown.
+        """
+        if unknown := set(fields) - FIELDS:
+            msg = f"Unknown field(s): {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        filepath, subclass = AudioFile._get_subclass(filename)
+        values = subclass._read_fields(filepath, frozenset(fields))  # noqa: SLF001
+        return {k: v for k, v in values.items() if k in fields and v not in (None, [], "")}
+
+    @classmethod
+    def write_fields(
+        cls,
+        filename: str | pathlib.Path,
+        fields: dict[str, Any],
+        *,
+        padding: int = DEFAULT_PADDING,
+    ) -> None:
+        """Write the given fields to an audio file's tags, leaving its other tags as they are.
+
+        This is much cheaper than opening an AudioFile and writing all of its tags; the tags are
+        updated in place if they fit (see `padding_callback`).
+
+        Args:
+            filename: The filename of a supported audio file.
+            fields: The fields to write (see `WRITABLE_FIELDS`); empty values remove the tags.
+            padding: Bytes of padding to leave after the tags, when the file must be rewritten
+                to make room for them.
+
+        Raises:
+            FileNotFoundError: If the file cannot be found or is not a file.
+            NotImplementedError: If the type of the file is not supported.
+            ValueError: If any of the fields are unknown (or not writable).
+        """
+        if unknown := set(fields) - WRITABLE_FIELDS:
+            msg = f"Unknown field(s): {', '.join(sorted(unknown))}"
+            raise ValueError(msg)
+        filepath, subclass = AudioFile._get_subclass(filename)
+        subclass._write_fields(filepath, fields, padding_callback(padding))  # noqa: SLF001
+
+    @staticmethod
+    def _get_subclass(filename: str | pathlib.Path) -> tuple[pathlib.Path, type["AudioFile"]]:
+        # Return the resolved path of a file, and the subclass that supports it.
+        AudioFile._load_subclasses()
         filepath = pathlib.Path(filename).resolve()
         if not filepath.is_file():
             raise FileNotFoundError(filepath)
         if filepath.suffix not in AudioFile._subclass_by_extension:
             msg = f"Unknown file type: {filepath}"
             raise NotImplementedError(msg)
-        return AudioFile._subclass_by_extension[filepath.suffix](filepath=filepath)
+        return filepath, AudioFile._subclass_by_extension[filepath.suffix]
+
+    @staticmethod
+    def _load_subclasses() -> None:
+        # Dynamically load the format submodules, which register their extensions.
+        if not AudioFile._subclass_by_extension:
+            for module_path in (pathlib.Path(__file__).parent / "formats").glob("*.py"):
+                if module_path.name == "__init__.py":
+                    continue
+                importlib.import_module(f"audiolibrarian.audiofile.formats.{module_path.stem}")
 
     @property
     def filepath(self) -> pathlib.Path:
@@ -101,8 +266,41 @@ class AudioFile(abc.ABC):
         """Read the tags from the audio file and return a populated OneTrack record."""
 
     @abc.abstractmethod
-    def write_tags(self) -> None:
-        """Write the tags to the audio file."""
+    def write_tags(self, release_tags: ReleaseTags | None = None) -> None:
+        """Write the tags to the audio file.
+
+        Args:
+            release_tags: The tags shared with the other files of the medium; they must be for
+                the release and medium of `one_track`. If not given, they're prepared for this
+                file alone.
+        """
+
+    @classmethod
+    @abc.abstractmethod
+    def _read_fields(cls, filepath: pathlib.Path, fields: frozenset[str]) -> dict[str, Any]:
+        """Return the fields of the file's tags; at least the wanted ones.
+
+        Fields may be None (or empty) if the file doesn't have them; other fields may be
+        included, if they're no more expensive to read.
+        """
+
+    @classmethod
+    @abc.abstractmethod
+    def _write_fields(
+        cls,
+        filepath: pathlib.Path,
+        fields: dict[str, Any],
+        padding: Callable[[mutagen.PaddingInfo], int],
+    ) -> None:
+        """Write the given fields to the file's tags, saving them with the padding callback."""
+
+    def _get_release_tags(self, release_tags: ReleaseTags | None) -> ReleaseTags:
+        # Return the given release tags, or new ones for this file's release and medium.
+        if release_tags is not None:
+            return release_tags
+        return ReleaseTags(
+            self.one_track.release or records.Release(), self.one_track.medium_number
+        )
 
     def _get_tag_sources(self) -> tuple[records.Release, int, records.Medium, int, records.Track]:
         # Return the objects and information required to generate tags.
@@ -16,13 +16,20 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import os
+import pathlib
 import re
-from typing import Any
+from collections.abc import Callable
+from typing import Any, Final, no_type_check
 
 import mutagen.flac
+import mutagen.id3
 
 from audiolibrarian import audiofile, records
 
+# The Vorbis comment for each of `audiofile.WRITABLE_FIELDS`.
+_FIELD_KEYS: Final[dict[str, str]] = {"genres": "genre"}
+
 
 class FlacFile(audiofile.AudioFile, extensions={".flac"}):
     """AudioFile for Flac files."""
@@ -124,68 +131,182 @@ class FlacFile(audiofile.AudioFile, extensions={".flac"}):
             release=release, medium_number=medium_number, track_number=track_number
         )
 
-    def write_tags(self) -> None:
+    def write_tags(self, release_tags: audiofile.ReleaseTags | None = None) -> None:
         """Write the tags."""
-        release, medium_number, medium, track_number, track = self._get_tag_sources()
-        tags_ = {
-            "album": [release.album],
-            "albumartist": release.album_artists,
-            "albumartistsort": release.album_artists_sort,
-            "arranger": release.people and release.people.arrangers,
-            "artist": [track.artist],
-            "artists": track.artists,
-            "artistsort": track.artists_sort,
-            "asin": release.asins,
-            "barcode": release.barcodes,
-            "catalognumber": release.catalog_numbers,
-            "composer": release.people and release.people.composers,
-            "conductor": release.people and release.people.conductors,
-            "date": [release.date],
-            "discnumber": [str(medium_number)],
-            "discsubtitle": medium.titles,
-            "disctotal": [str(release.medium_count)],
-            "engineer": release.people and release.people.engineers,
-            "genre": release.genres,
-            "isrc": track.isrcs,
-            "label": release.labels,
-            "lyricist": release.people and release.people.lyricists,
-            "media": medium.formats,
-            "mixer": release.people and release.people.mixers,
-            "musicbrainz_albumartistid": release.musicbrainz_album_artist_ids,
-            "musicbrainz_albumid": [release.musicbrainz_album_id],
-            "musicbrainz_artistid": track.musicbrainz_artist_ids,
-            "musicbrainz_releasegroupid": [release.musicbrainz_release_group_id],
-            "musicbrainz_releasetrackid": [track.musicbrainz_release_track_id],
-            "musicbrainz_trackid": [track.musicbrainz_track_id],
-            "originaldate": [release.original_date],
-            "originalyear": [str(release.original_year)],
-            "performer": self._make_performer_tag(release.people and release.people.performers),
-            "producer": release.people and release.people.producers,
-            "releasecountry": release.release_countries,
-            "releasestatus": release.release_statuses,
-            "releasetype": release.release_types,
-            "script": [release.script],
-            "title": [track.title],
-            "totaldiscs": [str(release.medium_count)],
-            "totaltracks": [str(medium.track_count)],
-            "tracknumber": [str(track_number)],
-            "tracktotal": [str(medium.track_count)],
-            "writer": release.people and release.people.writers,
-        }
-        tags_ = audiofile.Tags(tags_)
-        self._mut_file.delete()  # Clear old tags.
+        release_tags = self._get_release_tags(release_tags)
+        shared_tags, cover = release_tags.get("flac", self._make_release_tags)
+        _, _, _, track_number, track = self._get_tag_sources()
+        tags_ = audiofile.Tags(
+            {
+                "artist": [track.artist],
+                "artists": track.artists,
+                "artistsort": track.artists_sort,
+                "isrc": track.isrcs,
+                "musicbrainz_artistid": track.musicbrainz_artist_ids,
+                "musicbrainz_releasetrackid": [track.musicbrainz_release_track_id],
+                "musicbrainz_trackid": [track.musicbrainz_track_id],
+                "title": [track.title],
+                "tracknumber": [str(track_number)],
+            }
+        )
+        # Clear the old tags in memory (rather than with `delete`, which rewrites the file), so
+        # the new ones are written in place when they fit.
+        if self._mut_file.tags is None:
+            self._mut_file.add_tags()
+        else:
+            self._mut_file.tags.clear()
         self._mut_file.clear_pictures()
+        self._mut_file.update(shared_tags)
         self._mut_file.update(tags_)
+        if cover is not None:
+            self._mut_file.add_picture(cover)
+        self._mut_file.save(padding=self._padding)
 
+    @classmethod
+    def _make_release_tags(
+        cls, release: records.Release, medium_number: int | None
+    ) -> tuple[audiofile.Tags, mutagen.flac.Picture | None]:
+        """Return the tags shared by all the tracks of the medium, and the front cover."""
+        medium = (release.media or {}).get(medium_number) or records.Medium()
+        tags_ = audiofile.Tags(
+            {
+                "album": [release.album],
+                "albumartist": release.album_artists,
+                "albumartistsort": release.album_artists_sort,
+                "arranger": release.people and release.people.arrangers,
+                "asin": release.asins,
+                "barcode": release.barcodes,
+                "catalognumber": release.catalog_numbers,
+                "composer": release.people and release.people.composers,
+                "conductor": release.people and release.people.conductors,
+                "date": [release.date],
+                "discnumber": [str(medium_number)],
+                "discsubtitle": medium.titles,
+                "disctotal": [str(release.medium_count)],
+                "engineer": release.people and release.people.engineers,
+                "genre": release.genres,
+                "label": release.labels,
+                "lyricist": release.people and release.people.lyricists,
+                "media": medium.formats,
+                "mixer": release.people and release.people.mixers,
+                "musicbrainz_albumartistid": release.musicbrainz_album_artist_ids,
+                "musicbrainz_albumid": [release.musicbrainz_album_id],
+                "musicbrainz_releasegroupid": [release.musicbrainz_release_group_id],
+                "originaldate": [release.original_date],
+                "originalyear": [str(release.original_year)],
+                "performer": cls._make_performer_tag(release.people and release.people.performers),
+                "producer": release.people and release.people.producers,
+                "releasecountry": release.release_countries,
+                "releasestatus": release.release_statuses,
+                "releasetype": release.release_types,
+                "script": [release.script],
+                "totaldiscs": [str(release.medium_count)],
+                "totaltracks": [str(medium.track_count)],
+                "tracktotal": [str(medium.track_count)],
+                "writer": release.people and release.people.writers,
+            }
+        )
+        cover = None
         if release.front_cover is not None:
             cover = mutagen.flac.Picture()  # type: ignore[no-untyped-call]
             cover.type = 3
             cover.mime = release.front_cover.mime
             cover.desc = release.front_cover.desc or ""
             cover.data = release.front_cover.data
-            self._mut_file.add_picture(cover)
+        return tags_, cover
+
+    @classmethod
+    def _read_fields(cls, filepath: pathlib.Path, fields: frozenset[str]) -> dict[str, Any]:
+        """Return the fields of the file's tags, reading only the metadata blocks needed."""
+
+        def first(key: str) -> str | None:
+            return comments.get(key, [None])[0]
+
+        def number(key: str) -> int | None:
+            return int(comments[key][0]) if comments.get(key) else None
+
+        bitrate, comments = cls._read_metadata_blocks(
+            filepath, comments=bool(fields - {"bitrate"})
+        )
+        return {
+            "album": first("album"),
+            "album_artists": comments.get("albumartist"),
+            "album_artists_sort": comments.get("albumartistsort"),
+            "artist": first("artist"),
+            "artists": comments.get("artists"),
+            "bitrate": bitrate // 1000,
+            "genres": comments.get("genre"),
+            "medium_count": number("disctotal"),
+            "medium_number": number("discnumber"),
+            "musicbrainz_album_artist_ids": comments.get("musicbrainz_albumartistid"),
+            "musicbrainz_album_id": first("musicbrainz_albumid"),
+            "musicbrainz_artist_ids": comments.get("musicbrainz_artistid"),
+            "musicbrainz_release_group_id": first("musicbrainz_releasegroupid"),
+            "musicbrainz_track_id": first("musicbrainz_trackid"),
+            "original_year": first("originalyear"),
+            "title": first("title"),
+            "track_count": number("tracktotal"),
+            "track_number": number("tracknumber"),
+        }
+
+    @staticmethod
+    def _read_metadata_blocks(
+        filepath: pathlib.Path, *, comments: bool
+    ) -> tuple[int, dict[str, list[str]]]:
+        # Return the bitrate (computed as mutagen does) and, if wanted, the Vorbis comments
+        # (keyed on lower-case names) of a file. Only the stream info and Vorbis comment blocks
+        # are read; the others (e.g. pictures) are skipped over.
+        info = None
+        vorbis_comments = mutagen.flac.VCFLACDict()  # type: ignore[no-untyped-call]
+        with filepath.open("rb") as file:
+            header = file.read(4)
+            if header[:3] == b"ID3":  # Some taggers add an ID3 tag to FLAC files.
+                file.seek(10 + mutagen.id3.BitPaddedInt(file.read(6)[2:]))  # type: ignore[no-untyped-call]
+                header = file.read(4)
+            if header != b"fLaC":
+                msg = f"{filepath} is not a valid FLAC file"
+                raise mutagen.flac.FLACNoHeaderError(msg)
+            last = False
+            while not last:
+                if len(block_header := file.read(4)) < len(b"fLaC"):
+                    msg = f"{filepath} has truncated metadata"
+                    raise mutagen.flac.error(msg)
+                last = bool(block_header[0] & 0x80)
+                code = block_header[0] & 0x7F
+                size = int.from_bytes(block_header[1:])
+                if code == mutagen.flac.StreamInfo.code:
+                    info = mutagen.flac.StreamInfo(file.read(size))  # type: ignore[no-untyped-call]
+                elif code == mutagen.flac.VCFLACDict.code and comments:
+                    vorbis_comments = mutagen.flac.VCFLACDict(file.read(size))  # type: ignore[no-untyped-call]
+                else:
+                    file.seek(size, os.SEEK_CUR)
+            if info is None:
+                msg = f"{filepath} has no stream info block"
+                raise mutagen.flac.FLACNoHeaderError(msg)
+            audio_start = file.tell()
+            audio_size = file.seek(0, os.SEEK_END) - audio_start
+        bitrate = int(audio_size * 8 / info.length) if info.length else 0
+        return bitrate, vorbis_comments.as_dict()  # type: ignore[no-untyped-call]
 
-        self._mut_file.save()
+    @classmethod
+    @no_type_check  # The mutagen library doesn't provide type hints.
+    def _write_fields(
+        cls,
+        filepath: pathlib.Path,
+        fields: dict[str, Any],
+        padding: Callable[[mutagen.PaddingInfo], int],
+    ) -> None:
+        """Write the given fields to the file's tags, saving them with the padding callback."""
+        mut_file = mutagen.flac.FLAC(filepath)
+        if mut_file.tags is None:
+            mut_file.add_tags()
+        for field, value in fields.items():
+            key = _FIELD_KEYS[field]
+            if value:
+                mut_file.tags[key] = value
+            elif key in mut_file.tags:
+                del mut_file.tags[key]
+        mut_file.save(padding=padding)
 
     @staticmethod
     def _make_performer_tag(performers: list[records.Performer] | None | Any) -> list[str] | None:  # noqa: ANN401
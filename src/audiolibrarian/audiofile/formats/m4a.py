@@ -16,8 +16,11 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import contextlib
+import pathlib
+from collections.abc import Callable
 from logging import getLogger
-from typing import Any
+from typing import Any, Final, no_type_check
 
 import mutagen.mp4
 
@@ -25,6 +28,8 @@ from audiolibrarian import audiofile, records
 
 log = getLogger(__name__)
 ITUNES = "----:com.apple.iTunes"
+# The atom for each of `audiofile.WRITABLE_FIELDS`.
+_FIELD_KEYS: Final[dict[str, str]] = {"genres": "\xa9gen"}
 
 
 class M4aFile(audiofile.AudioFile, extensions={".m4a"}):
@@ -142,21 +147,87 @@ class M4aFile(audiofile.AudioFile, extensions={".m4a"}):
             release=release, medium_number=medium_number, track_number=track_number
         )
 
-    def write_tags(self) -> None:
-        """Write the tags."""
+    @classmethod
+    def _read_fields(cls, filepath: pathlib.Path, fields: frozenset[str]) -> dict[str, Any]:
+        """Return the fields of the file's tags, without reading pictures."""
+        del fields  # They're all read from the same atom.
 
-        def ff(text: int | str | None) -> bytes | None:
-            if text is None:
-                return None
-            return mutagen.mp4.MP4FreeForm(bytes(str(text), "utf8"))  # type: ignore[no-untyped-call]
+        def first(key: str) -> Any:  # noqa: ANN401
+            return mut[key][0] if mut.get(key) else None
 
-        def ffl(list_: list[str] | None | Any) -> records.ListF | None:  # noqa: ANN401
-            if not list_:
-                return None
-            return records.ListF([ff(x) for x in list_])
+        def get_str(key: str) -> str | None:
+            # Return first element for the given key, utf8-decoded.
+            return str(mut[key][0].decode("utf8")) if mut.get(key) else None
+
+        def get_strl(key: str) -> list[str] | None:
+            # Return all elements for a given key, utf8-decoded.
+            return [x.decode("utf8") for x in mut[key]] if mut.get(key) else None
 
+        mut: dict[str, Any] = {}
+        info = mutagen.mp4.MP4Info()  # type: ignore[no-untyped-call]
+        with filepath.open("rb") as file:
+            atoms = mutagen.mp4.Atoms(file)  # Only the atoms' headers are read.
+            with contextlib.suppress(mutagen.mp4.MP4NoTrackError):
+                info.load(atoms, file)
+            if b"moov.udta.meta.ilst" in atoms:
+                ilst = atoms.path(b"moov", b"udta", b"meta", b"ilst")[-1]
+                ilst.children = [atom for atom in ilst.children if atom.name != b"covr"]
+                mut = dict(mutagen.mp4.MP4Tags(atoms, file))  # type: ignore[no-untyped-call]
+        return {
+            "album": first("\xa9alb"),
+            "album_artists": mut.get("aART"),
+            "album_artists_sort": mut.get("soaa"),
+            "artist": first("\xa9ART"),
+            "artists": get_strl(f"{ITUNES}:ARTISTS"),
+            "bitrate": info.bitrate // 1000,
+            "genres": mut.get("\xa9gen"),
+            "medium_count": int(mut["disk"][0][1]) if mut.get("disk") else None,
+            "medium_number": int(mut["disk"][0][0]) if mut.get("disk") else None,
+            "musicbrainz_album_artist_ids": get_strl(f"{ITUNES}:MusicBrainz Album Artist Id"),
+            "musicbrainz_album_id": get_str(f"{ITUNES}:MusicBrainz Album Id"),
+            "musicbrainz_artist_ids": get_strl(f"{ITUNES}:MusicBrainz Artist Id"),
+            "musicbrainz_release_group_id": get_str(f"{ITUNES}:MusicBrainz Release Group Id"),
+            "musicbrainz_track_id": get_str(f"{ITUNES}:MusicBrainz Track Id"),
+            "original_year": get_str(f"{ITUNES}:originalyear"),
+            "title": first("\xa9nam"),
+            "track_count": int(mut["trkn"][0][1]) if mut.get("trkn") else None,
+            "track_number": int(mut["trkn"][0][0]) if mut.get("trkn") else None,
+        }
+
+    def write_tags(self, release_tags: audiofile.ReleaseTags | None = None) -> None:
+        """Write the tags."""
         # Note: We don't write "performers" to m4a files.
-        release, medium_number, medium, track_number, track = self._get_tag_sources()
+        release_tags = self._get_release_tags(release_tags)
+        shared_tags = release_tags.get("m4a", self._make_release_tags)
+        _, _, medium, track_number, track = self._get_tag_sources()
+        tags_ = audiofile.Tags(
+            {
+                f"{ITUNES}:ARTISTS": _ffl(track.artists),
+                f"{ITUNES}:ISRC": _ffl(track.isrcs),
+                f"{ITUNES}:MusicBrainz Artist Id": _ffl(track.musicbrainz_artist_ids),
+                f"{ITUNES}:MusicBrainz Release Track Id": [
+                    _ff(track.musicbrainz_release_track_id)
+                ],
+                f"{ITUNES}:MusicBrainz Track Id": [_ff(track.musicbrainz_track_id)],
+                "\xa9ART": [track.artist],
+                "\xa9nam": [track.title],
+                "soar": track.artists_sort,
+                "trkn": [(track_number, medium.track_count)] if track_number else None,
+            }
+        )
+        for key, value in {**shared_tags, **tags_}.items():
+            try:
+                self._mut_file[key] = value
+            except Exception:  # pragma: no cover
+                log.critical("ERROR: %s %s", key, value)
+                raise
+
+        self._mut_file.save(padding=self._padding)
+
+    @staticmethod
+    def _make_release_tags(release: records.Release, medium_number: int | None) -> audiofile.Tags:
+        """Return the tags shared by all the tracks of the medium, including the front cover."""
+        medium = (release.media or {}).get(medium_number) or records.Medium()
         front_cover = None
         if (cover := release.front_cover) is not None:
             # noinspection PyUnresolvedReferences
@@ -168,54 +239,76 @@ class M4aFile(audiofile.AudioFile, extensions={".m4a"}):
             front_cover = [
                 mutagen.mp4.MP4Cover(cover.data, imageformat=image_format)  # type: ignore[no-untyped-call]
             ]
-        tags_ = {
-            f"{ITUNES}:ARRANGER": ffl(release.people and release.people.arrangers),
-            f"{ITUNES}:ARTISTS": ffl(track.artists),
-            f"{ITUNES}:ASIN": ffl(release.asins),
-            f"{ITUNES}:BARCODE": ffl(release.barcodes),
-            f"{ITUNES}:CATALOGNUMBER": ffl(release.catalog_numbers),
-            f"{ITUNES}:COMPOSER": ffl(release.people and release.people.composers),
-            f"{ITUNES}:CONDUCTOR": ffl(release.people and release.people.conductors),
-            f"{ITUNES}:DISCSUBTITLE": ffl(medium.titles),
-            f"{ITUNES}:ENGINEER": ffl(release.people and release.people.engineers),
-            f"{ITUNES}:ISRC": ffl(track.isrcs),
-            f"{ITUNES}:LABEL": ffl(release.labels),
-            f"{ITUNES}:LYRICIST": ffl(release.people and release.people.lyricists),
-            f"{ITUNES}:MEDIA": ffl(medium.formats),
-            f"{ITUNES}:MIXER": ffl(release.people and release.people.mixers),
-            f"{ITUNES}:MusicBrainz Album Artist Id": ffl(release.musicbrainz_album_artist_ids),
-            f"{ITUNES}:MusicBrainz Album Id": [ff(release.musicbrainz_album_id)],
-            f"{ITUNES}:MusicBrainz Album Release Country": ffl(release.release_countries),
-            f"{ITUNES}:MusicBrainz Album Status": ffl(release.release_statuses),
-            f"{ITUNES}:MusicBrainz Album Type": ffl(release.release_types),
-            f"{ITUNES}:MusicBrainz Artist Id": ffl(track.musicbrainz_artist_ids),
-            f"{ITUNES}:MusicBrainz Release Group Id": [ff(release.musicbrainz_release_group_id)],
-            f"{ITUNES}:MusicBrainz Release Track Id": [ff(track.musicbrainz_release_track_id)],
-            f"{ITUNES}:MusicBrainz Track Id": [ff(track.musicbrainz_track_id)],
-            f"{ITUNES}:originaldate": [ff(release.original_date)],
-            f"{ITUNES}:originalyear": [ff(release.original_year)],
-            f"{ITUNES}:PRODUCER": ffl(release.people and release.people.producers),
-            f"{ITUNES}:SCRIPT": [ff(release.script)],
-            f"{ITUNES}:WRITER": ffl(release.people and release.people.writers),
-            "\xa9alb": [release.album],
-            "\xa9ART": [track.artist],
-            "\xa9day": [release.date],
-            "\xa9gen": release.genres,
-            "\xa9nam": [track.title],
-            "aART": release.album_artists,
-            "covr": front_cover,
-            "disk": [(medium_number, release.medium_count)] if medium_number else None,
-            "soaa": release.album_artists_sort,
-            "soar": track.artists_sort,
-            "trkn": [(track_number, medium.track_count)] if track_number else None,
-        }
-        tags_ = audiofile.Tags(tags_)
+        people = release.people
+        return audiofile.Tags(
+            {
+                f"{ITUNES}:ARRANGER": _ffl(people and people.arrangers),
+                f"{ITUNES}:ASIN": _ffl(release.asins),
+                f"{ITUNES}:BARCODE": _ffl(release.barcodes),
+                f"{ITUNES}:CATALOGNUMBER": _ffl(release.catalog_numbers),
+                f"{ITUNES}:COMPOSER": _ffl(people and people.composers),
+                f"{ITUNES}:CONDUCTOR": _ffl(people and people.conductors),
+                f"{ITUNES}:DISCSUBTITLE": _ffl(medium.titles),
+                f"{ITUNES}:ENGINEER": _ffl(people and people.engineers),
+                f"{ITUNES}:LABEL": _ffl(release.labels),
+                f"{ITUNES}:LYRICIST": _ffl(people and people.lyricists),
+                f"{ITUNES}:MEDIA": _ffl(medium.formats),
+                f"{ITUNES}:MIXER": _ffl(people and people.mixers),
+                f"{ITUNES}:MusicBrainz Album Artist Id": _ffl(
+                    release.musicbrainz_album_artist_ids
+                ),
+                f"{ITUNES}:MusicBrainz Album Id": [_ff(release.musicbrainz_album_id)],
+                f"{ITUNES}:MusicBrainz Album Release Country": _ffl(release.release_countries),
+                f"{ITUNES}:MusicBrainz Album Status": _ffl(release.release_statuses),
+                f"{ITUNES}:MusicBrainz Album Type": _ffl(release.release_types),
+                f"{ITUNES}:MusicBrainz Release Group Id": [
+                    _ff(release.musicbrainz_release_group_id)
+                ],
+                f"{ITUNES}:originaldate": [_ff(release.original_date)],
+                f"{ITUNES}:originalyear": [_ff(release.original_year)],
+                f"{ITUNES}:PRODUCER": _ffl(people and people.producers),
+                f"{ITUNES}:SCRIPT": [_ff(release.script)],
+                f"{ITUNES}:WRITER": _ffl(people and people.writers),
+                "\xa9alb": [release.album],
+                "\xa9day": [release.date],
+                "\xa9gen": release.genres,
+                "aART": release.album_artists,
+                "covr": front_cover,
+                "disk": [(medium_number, release.medium_count)] if medium_number else None,
+                "soaa": release.album_artists_sort,
+            }
+        )
+
+    @classmethod
+    @no_type_check  # The mutagen library doesn't provide type hints.
+    def _write_fields(
+        cls,
+        filepath: pathlib.Path,
+        fields: dict[str, Any],
+        padding: Callable[[mutagen.PaddingInfo], int],
+    ) -> None:
+        """Write the given fields to the file's tags, saving them with the padding callback."""
+        mut_file = mutagen.mp4.MP4(filepath)
+        if mut_file.tags is None:
+            mut_file.add_tags()
+        for field, value in fields.items():
+            key = _FIELD_KEYS[field]
+            if value:
+                mut_file.tags[key] = value
+            else:
+                mut_file.tags.pop(key, None)
+        mut_file.save(padding=padding)
+
+
+def _ff(text: int | str | None) -> bytes | None:
+    # Return the text as a freeform value.
+    if text is None:
+        return None
+    return mutagen.mp4.MP4FreeForm(bytes(str(text), "utf8"))  # type: ignore[no-untyped-call]
 
-        for key, value in tags_.items():
-            try:
-                self._mut_file[key] = value
-            except Exception:  # pragma: no cover
-                log.critical("ERROR: %s %s", key, value)
-                raise
 
-        self._mut_file.save()
+def _ffl(list_: list[str] | None | Any) -> records.ListF | None:  # noqa: ANN401
+    # Return the list as a list of freeform values.
+    if not list_:
+        return None
+    return records.ListF([_ff(x) for x in list_])
@@ -16,10 +16,17 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
-from typing import Any, no_type_check
+import copy
+import io
+import os
+import pathlib
+import re
+from collections.abc import Callable
+from typing import IO, Any, Final, no_type_check
 
 import mutagen
 import mutagen.id3
+import mutagen.mp3
 
 from audiolibrarian import audiofile, records
 
@@ -27,6 +34,15 @@ APIC = mutagen.id3.APIC
 TXXX = mutagen.id3.TXXX
 UFID = mutagen.id3.UFID
 MB_UFID = "http://musicbrainz.org"
+# The text frame for each of `audiofile.WRITABLE_FIELDS`.
+_FIELD_FRAMES: Final[dict[str, type[mutagen.id3.TextFrame]]] = {"genres": mutagen.id3.TCON}
+# All the frames but pictures (including ID3v2.2 frames, which are upgraded as they're read);
+# pictures are kept as unparsed data. Used for tags that `_read_id3_without_pictures` can't handle.
+_KNOWN_FRAMES_BUT_PICTURES: Final[dict[str, type[mutagen.id3.Frame]]] = {
+    name: frame
+    for name, frame in (mutagen.id3.Frames | mutagen.id3.Frames_2_2).items()
+    if name not in ("APIC", "PIC")
+}
 
 
 class Mp3File(audiofile.AudioFile, extensions={".mp3"}):
@@ -146,114 +162,224 @@ class Mp3File(audiofile.AudioFile, extensions={".mp3"}):
             release=release, medium_number=medium_number, track_number=track_number
         )
 
+    @classmethod
     @no_type_check  # The mutagen library doesn't provide type hints.
-    def write_tags(self) -> None:  # noqa: C901, PLR0912, PLR0915
+    def _read_fields(cls, filepath: pathlib.Path, fields: frozenset[str]) -> dict[str, Any]:
+        """Return the fields of the file's tags, without parsing pictures."""
+        # Other than the bitrate, they're all read from the same ID3 tag.
+
+        def first(key: str) -> str | None:
+            return mut[key][0] if mut.get(key) else None
+
+        def get_l(key: str) -> list[str] | None:
+            return str(mut[key]).split("/") if mut.get(key) else None
+
+        def number(key: str, index: int) -> int | None:
+            return int(mut[key][0].split("/")[index]) if mut.get(key) else None
+
+        with filepath.open("rb") as file:
+            mut, tag_size = cls._read_id3_without_pictures(file)
+            bitrate = mutagen.mp3.MPEGInfo(file, tag_size).bitrate if "bitrate" in fields else 0
+        return {
+            "album": first("TALB"),
+            "album_artists": get_l("TPE2"),
+            "album_artists_sort": get_l("TSO2"),
+            "artist": first("TPE1"),
+            "artists": get_l("TXXX:ARTISTS"),
+            "bitrate": bitrate // 1000,
+            "genres": get_l("TCON"),
+            "medium_count": number("TPOS", 1),
+            "medium_number": number("TPOS", 0),
+            "musicbrainz_album_artist_ids": get_l("TXXX:MusicBrainz Album Artist Id"),
+            "musicbrainz_album_id": first("TXXX:MusicBrainz Album Id"),
+            "musicbrainz_artist_ids": get_l("TXXX:MusicBrainz Artist Id"),
+            "musicbrainz_release_group_id": first("TXXX:MusicBrainz Release Group Id"),
+            "musicbrainz_track_id": mut.get(f"UFID:{MB_UFID}", UFID()).data.decode("utf8"),
+            "original_year": str(mut["TDOR"][0].year) if mut.get("TDOR") else None,
+            "title": first("TIT2"),
+            "track_count": number("TRCK", 1),
+            "track_number": number("TRCK", 0),
+        }
+
+    @staticmethod
+    @no_type_check  # The mutagen library doesn't provide type hints.
+    def _read_id3_without_pictures(file: IO[bytes]) -> tuple[mutagen.id3.ID3, int | None]:
+        # Return the ID3 tag at the start of the file, and its size (None if there isn't one).
+        # Picture frames are skipped over without being read, and only the other frames are
+        # parsed; the file is left at the end of the tag. Tags we can't walk frame-by-frame
+        # (e.g. ID3v2.2, unsynchronised or with an extended header) are read by mutagen, which
+        # reads, but doesn't parse, the pictures.
+        header = file.read(10)
+        if len(header) < 10 or header[:3] != b"ID3":  # noqa: PLR2004
+            file.seek(0)
+            try:
+                return mutagen.id3.ID3(file, known_frames=_KNOWN_FRAMES_BUT_PICTURES), None
+            except mutagen.id3.ID3NoHeaderError:
+                return mutagen.id3.ID3(), None
+        version, flags = header[3], header[5]
+        tag_size = 10 + mutagen.id3.BitPaddedInt(header[6:10]) + (10 if flags & 0x10 else 0)
+        frames = bytearray()
+        if version in (3, 4) and not flags & 0xC0:  # Not unsynchronised; no extended header.
+            while file.tell() + 10 <= tag_size:
+                frame_header = file.read(10)
+                if frame_header[:1] == b"\x00":
+                    break  # Padding.
+                if not re.fullmatch(rb"[A-Z0-9]{4}", frame_header[:4]):
+                    frames = None  # Probably bad (non-syncsafe) frame sizes.
+                    break
+                size = frame_header[4:8]
+                size = mutagen.id3.BitPaddedInt(size) if version == 4 else int.from_bytes(size)  # noqa: PLR2004
+                if frame_header[:4] == b"APIC":
+                    file.seek(size, os.SEEK_CUR)
+                else:
+                    frames += frame_header + file.read(size)
+        else:
+            frames = None
+        if frames is None:
+            file.seek(0)
+            tag = mutagen.id3.ID3(file, known_frames=_KNOWN_FRAMES_BUT_PICTURES)
+        else:
+            size = mutagen.id3.BitPaddedInt.to_str(len(frames), width=4)
+            tag = mutagen.id3.ID3(io.BytesIO(header[:5] + b"\x00" + size + frames), load_v1=False)
+        file.seek(tag_size)
+        return tag, tag_size
+
+    @no_type_check  # The mutagen library doesn't provide type hints.
+    def write_tags(self, release_tags: audiofile.ReleaseTags | None = None) -> None:  # noqa: C901
         """Write the tags."""
+        release_tags = self._get_release_tags(release_tags)
+        # Frames may be changed as they're saved, so each file gets its own copies.
+        tags = [copy.copy(f) for f in release_tags.get("mp3", self._make_release_tags)]
+        _, _, medium, track_number, track = self._get_tag_sources()
+        # noinspection PyUnusedLocal
+        tag: Any = None
+        if tag := track.title:
+            tags.append(mutagen.id3.TIT2(encoding=1, text=tag))
+        if tag := track.artist:
+            tags.append(mutagen.id3.TPE1(encoding=1, text=tag))
+        if (num := track_number) and (tag := medium.track_count):
+            tags.append(mutagen.id3.TRCK(encoding=0, text=f"{num}/{tag}"))
+        if tag := track.artists_sort:
+            tags.append(mutagen.id3.TSOP(encoding=1, text=_slash(tag)))
+        if tag := track.isrcs:
+            tags.append(mutagen.id3.TSRC(encoding=1, text=_slash(tag)))
+        if tag := track.artists:
+            tags.append(TXXX(encoding=1, desc="ARTISTS", text=_slash(tag)))
+        if tag := track.musicbrainz_artist_ids:
+            tags.append(TXXX(encoding=1, desc="MusicBrainz Artist Id", text=_slash(tag)))
+        if tag := track.musicbrainz_release_track_id:
+            tags.append(TXXX(encoding=1, desc="MusicBrainz Release Track Id", text=tag))
+        if id_ := track.musicbrainz_track_id:
+            tags.append(UFID(owner=MB_UFID, data=bytes(id_, "utf8")))
 
-        def slash(text: list[str] | records.ListF) -> str:
-            return "/".join(text)
+        # The new tag replaces the old one (and any ID3v1 tag) in a single write, in place if it
+        # fits; the file isn't read again, since we already know what's in it.
+        id3 = mutagen.id3.ID3()
+        for tag in tags:
+            id3.add(tag)
+        id3.save(self.filepath, v1=0, padding=self._padding)
+        self._mut_file.tags = id3
 
-        release, medium_number, medium, track_number, track = self._get_tag_sources()
+    @staticmethod
+    @no_type_check  # The mutagen library doesn't provide type hints.
+    def _make_release_tags(  # noqa: C901, PLR0912, PLR0915
+        release: records.Release, medium_number: int | None
+    ) -> list[mutagen.id3.Frame]:
+        """Return the frames shared by all the tracks of the medium, including the front cover."""
+        medium = (release.media or {}).get(medium_number) or records.Medium()
+        people = release.people
         tipl_people = (
-            [["arranger", x] for x in (release.people and release.people.arrangers) or []]
-            + [["composer", x] for x in (release.people and release.people.composers) or []]
-            + [["conductor", x] for x in (release.people and release.people.conductors) or []]
-            + [["engineer", x] for x in (release.people and release.people.engineers) or []]
-            + [["mix", x] for x in (release.people and release.people.mixers) or []]
-            + [["producer", x] for x in (release.people and release.people.producers) or []]
-            + [
-                [p.instrument, p.name]
-                for p in (release.people and release.people.performers) or []
-            ]
-            + [["writer", x] for x in (release.people and release.people.writers) or []]
+            [["arranger", x] for x in (people and people.arrangers) or []]
+            + [["composer", x] for x in (people and people.composers) or []]
+            + [["conductor", x] for x in (people and people.conductors) or []]
+            + [["engineer", x] for x in (people and people.engineers) or []]
+            + [["mix", x] for x in (people and people.mixers) or []]
+            + [["producer", x] for x in (people and people.producers) or []]
+            + [[p.instrument, p.name] for p in (people and people.performers) or []]
+            + [["writer", x] for x in (people and people.writers) or []]
         )
         tags: list[mutagen.id3.Frame] = []
         # noinspection PyUnusedLocal
         tag: Any = None
         if tag := release.album:
             tags.append(mutagen.id3.TALB(encoding=1, text=tag))
-        if tag := release.people and release.people.composers:
-            tags.append(mutagen.id3.TCOM(encoding=1, text=slash(tag)))
+        if tag := people and people.composers:
+            tags.append(mutagen.id3.TCOM(encoding=1, text=_slash(tag)))
         if tag := release.genres:
-            tags.append(mutagen.id3.TCON(encoding=3, text=slash(tag)))
+            tags.append(mutagen.id3.TCON(encoding=3, text=_slash(tag)))
         if tag := release.original_year:
             tags.append(mutagen.id3.TDOR(encoding=0, text=str(tag)))
         if tag := release.date:
             tags.append(mutagen.id3.TDRC(encoding=0, text=tag))
-        if tag := release.people and release.people.lyricists:
-            tags.append(mutagen.id3.TEXT(encoding=1, text=slash(tag)))
-        if people := tipl_people:
-            tags.append(mutagen.id3.TIPL(encoding=1, people=people))
-        if tag := track.title:
-            tags.append(mutagen.id3.TIT2(encoding=1, text=tag))
+        if tag := people and people.lyricists:
+            tags.append(mutagen.id3.TEXT(encoding=1, text=_slash(tag)))
+        if tipl_people:
+            tags.append(mutagen.id3.TIPL(encoding=1, people=tipl_people))
         if tag := medium.formats:
-            tags.append(mutagen.id3.TMED(encoding=1, text=slash(tag)))
-        if tag := track.artist:
-            tags.append(mutagen.id3.TPE1(encoding=1, text=tag))
+            tags.append(mutagen.id3.TMED(encoding=1, text=_slash(tag)))
         if tag := release.album_artists:
-            tags.append(mutagen.id3.TPE2(encoding=1, text=slash(tag)))
-        if tag := release.people and release.people.conductors:
-            tags.append(mutagen.id3.TPE3(encoding=1, text=slash(tag)))
+            tags.append(mutagen.id3.TPE2(encoding=1, text=_slash(tag)))
+        if tag := people and people.conductors:
+            tags.append(mutagen.id3.TPE3(encoding=1, text=_slash(tag)))
         if (num := medium_number) and (tag := release.medium_count):
             tags.append(mutagen.id3.TPOS(encoding=0, text=f"{num}/{tag}"))
         if tag := release.labels:
-            tags.append(mutagen.id3.TPUB(encoding=1, text=slash(tag)))
-        if (num := track_number) and (tag := medium.track_count):
-            tags.append(mutagen.id3.TRCK(encoding=0, text=f"{num}/{tag}"))
+            tags.append(mutagen.id3.TPUB(encoding=1, text=_slash(tag)))
         if tag := release.album_artists_sort:
-            tags.append(mutagen.id3.TSO2(encoding=1, text=slash(tag)))
-        if tag := track.artists_sort:
-            tags.append(mutagen.id3.TSOP(encoding=1, text=slash(tag)))
-        if tag := track.isrcs:
-            tags.append(mutagen.id3.TSRC(encoding=1, text=slash(tag)))
+            tags.append(mutagen.id3.TSO2(encoding=1, text=_slash(tag)))
         if tag := medium.titles:
-            tags.append(mutagen.id3.TSST(encoding=1, text=slash(tag)))
-        if tag := track.artists:
-            tags.append(TXXX(encoding=1, desc="ARTISTS", text=slash(tag)))
+            tags.append(mutagen.id3.TSST(encoding=1, text=_slash(tag)))
         if tag := release.asins:
-            tags.append(TXXX(encoding=1, desc="ASIN", text=slash(tag)))
+            tags.append(TXXX(encoding=1, desc="ASIN", text=_slash(tag)))
         if tag := release.barcodes:
-            tags.append(TXXX(encoding=1, desc="BARCODE", text=slash(tag)))
+            tags.append(TXXX(encoding=1, desc="BARCODE", text=_slash(tag)))
         if tag := release.catalog_numbers:
-            tags.append(TXXX(encoding=1, desc="CATALOGNUMBER", text=slash(tag)))
+            tags.append(TXXX(encoding=1, desc="CATALOGNUMBER", text=_slash(tag)))
         if tag := release.musicbrainz_album_artist_ids:
-            tags.append(TXXX(encoding=1, desc="MusicBrainz Album Artist Id", text=slash(tag)))
+            tags.append(TXXX(encoding=1, desc="MusicBrainz Album Artist Id", text=_slash(tag)))
         if tag := release.musicbrainz_album_id:
             tags.append(TXXX(encoding=1, desc="MusicBrainz Album Id", text=tag))
         if tag := release.release_countries:
             tags.append(
-                TXXX(encoding=1, desc="MusicBrainz Album Release Country", text=slash(tag))
+                TXXX(encoding=1, desc="MusicBrainz Album Release Country", text=_slash(tag))
             )
         if tag := release.release_statuses:
-            tags.append(TXXX(encoding=1, desc="MusicBrainz Album Status", text=slash(tag)))
+            tags.append(TXXX(encoding=1, desc="MusicBrainz Album Status", text=_slash(tag)))
         if tag := release.release_types:
-            tags.append(TXXX(encoding=1, desc="MusicBrainz Album Type", text=slash(tag)))
-        if tag := track.musicbrainz_artist_ids:
-            tags.append(TXXX(encoding=1, desc="MusicBrainz Artist Id", text=slash(tag)))
+            tags.append(TXXX(encoding=1, desc="MusicBrainz Album Type", text=_slash(tag)))
         if tag := release.musicbrainz_release_group_id:
             tags.append(TXXX(encoding=1, desc="MusicBrainz Release Group Id", text=tag))
-        if tag := track.musicbrainz_release_track_id:
-            tags.append(TXXX(encoding=1, desc="MusicBrainz Release Track Id", text=tag))
         if tag := release.script:
             tags.append(TXXX(encoding=1, desc="SCRIPT", text=tag))
         if tag := release.original_year:
             tags.append(TXXX(encoding=1, desc="originalyear", text=str(tag)))
-        if id_ := track.musicbrainz_track_id:
-            tags.append(UFID(owner=MB_UFID, data=bytes(id_, "utf8")))
         if (cover := release.front_cover) is not None:
             tags.append(
                 APIC(encoding=0, mime=cover.mime, type=3, desc=cover.desc, data=cover.data)
             )
+        return tags
 
+    @classmethod
+    @no_type_check  # The mutagen library doesn't provide type hints.
+    def _write_fields(
+        cls,
+        filepath: pathlib.Path,
+        fields: dict[str, Any],
+        padding: Callable[[mutagen.PaddingInfo], int],
+    ) -> None:
+        """Write the given fields to the file's tags, saving them with the padding callback."""
         try:
-            id3 = mutagen.id3.ID3(self.filepath)
+            id3 = mutagen.id3.ID3(filepath)
         except mutagen.id3.ID3NoHeaderError:
-            self._mut_file.add_tags()
-            self._mut_file.save()
-            id3 = mutagen.id3.ID3(self.filepath)
+            id3 = mutagen.id3.ID3()
+        for field, value in fields.items():
+            frame = _FIELD_FRAMES[field]
+            id3.delall(frame.__name__)
+            if value:
+                id3.add(frame(encoding=3, text=_slash(value)))
+        id3.save(filepath, padding=padding)
 
-        id3.delete()
-        for tag in tags:
-            id3.add(tag)
-        id3.save()
-        self._mut_file = mutagen.File(self.filepath.absolute())
+
+def _slash(text: list[str] | records.ListF) -> str:
+    # Return the values joined with slashes.
+    return "/".join(text)
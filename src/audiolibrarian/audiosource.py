@@ -25,7 +25,7 @@ import subprocess
 import tempfile
 from collections.abc import Callable  # noqa: TC003
 
-import discid
+import mutagen.flac
 
 from audiolibrarian import audiofile, config, records, sh, text
 
@@ -68,6 +68,14 @@ class AudioSource(abc.ABC):
         for filename in self.get_wav_filenames():
             shutil.copy2(filename, dest_dir / filename.name)
 
+    def get_decode_commands(self) -> dict[int, tuple[str, ...]] | None:
+        """Return commands that write each track to stdout as a 16-bit wav stream, or None.
+
+        The commands are keyed on track number. If the source can't be streamed this way, return
+        None; the source must then be converted to wav files with `prepare_source`.
+        """
+        return None
+
     def get_front_cover(self) -> records.FrontCover | None:
         """Return a FrontCover record or None."""
         return None
@@ -94,6 +102,8 @@ class CDAudioSource(AudioSource):
 
     def __init__(self, settings: config.Settings) -> None:
         """Initialize a CDAudioSource."""
+        import discid  # noqa: PLC0415  # It loads libdiscid, which is only needed for CDs.
+
         super().__init__()
         self._cd = discid.read(settings.discid_device or None, features=["mcn"])
 
@@ -147,23 +157,46 @@ class FilesAudioSource(AudioSource):
                 return release.front_cover
         return None
 
+    def get_decode_commands(self) -> dict[int, tuple[str, ...]] | None:
+        """Return commands that write each track to stdout as a 16-bit wav stream, or None.
+
+        The commands are keyed on track number. Flac files with more than 16 bits per sample
+        can't be streamed; they need to be converted by `prepare_source`.
+        """
+        decoders: dict[str, Callable[[str], tuple[str, ...]]] = {
+            "flac": lambda i: ("flac", "--silent", "--decode", "--stdout", i),
+            "m4a": lambda i: ("faad", "-q", "-w", i),
+            "mp3": lambda i: ("mpg123", "-q", "-w", "-", i),
+        }
+        if (decode := decoders.get(self._file_type)) is None:
+            return None
+        if self._file_type == "flac" and any(
+            mutagen.flac.FLAC(f).info.bits_per_sample != 16  # type: ignore[no-untyped-call]  # noqa: PLR2004
+            for f in self._filenames
+        ):
+            return None
+        return {n: decode(str(f)) for n, f in enumerate(self.source_list, 1) if f}
+
     def get_search_data(self) -> dict[str, str]:
         """Return a dictionary of search data useful for doing a MusicBrainz search."""
+        wanted = {
+            "album",
+            "artist",
+            "artists",
+            "musicbrainz_album_artist_ids",
+            "musicbrainz_album_id",
+            "musicbrainz_artist_ids",
+        }
         for filename in self._filenames:
-            one_track = audiofile.AudioFile.open(filename).one_track
-            release = one_track.release
-            track = one_track.track
-
-            artist = track.artist or track.artists.first or "" if track else ""
-            album = release.album or "" if release else ""
+            fields = audiofile.AudioFile.read_fields(filename, wanted)
+            artist = fields.get("artist") or fields.get("artists", [""])[0]
+            album = fields.get("album", "")
             mb_artist_id = (
-                release.musicbrainz_album_artist_ids.first
-                if release and release.musicbrainz_album_artist_ids
-                else "" or track.musicbrainz_artist_ids.first
-                if track and track.musicbrainz_artist_ids
-                else "" or ""
-            )
-            mb_release_id = release.musicbrainz_album_id or "" if release else ""
+                fields.get("musicbrainz_album_artist_ids")
+                or fields.get("musicbrainz_artist_ids")
+                or [""]
+            )[0]
+            mb_release_id = fields.get("musicbrainz_album_id", "")
             log.info("Artist from tags: %s", artist)
             log.info("Album from tags: %s", album)
             log.info("MB Artist ID from tags: %s", mb_artist_id)
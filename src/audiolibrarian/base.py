@@ -19,29 +19,26 @@ Useful stuff: https://help.mp3tag.de/main_tags.html
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
-import argparse
+from __future__ import annotations
+
+import functools
 import logging
 import pathlib
 import shutil
 import sys
+import tempfile
 import warnings
-from collections.abc import Iterable
-from typing import Any, Final
-
-import colors
-import filelock
-import yaml
-
-from audiolibrarian import (
-    audiofile,
-    audiosource,
-    config,
-    musicbrainz,
-    normalizer,
-    records,
-    sh,
-    text,
-)
+from typing import TYPE_CHECKING, Any, Final
+
+from audiolibrarian import records, sh, text
+
+# Most modules are imported only where they're needed, so commands start quickly.
+if TYPE_CHECKING:
+    import argparse
+    import concurrent.futures
+    from collections.abc import Iterable
+
+    from audiolibrarian import audiofile, audiosource, config, library, musicbrainz
 
 log = logging.getLogger(__name__)
 
@@ -53,10 +50,18 @@ class Base:
     """
 
     command: str | None = None
-    _manifest_file: Final[str] = "Manifest.yaml"
+    _manifest_file: Final[str] = "Manifest.yaml"  # The same as library.MANIFEST_FILE.
+    _state_file: Final[str] = "Reconvert.yaml"  # Next to the manifest; see Reconvert.
+    _flac_args: Final[tuple[str, ...]] = ("flac", "--silent")
+    _m4a_args: Final[tuple[str, ...]] = ("fdkaac", "--silent", "--bitrate-mode=5")
+    _mp3_args: Final[tuple[str, ...]] = ("lame", "--silent", "-h", "-b", "192")
 
     def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
         """Initialize the base."""
+        import filelock  # noqa: PLC0415
+
+        from audiolibrarian import normalizer  # noqa: PLC0415
+
         self._settings = settings
         # Pull in stuff from args.
         search_keys = ("album", "artist", "mb_artist_id", "mb_release_id")
@@ -69,37 +74,81 @@ class Base:
         # Directories.
         self._library_dir = self._settings.library_dir
         self._work_dir = self._settings.work_dir
-        self._flac_dir = self._work_dir / "flac"
-        self._m4a_dir = self._work_dir / "m4a"
-        self._mp3_dir = self._work_dir / "mp3"
-        self._source_dir = self._work_dir / "source"
-        self._wav_dir = self._work_dir / "wav"
+        self._job_dir: pathlib.Path | None = None  # Set by _make_job_dir.
+        self.__library_index: library.LibraryIndex | None = None
+        self.__mb_session: musicbrainz.MusicBrainzSession | None = None
 
+        # Only publishing into the library is serialized; each job has its own work directory.
         self._lock = filelock.FileLock(str(self._work_dir) + ".lock")
+        # If set, conversion tasks run here, alongside those of other jobs (see Reconvert).
+        self._executor: concurrent.futures.Executor | None = None
 
         self._normalizer = normalizer.Normalizer.factory(self._settings.normalize)
 
         # Initialize stuff that will be defined later.
         self._audio_source: audiosource.AudioSource | None = None
         self._release: records.Release | None = None
+        self._release_tags: audiofile.ReleaseTags | None = None  # Set by _convert.
         self._medium: records.Medium | None = None
         self._source_is_cd: bool | None = None
         self._source_example: records.OneTrack | None = None
 
+    @property
+    def _flac_dir(self) -> pathlib.Path:
+        """Return the job's flac directory."""
+        return self._job_dir / "flac"
+
+    @property
+    def _library_index(self) -> library.LibraryIndex:
+        if self.__library_index is None:
+            from audiolibrarian import library  # noqa: PLC0415
+
+            self.__library_index = library.LibraryIndex(self._work_dir)
+        return self.__library_index
+
+    @property
+    def _m4a_dir(self) -> pathlib.Path:
+        """Return the job's m4a directory."""
+        return self._job_dir / "m4a"
+
+    @property
+    def _mb_session(self) -> musicbrainz.MusicBrainzSession:
+        # Shared by all the releases this object looks up (and by its copies; see Reconvert).
+        if self.__mb_session is None:
+            from audiolibrarian import musicbrainz  # noqa: PLC0415
+
+            self.__mb_session = musicbrainz.MusicBrainzSession(settings=self._settings.musicbrainz)
+        return self.__mb_session
+
+    @property
+    def _mp3_dir(self) -> pathlib.Path:
+        """Return the job's mp3 directory."""
+        return self._job_dir / "mp3"
+
+    @property
+    def _source_dir(self) -> pathlib.Path:
+        """Return the job's source directory."""
+        return self._job_dir / "source"
+
+    @property
+    def _wav_dir(self) -> pathlib.Path:
+        """Return the job's wav directory."""
+        return self._job_dir / "wav"
+
     @property
     def _flac_filenames(self) -> list[pathlib.Path]:
         """Return the current list of flac files in the work directory."""
-        return sorted(self._flac_dir.glob("*.flac"), key=text.alpha_numeric_key)
+        return self._list_job_files("flac", "*.flac")
 
     @property
     def _m4a_filenames(self) -> list[pathlib.Path]:
         """Return the current list of m4a files in the work directory."""
-        return sorted(self._m4a_dir.glob("*.m4a"), key=text.alpha_numeric_key)
+        return self._list_job_files("m4a", "*.m4a")
 
     @property
     def _mp3_filenames(self) -> list[pathlib.Path]:
         """Return the current list of mp3 files in the work directory."""
-        return sorted(self._mp3_dir.glob("*.mp3"), key=text.alpha_numeric_key)
+        return self._list_job_files("mp3", "*.mp3")
 
     @property
     def _multi_disc(self) -> bool:
@@ -109,35 +158,80 @@ class Base:
     @property
     def _source_filenames(self) -> list[pathlib.Path]:
         """Return the current list of source files in the work directory."""
-        return sorted(self._source_dir.glob("*.flac"), key=text.alpha_numeric_key)
+        return self._list_job_files("source", "*.flac")
 
     @property
     def _wav_filenames(self) -> list[pathlib.Path]:
         """Return the current list of wav files in the work directory."""
-        return sorted(self._wav_dir.glob("*.wav"), key=text.alpha_numeric_key)
+        return self._list_job_files("wav", "*.wav")
+
+    def _convert(self, *, make_source: bool = True) -> list[pathlib.Path]:
+        """Perform all the steps of ripping, normalizing, converting and moving the files.
+
+        When the audio source can be decoded to a stream, and the normalizer doesn't need wav
+        files, each track is decoded once and streamed straight into all the encoders; no wav
+        files are written at all.
+
+        Returns:
+            The paths of the files moved into the library.
+        """
+        from audiolibrarian import audiofile  # noqa: PLC0415
 
-    def _convert(self, *, make_source: bool = True) -> None:
-        """Perform all the steps of ripping, normalizing, converting and moving the files."""
         if self._audio_source is None:
             warnings.warn(
                 "Cannot convert; no audio_source is defined.", RuntimeWarning, stacklevel=2
             )
-            return
-        self._audio_source.prepare_source()
-        with self._lock:
-            self._make_clean_workdirs()
-            self._audio_source.copy_wavs(self._wav_dir)
-            self._rename_wav()
+            return []
+        inputs: dict[int, sh.Stream]
+        if (decode_commands := self._audio_source.get_decode_commands()) is None:
+            self._audio_source.prepare_source()
+            inputs = {
+                text.get_track_number(str(f.name)): f
+                for f in self._audio_source.get_wav_filenames()
+            }
+        else:
+            inputs = dict(decode_commands)
+        self._make_job_dir()
+        # The tags shared by all the tracks are prepared once (per format), not for every file.
+        self._release_tags = (
+            None
+            if self._release is None
+            else audiofile.ReleaseTags(self._release, self._disc_number)
+        )
+        try:
+            # Progress dots from jobs sharing an executor would be interleaved; skip them.
+            message = None if self._executor else f"Converting {len(inputs)} tracks..."
+            with sh.Scheduler(message, executor=self._executor) as scheduler:
+                self._schedule_conversion(scheduler, inputs, make_source=make_source)
             if make_source:
-                self._make_source()
-            self._normalize()
-            self._make_flac()
-            self._make_m4a()
-            self._make_mp3()
-            self._move_files(move_source=make_source)
+                self._source_example = audiofile.AudioFile.open(
+                    self._source_filenames[0]
+                ).read_tags()
+            with self._lock:
+                return self._move_files(move_source=make_source)
+        finally:
+            self._release_tags = None
+            self._remove_job_dir()
+
+    def _find_indexed_files(
+        self, directories: list[str | pathlib.Path]
+    ) -> list[library.IndexedFile] | None:
+        """Return the indexed audio files in the given directories (or None if not indexed).
+
+        The index is brought up to date first; only new and changed files are read.
+        """
+        if not self._update_library_index(directories):
+            return None
+        return self._library_index.files(directories)
 
     def _find_manifests(self, directories: list[str | pathlib.Path]) -> list[pathlib.Path]:
-        """Return a sorted, unique list of manifest files anywhere in the given directories."""
+        """Return a sorted, unique list of manifest files anywhere in the given directories.
+
+        If the directories have been indexed, the index is brought up to date, and the manifests
+        are found in it.
+        """
+        if self._update_library_index(directories):
+            return self._library_index.manifests(directories)
         manifests = set()
         for directory in directories:
             path = pathlib.Path(directory)
@@ -147,10 +241,16 @@ class Base:
 
     def _get_searcher(self) -> musicbrainz.Searcher:
         """Return a Searcher object populated with data from the audio source and cli args."""
+        from audiolibrarian import musicbrainz  # noqa: PLC0415
+
         search_data: dict[str, str] = (
             self._audio_source.get_search_data() if self._audio_source is not None else {}
         )
-        searcher = musicbrainz.Searcher(settings=self._settings.musicbrainz, **search_data)  # type: ignore[arg-type]
+        searcher = musicbrainz.Searcher(
+            settings=self._settings.musicbrainz,
+            session=self._mb_session,
+            **search_data,  # type: ignore[arg-type]
+        )
         searcher.disc_number = str(self._disc_number)
         # Override with user-provided info.
         if value := self._provided_search_data.get("artist"):
@@ -173,9 +273,13 @@ class Base:
         If the track count does not match the file count, print an error message.
         If the user does not confirm, exit the program.
         """
+        import colors  # noqa: PLC0415
+
         print("Gathering search information...")
         searcher = self._get_searcher()
+        # Without a user to ask, we go ahead, unless something's wrong (see text.non_interactive).
         skip_confirm = bool(searcher.mb_artist_id and searcher.mb_release_id)
+        skip_confirm = skip_confirm or not text.is_interactive()
         print("Finding MusicBrainz release information...")
         self._release = searcher.find_music_brains_release()
         self._medium = self._release.media[int(self._disc_number)]
@@ -194,62 +298,59 @@ class Base:
         if not skip_confirm and text.input_("Confirm [N,y]: ").lower() != "y":  # pragma: no cover
             sys.exit(1)
 
-    def _make_clean_workdirs(self) -> None:
-        """Erase everything from the workdir and create the empty directory structure."""
-        if self._work_dir.is_dir():
-            shutil.rmtree(self._work_dir)
+    def _make_job_dir(self) -> None:
+        """Create a new, empty work directory structure for this job.
+
+        Job directories live under "jobs" in the work directory, and are named after the release
+        and disc, so several jobs can run side by side without touching each other's files.
+        """
+        jobs_dir = self._work_dir / "jobs"
+        jobs_dir.mkdir(parents=True, exist_ok=True)
+        prefix = f"{self._release.musicbrainz_album_id or 'unknown'}__disc{self._disc_number}__"
+        self._job_dir = pathlib.Path(tempfile.mkdtemp(prefix=prefix, dir=jobs_dir))
         for path in self._flac_dir, self._m4a_dir, self._mp3_dir, self._source_dir, self._wav_dir:
-            path.mkdir(parents=True)
+            path.mkdir()
 
-    def _make_flac(self, *, source: bool = False) -> None:
-        """Convert the wav files into flac files; tag them.
+    def _list_job_files(self, directory: str, pattern: str) -> list[pathlib.Path]:
+        """Return a sorted list of the files in a job directory; empty if there's no job."""
+        if self._job_dir is None:
+            return []
+        return sorted((self._job_dir / directory).glob(pattern), key=text.alpha_numeric_key)
 
-        If source is True, it stores the flac files in the source directory,
-        otherwise, it stores them in the flac directory.
-        """
-        out_dir = self._source_dir if source else self._flac_dir
-        commands: list[tuple[str, ...]] = [
-            ("flac", "--silent", f"--output-prefix={out_dir}/", str(f))
-            for f in self._wav_filenames
-        ]
-        sh.parallel(f"Making {len(self._wav_filenames)} flac files...", commands)
-        filenames = self._source_filenames if source else self._flac_filenames
-        sh.touch(filenames)
-        self._tag_files(filenames)
-
-    def _make_m4a(self) -> None:
-        """Convert the wav files into m4a files; tag them."""
-        commands: list[tuple[str, ...]] = []
-        for filename in self._wav_filenames:
-            dst_file = self._m4a_dir / filename.name.replace(".wav", ".m4a")
-            commands.append(
-                ("fdkaac", "--silent", "--bitrate-mode=5", "-o", str(dst_file), str(filename))
-            )
-        sh.parallel(f"Making {len(commands)} m4a files...", commands)
-        sh.touch(self._m4a_filenames)
-        self._tag_files(self._m4a_filenames)
-
-    def _make_mp3(self) -> None:
-        """Convert the wav files into mp3 files; tag them."""
-        commands: list[tuple[str, ...]] = []
-        for filename in self._wav_filenames:
-            dst_file = self._mp3_dir / filename.name.replace(".wav", ".mp3")
-            commands.append(("lame", "--silent", "-h", "-b", "192", str(filename), str(dst_file)))
-        sh.parallel(f"Making {len(commands)} mp3 files...", commands)
-        sh.touch(self._mp3_filenames)
-        self._tag_files(self._mp3_filenames)
-
-    def _make_source(self) -> None:
-        """Convert the files into flac files; store them in the source dir; read their tags.
-
-        The files are defined by the audio source; they could be wav files from a CD
-        or another type of audio file.
+    def _make_encode_commands(
+        self, wav: pathlib.Path, *, source: bool = False
+    ) -> dict[pathlib.Path, tuple[str, ...]]:
+        """Return the commands that encode a wav stream from stdin, keyed on the files they make.
+
+        Decoders writing to a pipe can't fill in the wav chunk sizes, so the encoders are told to
+        ignore them.
+
+        The files are named after the given wav file. If source is True, the only command makes
+        the flac file in the source directory; otherwise, the commands make the flac, m4a and mp3
+        files.
         """
-        self._make_flac(source=True)
-        self._source_example = audiofile.AudioFile.open(self._source_filenames[0]).read_tags()
+        # Room for the tags is reserved as the files are made, so tagging them doesn't rewrite
+        # them (fdkaac has no such option; the m4a files are padded when they're first tagged).
+        padding = self._settings.tags.padding
+        flac_args = (*self._flac_args, f"--padding={padding}", "--ignore-chunk-sizes")
+        if source:
+            flac = self._source_dir / wav.with_suffix(".flac").name
+            return {flac: (*flac_args, f"--output-name={flac}", "-")}
+        flac = self._flac_dir / wav.with_suffix(".flac").name
+        m4a = self._m4a_dir / wav.with_suffix(".m4a").name
+        mp3 = self._mp3_dir / wav.with_suffix(".mp3").name
+        return {
+            flac: (*flac_args, f"--output-name={flac}", "-"),
+            m4a: (*self._m4a_args, "--ignorelength", "-o", str(m4a), "-"),
+            mp3: (*self._mp3_args, "--pad-id3v2-size", str(padding), "-", str(mp3)),
+        }
+
+    def _move_files(self, *, move_source: bool = True) -> list[pathlib.Path]:
+        """Move converted/tagged files from the work directory into the library directory.
 
-    def _move_files(self, *, move_source: bool = True) -> None:
-        """Move converted/tagged files from the work directory into the library directory."""
+        Returns:
+            The new paths of the moved files.
+        """
         artist_album_dir = self._release.get_artist_album_path()
         flac_dir = self._library_dir / "flac" / artist_album_dir
         m4a_dir = self._library_dir / "m4a" / artist_album_dir
@@ -264,29 +365,98 @@ class Base:
             if path.is_dir():
                 shutil.rmtree(path)
             path.mkdir(parents=True)
-        for path in self._flac_filenames:
-            path.rename(flac_dir / path.name)
-        for path in self._m4a_filenames:
-            path.rename(m4a_dir / path.name)
-        for path in self._mp3_filenames:
-            path.rename(mp3_dir / path.name)
-        if move_source:
-            for path in self._source_filenames:
-                path.rename(source_dir / path.name)
-
-    def _normalize(self) -> None:
-        """Normalize the wav files using the selected normalizer."""
-        self._normalizer.normalize(set(self._wav_filenames))
-
-    def _rename_wav(self) -> None:
-        """Rename the wav files to a filename-sane representation of the track title."""
-        for old_path in self._wav_filenames:
-            track_number = text.get_track_number(str(old_path.name))
-            title_filename = self._medium.tracks[track_number].get_filename(".wav")
-            new_path = old_path.parent / title_filename
-            if new_path.resolve() != old_path.resolve():
-                log.info("RENAMING: %s --> %s", old_path.name, new_path.name)
-                old_path.rename(new_path)
+        moves = [
+            (flac_dir, self._flac_filenames),
+            (m4a_dir, self._m4a_filenames),
+            (mp3_dir, self._mp3_filenames),
+        ] + ([(source_dir, self._source_filenames)] if move_source else [])
+        return [path.rename(dest_dir / path.name) for dest_dir, paths in moves for path in paths]
+
+    def _remove_job_dir(self) -> None:
+        """Remove this job's work directory, and everything in it."""
+        if self._job_dir is not None and self._job_dir.is_dir():
+            shutil.rmtree(self._job_dir)
+        self._job_dir = None
+
+    def _schedule_conversion(
+        self, scheduler: sh.Scheduler, inputs: dict[int, sh.Stream], *, make_source: bool
+    ) -> None:
+        """Add the tasks that make and tag the source, flac, m4a and mp3 files to the scheduler.
+
+        The inputs are wav streams (decode commands or wav files), keyed on track number. Each
+        stream is read once, and teed into all the encoders that need it.
+
+        Each track is converted as soon as its own input is ready (and normalized), rather than
+        waiting for every track to finish each stage. If the normalizer needs to see all the wav
+        files at once, every conversion waits on that single normalization task.
+
+        If make_source is True, the (un-normalized) input is also encoded into flac files in the
+        source directory.
+        """
+        wavs = {
+            self._wav_dir / self._medium.tracks[n].get_filename(".wav"): i
+            for n, i in inputs.items()
+        }
+        if not self._normalizer.needs_files:
+            for wav, input_ in wavs.items():
+                commands = self._make_encode_commands(wav)
+                if make_source:
+                    commands |= self._make_encode_commands(wav, source=True)
+                self._schedule_tee(scheduler, f"{wav.stem}.encode", input_, commands)
+            return
+        per_track = self._normalizer.per_track
+        for wav, input_ in wavs.items():
+            commands = self._make_encode_commands(wav, source=True) if make_source else {}
+            self._schedule_tee(scheduler, f"{wav.stem}.wav", input_, commands, wav=wav)
+            if per_track:
+                scheduler.add(
+                    f"{wav.stem}.normalize",
+                    functools.partial(self._normalizer.normalize, {wav}),
+                    after=[f"{wav.stem}.wav"],
+                )
+        if not per_track:
+            scheduler.add(
+                "normalize",
+                functools.partial(self._normalizer.normalize, set(wavs)),
+                after=[f"{wav.stem}.wav" for wav in wavs],
+            )
+        for wav in wavs:
+            self._schedule_tee(
+                scheduler,
+                f"{wav.stem}.encode",
+                wav,
+                self._make_encode_commands(wav),
+                after=[f"{wav.stem}.normalize" if per_track else "normalize"],
+            )
+
+    def _schedule_tee(  # noqa: PLR0913
+        self,
+        scheduler: sh.Scheduler,
+        name: str,
+        input_: sh.Stream,
+        commands: dict[pathlib.Path, tuple[str, ...]],
+        *,
+        wav: pathlib.Path | None = None,
+        after: Iterable[str] = (),
+    ) -> None:
+        """Add a task that tees the input into the encode commands (and wav file), then tags.
+
+        The files made are tagged by the same task, as soon as the encoders finish. Separate tag
+        tasks would be queued behind every encode task already submitted to the (shared)
+        executor, leaving most of the tagging until all the tracks had been encoded.
+
+        Args:
+            scheduler: The scheduler to add the task to
+            name: The name of the task
+            input_: The wav stream to read
+            commands: Encode commands reading from stdin, keyed on the files they make
+            wav: If given, the wav stream is also written to this file (for the normalizer), and
+                its header is fixed up afterwards
+            after: Names of tasks that must finish before the task starts
+        """
+        sinks: list[sh.Stream] = [*commands.values(), *([wav] if wav else [])]
+        tee_and_tag = functools.partial(self._tee_and_tag, input_, sinks, list(commands), wav=wav)
+        scheduler.add(name, tee_and_tag, after=after)
 
     def _summary(self) -> tuple[str, bool]:
         """Return a summary of the conversion/tagging process and an "ok" flag indicating issues.
@@ -355,19 +525,55 @@ class Base:
         lines.append(f"\u255a{c1_line}\u2567{c2_line}\u2567{c3_line}\u255d")
         return "\n".join(lines), okay
 
-    def _tag_files(self, filenames: list[pathlib.Path]) -> None:
-        """Tag the given list of files."""
+    def _tag_file(self, filename: pathlib.Path) -> None:
+        """Touch and tag the given (newly made) file."""
+        from audiolibrarian import audiofile  # noqa: PLC0415
+
+        sh.touch([filename])  # The flac encoder copies the timestamps of its input file.
+        song = audiofile.AudioFile.open(filename, padding=self._settings.tags.padding)
+        song.one_track = records.OneTrack(
+            release=self._release,
+            medium_number=self._disc_number,
+            track_number=int(filename.name.split("__")[0]),
+        )
+        song.write_tags(self._release_tags)
+
+    def _tee_and_tag(
+        self,
+        input_: sh.Stream,
+        sinks: list[sh.Stream],
+        filenames: list[pathlib.Path],
+        *,
+        wav: pathlib.Path | None = None,
+    ) -> None:
+        """Tee the input into the sinks, then tag the given files (made by the sinks).
+
+        If one of the sinks is a wav file, its chunk sizes are set once the stream has ended (the
+        decoder couldn't), before anything (e.g. the normalizer) reads it.
+        """
+        sh.tee(input_, sinks)
+        if wav is not None:
+            sh.fix_wav_sizes(wav)
         for filename in filenames:
-            song = audiofile.AudioFile.open(filename)
-            song.one_track = records.OneTrack(
-                release=self._release,
-                medium_number=self._disc_number,
-                track_number=int(filename.name.split("__")[0]),
-            )
-            song.write_tags()
+            self._tag_file(filename)
+
+    def _update_library_index(self, directories: list[str | pathlib.Path]) -> bool:
+        """Update the library index for the given directories, if they've been indexed.
+
+        Returns:
+            True if the directories have been indexed (and the index is now up to date).
+        """
+        if not self._library_index.is_indexed(directories):
+            return False
+        print("Updating the library index...")
+        stats = self._library_index.update(directories)
+        log.info("Library index: %s", stats)
+        return True
 
     def _write_manifest(self) -> None:
         """Write out a manifest file with release information."""
+        import yaml  # noqa: PLC0415
+
         release = self._release  # We use this a lot below.
         file_info = self._source_example.track.file_info
         manifest = {
@@ -410,22 +616,32 @@ class Base:
     @staticmethod
     def _find_audio_files(directories: list[str | pathlib.Path]) -> Iterable[audiofile.AudioFile]:
         """Yield audiofile objects found in the given directories."""
-        paths: list[pathlib.Path] = []
-        # Grab all the paths first because thing may change as files are renamed.
-        for directory in directories:
-            path = pathlib.Path(directory)
-            for ext in audiofile.AudioFile.extensions():
-                paths.extend(path.rglob(f"*{ext}"))
-        paths = sorted(set(paths))
+        from audiolibrarian import audiofile  # noqa: PLC0415
+
         # Using yield rather than returning a list saves us from simultaneously storing
         # potentially thousands of AudioFile objects in memory at the same time.
-        for path in paths:
+        for path in Base._find_audio_paths(directories):
             try:
                 yield audiofile.AudioFile.open(path)
             except FileNotFoundError:
                 continue
 
+    @staticmethod
+    def _find_audio_paths(directories: list[str | pathlib.Path]) -> list[pathlib.Path]:
+        """Return a sorted, unique list of the audio files in the given directories."""
+        from audiolibrarian import audiofile  # noqa: PLC0415
+
+        paths: list[pathlib.Path] = []
+        # Grab all the paths first because thing may change as files are renamed.
+        for directory in directories:
+            path = pathlib.Path(directory)
+            for ext in audiofile.AudioFile.extensions():
+                paths.extend(path.rglob(f"*{ext}"))
+        return sorted(set(paths))
+
     @staticmethod
     def _read_manifest(manifest_path: pathlib.Path) -> dict[Any, Any]:
+        import yaml  # noqa: PLC0415
+
         with manifest_path.open(encoding="utf-8") as manifest_file:
             return dict(yaml.safe_load(manifest_file))
@@ -0,0 +1,142 @@
+"""A persistent cache of MusicBrainz responses."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+#
+import json
+import logging
+import pathlib
+import sqlite3
+import threading
+import time
+from typing import Any, Final
+
+log = logging.getLogger(__name__)
+
+
+class CacheMissError(LookupError):
+    """Raised when a response is needed, but isn't cached, and we're not allowed to fetch it."""
+
+
+class Cache:
+    """A persistent, size-bounded cache, kept in an SQLite database.
+
+    Entries are keyed on a kind (e.g. "release") and a key (e.g. a release ID). Each kind of entry
+    has its own time-to-live; kinds without one never expire. When the total size of the entries
+    grows beyond the maximum size, the least recently used entries are evicted.
+
+    Values are stored as JSON, except for bytes, which are stored as they are.
+
+    The database may be shared by any number of threads and processes.
+    """
+
+    _schema: Final[str] = """
+        CREATE TABLE IF NOT EXISTS entries (
+            kind TEXT NOT NULL,
+            key TEXT NOT NULL,
+            data BLOB NOT NULL,
+            is_json INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            created REAL NOT NULL,
+            used REAL NOT NULL,
+            PRIMARY KEY (kind, key)
+        )
+    """
+
+    def __init__(self, path: pathlib.Path, ttls: dict[str, float], max_size: int) -> None:
+        """Initialize a Cache, creating the database if needed.
+
+        Args:
+            path: The path of the SQLite database file
+            ttls: Time-to-live, in seconds, for each kind of entry
+            max_size: The maximum total size of the entries, in bytes
+        """
+        self._ttls = ttls
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(self._schema)
+
+    def __del__(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def get(self, kind: str, key: str, *, stale: bool = False) -> Any:  # noqa: ANN401
+        """Return the cached value, or None if it isn't cached (or has expired).
+
+        Args:
+            kind: The kind of entry
+            key: The key of the entry, unique within its kind
+            stale: If True, return the value even if it has expired
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, is_json, created FROM entries WHERE kind = ? AND key = ?",
+                (kind, key),
+            ).fetchone()
+            if row is None:
+                log.debug("Cache miss: %s %s", kind, key)
+                return None
+            data, is_json, created = row
+            now = time.time()
+            if not stale and (ttl := self._ttls.get(kind)) is not None and now - created > ttl:
+                log.debug("Cache expired: %s %s", kind, key)
+                return None
+            self._connection.execute(
+                "UPDATE entries SET used = ? WHERE kind = ? AND key = ?", (now, kind, key)
+            )
+        log.debug("Cache hit: %s %s", kind, key)
+        return json.loads(data) if is_json else bytes(data)
+
+    def put(self, kind: str, key: str, value: Any) -> None:  # noqa: ANN401
+        """Store a value in the cache, evicting old entries if the cache is too big.
+
+        Args:
+            kind: The kind of entry
+            key: The key of the entry, unique within its kind
+            value: The value; either bytes or anything that can be serialized as JSON
+        """
+        is_json = not isinstance(value, bytes)
+        data = json.dumps(value).encode() if is_json else value
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (kind, key, data, is_json, len(data), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        # Remove the least recently used entries until the cache fits; the caller holds the lock.
+        query = "SELECT COALESCE(SUM(size), 0) FROM entries"
+        (total,) = self._connection.execute(query).fetchone()
+        if total <= self._max_size:
+            return
+        evict = []
+        for kind, key, size in self._connection.execute(
+            "SELECT kind, key, size FROM entries ORDER BY used"
+        ):
+            if total <= self._max_size:
+                break
+            evict.append((kind, key))
+            total -= size
+        log.debug("Evicting %d cache entries", len(evict))
+        self._connection.executemany("DELETE FROM entries WHERE kind = ? AND key = ?", evict)
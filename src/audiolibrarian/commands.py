@@ -16,21 +16,43 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+from __future__ import annotations
+
 import argparse
+import collections
+import concurrent.futures
+import copy
+import functools
+import hashlib
 import logging
 import pathlib
 import re
-from typing import Any
+import shutil
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Final
+
+from audiolibrarian import base, records, sh, text
 
-from audiolibrarian import __version__, audiofile, audiosource, base, config, genremanager
+# Most modules are imported only by the commands that need them, so commands start quickly.
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from audiolibrarian import audiofile, config
 
 log = logging.getLogger(__name__)
 
+# The executables needed to decode source files, and to encode the files in the library.
+_DECODE_EXE: Final[frozenset[str]] = frozenset({"faad", "flac", "mpg123", "sndfile-convert"})
+_ENCODE_EXE: Final[frozenset[str]] = frozenset({"fdkaac", "flac", "lame"})
+
 
 class _Command:
     # Base class for commands.
     help = ""
     parser = argparse.ArgumentParser()
+    executables: frozenset[str] = frozenset()  # The executables the command runs.
+    uses_settings = True  # If False, the command isn't given any settings (they're not read).
 
     @staticmethod
     def validate_args(args: argparse.Namespace) -> bool:
@@ -57,6 +79,8 @@ class Config(_Command):
         This class performs all of its tasks on instantiation and provides no public members or
         methods.
         """
+        from audiolibrarian import config  # noqa: PLC0415
+
         _ = settings
         del settings  # Unused.
         config.ConfigManager(args=args)
@@ -71,6 +95,7 @@ class Convert(_Command, base.Base):
 
     command = "convert"
     help = "convert music from files"
+    executables = _DECODE_EXE | _ENCODE_EXE
     parser = argparse.ArgumentParser()
     parser.add_argument("--artist", "-a", help="provide artist (ignore tags)")
     parser.add_argument("--album", "-m", help="provide album (ignore tags)")
@@ -81,6 +106,8 @@ class Convert(_Command, base.Base):
 
     def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
         """Initialize a Convert command handler."""
+        from audiolibrarian import audiosource  # noqa: PLC0415
+
         super().__init__(args, settings)
         self._source_is_cd = False
         self._audio_source = audiosource.FilesAudioSource([pathlib.Path(x) for x in args.filename])
@@ -110,10 +137,56 @@ class Genre(_Command):
     parser_action = parser.add_mutually_exclusive_group()
     parser_action.add_argument("--tag", action="store_true", help="update tags")
     parser_action.add_argument("--update", action="store_true", help="update MusicBrainz")
+    parser.add_argument(
+        "--refresh", action="store_true", help="fetch genres again, rather than from the cache"
+    )
 
     def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
         """Initialize a Genre command handler."""
-        genremanager.GenreManager(args=args, settings=settings.musicbrainz)
+        from audiolibrarian import genremanager, library  # noqa: PLC0415
+
+        genremanager.GenreManager(
+            args=args,
+            settings=settings.musicbrainz,
+            library_index=library.LibraryIndex(settings.work_dir),
+            padding=settings.tags.padding,
+        )
+
+
+class Index(_Command):
+    """Index the audio files and manifests in the library."""
+
+    command = "index"
+    help = "index the library, for faster library-wide commands"
+    parser = argparse.ArgumentParser(
+        description=(
+            "Index the audio files and manifests in the given directory(ies), so commands that "
+            "work on whole directory trees (genre, reconvert, rename, retag) can use the index "
+            "rather than reading every file. Only new and changed files are read."
+        )
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="skip directories with nothing added or removed (misses files changed in place)",
+    )
+    parser.add_argument(
+        "directories", nargs="*", help="directories to index (default: the library directory)"
+    )
+
+    def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
+        """Initialize an Index command handler."""
+        from audiolibrarian import library  # noqa: PLC0415
+
+        directories = args.directories or [settings.library_dir]
+        print(f"Indexing {', '.join(str(d) for d in directories)}...")
+        stats = library.LibraryIndex(settings.work_dir).update(directories, quick=args.quick)
+        print(f"Indexed {stats.files} files ({stats.read} read, {stats.removed} removed)")
+
+    @staticmethod
+    def validate_args(args: argparse.Namespace) -> bool:
+        """Validate command line arguments."""
+        return _validate_directories_arg(args)
 
 
 class Manifest(_Command, base.Base):
@@ -136,6 +209,8 @@ class Manifest(_Command, base.Base):
 
     def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
         """Initialize a Manifest command handler."""
+        from audiolibrarian import audiofile, audiosource  # noqa: PLC0415
+
         super().__init__(args, settings)
         self._source_is_cd = args.cd
         self._audio_source = audiosource.FilesAudioSource([pathlib.Path(x) for x in args.filename])
@@ -160,25 +235,160 @@ class Reconvert(_Command, base.Base):
     command = "reconvert"
     help = "re-convert files from an existing source directory"
     parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--albums",
+        type=int,
+        default=1,
+        metavar="N",
+        help="work on up to N albums at once (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip albums whose sources, settings and outputs haven't changed since last time",
+    )
     parser.add_argument("directories", nargs="+", help="source directories")
+    executables = _DECODE_EXE | _ENCODE_EXE
 
     def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
         """Initialize a Reconvert command handler."""
         super().__init__(args, settings)
         self._source_is_cd = False
+        self._incremental = bool(args.incremental)
         manifest_paths = self._find_manifests(args.directories)
+        if args.albums > 1:
+            self._reconvert_albums(manifest_paths, args.albums)
+            return
         count = len(manifest_paths)
         for i, manifest_path in enumerate(manifest_paths):
             print(f"Processing {i + 1} of {count} ({i / count:.0%}): {manifest_path}...")
-            self._audio_source = audiosource.FilesAudioSource([manifest_path.parent])
-            manifest = self._read_manifest(manifest_path)
-            self._disc_number, self._disc_count = manifest["disc_number"], manifest["disc_count"]
-            self._get_tag_info()
-            self._convert(make_source=False)
+            if self._prepare_album(manifest_path):
+                self._reconvert_album(manifest_path)
+
+    def _get_state(
+        self, manifest_path: pathlib.Path, outputs: Iterable[str | pathlib.Path]
+    ) -> dict[str, Any]:
+        """Return everything that the outputs of re-converting the manifest's album depend on.
+
+        That's the manifest (from which the release information is found), the sizes and
+        modification times of the source files, the encoder, normalizer and tag settings (the
+        tag padding is passed to the encoders), and the sizes and modification times of the
+        given output files (None for missing files).
+        """
+
+        def stat(path: pathlib.Path) -> list[int] | None:
+            try:
+                stat_result = path.stat()
+            except FileNotFoundError:
+                return None
+            return [stat_result.st_size, stat_result.st_mtime_ns]
+
+        normalizer_ = self._normalizer
+        return {
+            "manifest": hashlib.sha256(manifest_path.read_bytes()).hexdigest(),
+            "sources": {
+                path.name: stat(path) for path in self._audio_source.get_source_filenames()
+            },
+            "settings": {
+                "encoders": [list(self._flac_args), list(self._m4a_args), list(self._mp3_args)],
+                "normalizer": {
+                    type(normalizer_).__name__: normalizer_.settings.model_dump(mode="json")
+                },
+                "tags": self._settings.tags.model_dump(mode="json"),
+            },
+            "outputs": {str(path): stat(pathlib.Path(path)) for path in sorted(outputs)},
+        }
+
+    def _is_up_to_date(self, manifest_path: pathlib.Path) -> bool:
+        """Return True if nothing has changed since the album was last (incrementally) converted.
+
+        The state saved by the last conversion must match the current state, including all of
+        the outputs.
+        """
+        import yaml  # noqa: PLC0415
+
+        state_path = manifest_path.parent / self._state_file
+        if not state_path.is_file():
+            return False
+        with state_path.open(encoding="utf-8") as state_file:
+            state = yaml.safe_load(state_file)
+        if not isinstance(state, dict) or not state.get("outputs"):
+            return False
+        return bool(state == self._get_state(manifest_path, state["outputs"]))
+
+    def _prepare_album(self, manifest_path: pathlib.Path) -> bool:
+        """Set up the audio source and release information for the given manifest's album.
+
+        Returns:
+            False if the album is to be skipped, because it's up to date.
+        """
+        from audiolibrarian import audiosource  # noqa: PLC0415
+
+        self._audio_source = audiosource.FilesAudioSource([manifest_path.parent])
+        if self._incremental and self._is_up_to_date(manifest_path):
+            print("Up to date; skipping")
+            return False
+        manifest = self._read_manifest(manifest_path)
+        self._disc_number, self._disc_count = manifest["disc_number"], manifest["disc_count"]
+        self._get_tag_info()
+        return True
+
+    def _reconvert_album(self, manifest_path: pathlib.Path) -> None:
+        """Re-convert the prepared album; save its state if this is an incremental reconvert."""
+        import yaml  # noqa: PLC0415
+
+        outputs = self._convert(make_source=False)
+        if self._incremental:
+            state_path = manifest_path.parent / self._state_file
+            with state_path.open("w", encoding="utf-8") as state_file:
+                yaml.safe_dump(self._get_state(manifest_path, outputs), state_file)
+
+    def _reconvert_albums(self, manifest_paths: list[pathlib.Path], max_albums: int) -> None:
+        """Re-convert several albums at once.
+
+        Release information is fetched here, one album at a time, while the albums already
+        fetched are converted in the background. The conversion tasks of all the albums share
+        one pool of workers, so small albums don't leave CPUs idle. No more than max_albums are
+        in flight (being fetched or converted) at any time.
+        """
+        count = len(manifest_paths)
+        slots = threading.BoundedSemaphore(max_albums)
+        errors: list[BaseException] = []
+        _ = self._mb_session  # Made now, so all the copies share it (and its cache connection).
+
+        def done(manifest_path: pathlib.Path, future: concurrent.futures.Future[None]) -> None:
+            if (error := future.exception()) is not None:
+                errors.append(error)
+            else:
+                print(f"Finished: {manifest_path}")
+            slots.release()
+
+        with (
+            concurrent.futures.ThreadPoolExecutor() as self._executor,
+            concurrent.futures.ThreadPoolExecutor(max_albums) as albums,
+        ):
+            for i, manifest_path in enumerate(manifest_paths):
+                slots.acquire()
+                if errors:
+                    break
+                print(f"Processing {i + 1} of {count} ({i / count:.0%}): {manifest_path}...")
+                # Shares settings, lock, normalizer, MusicBrainz session and executor.
+                album = copy.copy(self)
+                if not album._prepare_album(manifest_path):  # noqa: SLF001
+                    slots.release()
+                    continue
+                future = albums.submit(album._reconvert_album, manifest_path)  # noqa: SLF001
+                future.add_done_callback(functools.partial(done, manifest_path))
+        self._executor = None
+        if errors:
+            raise errors[0]
 
     @staticmethod
     def validate_args(args: argparse.Namespace) -> bool:
         """Validate command line arguments."""
+        if args.albums < 1:
+            print("Invalid --albums specification; should be at least 1")
+            return False
         return _validate_directories_arg(args)
 
 
@@ -200,18 +410,13 @@ class Rename(_Command, base.Base):
         super().__init__(args, settings)
         self._source_is_cd = False
         print("Finding audio files...")
-        for audio_file in self._find_audio_files(args.directories):
-            filepath = audio_file.filepath
-            if audio_file.one_track.track is None:
-                log.warning("%s has no title", filepath)
+        for filepath, rename_path in self._find_files_to_rename(args.directories):
+            if rename_path is None:
+                log.warning("%s doesn't have the tags needed to name it", filepath)
                 continue
             depth = 3 if filepath.parent.name.startswith("disc") else 2
             old_name = filepath
-            new_name = (
-                filepath.parents[depth]
-                / audio_file.one_track.get_artist_album_disc_path()
-                / audio_file.one_track.track.get_filename(filepath.suffix)
-            )
+            new_name = filepath.parents[depth] / rename_path
             if old_name != new_name:
                 print(f"Renaming:\n  {old_name} -> \n  {new_name}")
                 if args.dry_run:
@@ -220,12 +425,16 @@ class Rename(_Command, base.Base):
                 new_parent = new_name.parent
                 new_parent.mkdir(parents=True, exist_ok=True)
                 old_name.rename(new_name)
+                self._library_index.move(old_name, new_name)
                 if not old_parent.samefile(new_parent):
-                    # Move the Manifest if it's the only file left.
-                    man = "Manifest.yaml"
-                    if [f.name for f in old_parent.glob("*")] == [man]:
-                        print(f"Renaming:\n  {old_parent / man} -> \n  {new_parent / man}")
-                        (old_parent / man).rename(new_parent / man)
+                    # Move the Manifest (and reconvert state) if they're the only files left.
+                    man = self._manifest_file
+                    names = {f.name for f in old_parent.glob("*")}
+                    if man in names and names <= {man, self._state_file}:
+                        for name in sorted(names):
+                            print(f"Renaming:\n  {old_parent / name} -> \n  {new_parent / name}")
+                            (old_parent / name).rename(new_parent / name)
+                        self._library_index.move(old_parent / man, new_parent / man)
                     for idx in range(depth):
                         if not list(old_name.parents[idx].glob("*")):
                             print(f"Removing: {old_name.parents[idx]}")
@@ -234,6 +443,145 @@ class Rename(_Command, base.Base):
             else:
                 log.debug("Not renaming %s", filepath)
 
+    def _find_files_to_rename(
+        self, directories: list[str | pathlib.Path]
+    ) -> Iterable[tuple[pathlib.Path, str | pathlib.Path | None]]:
+        """Yield the audio files in the given directories that may need to be renamed.
+
+        Each is yielded with the path, relative to the library, at which it belongs, according
+        to its tags (or None, if it can't be named). If the directories have been indexed, files
+        that are already named for their (indexed) tags are skipped; otherwise, only the tags
+        needed to name the files are read.
+        """
+        if (indexed_files := self._find_indexed_files(directories)) is not None:
+            for indexed_file in indexed_files:
+                path = indexed_file.path
+                depth = 3 if path.parent.name.startswith("disc") else 2
+                if path == path.parents[depth] / (indexed_file.rename_path or ""):
+                    log.debug("Not renaming %s", path)
+                    continue
+                yield path, indexed_file.rename_path
+            return
+        from audiolibrarian import audiofile, library  # noqa: PLC0415
+
+        for path in self._find_audio_paths(directories):
+            try:
+                fields = audiofile.AudioFile.read_fields(path, library.RENAME_FIELDS)
+            except FileNotFoundError:
+                continue
+            yield path, library.get_rename_path(fields, path.suffix)
+
+    @staticmethod
+    def validate_args(args: argparse.Namespace) -> bool:
+        """Validate command line arguments."""
+        return _validate_directories_arg(args)
+
+
+class Retag(_Command, base.Base):
+    """AudioLibrarian tool for re-tagging audio files with the latest MusicBrainz information.
+
+    This class performs all of its tasks on instantiation and provides no public members or
+    methods.
+    """
+
+    command = "retag"
+    help = "re-tag files with MusicBrainz data, without re-converting them"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directories", nargs="+", help="audio file directories")
+
+    def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
+        """Initialize a Retag command handler."""
+        from audiolibrarian import audiofile, musicbrainz  # noqa: PLC0415
+
+        super().__init__(args, settings)
+        self._source_is_cd = False
+        print("Finding audio files...")
+        # Keyed on release ID, then file path; the values are (medium number, track number).
+        releases: dict[str, dict[pathlib.Path, tuple[int, int]]] = collections.defaultdict(dict)
+        for filepath, release_id, medium_number, track_number in self._find_tracks(
+            args.directories
+        ):
+            if not release_id:
+                log.warning("%s has no MusicBrainz release ID", filepath)
+                continue
+            releases[release_id][filepath] = (medium_number or 1, track_number)
+        # Releases are fetched one at a time (we're rate-limited), while the files of the
+        # releases already fetched are tagged in the background.
+        with sh.Scheduler(f"Re-tagging {len(releases)} releases...") as scheduler:
+            for release_id, files in releases.items():
+                release = musicbrainz.MusicBrainzRelease(
+                    release_id=release_id, settings=settings.musicbrainz, session=self._mb_session
+                ).get_release()
+                # The tags shared by the tracks of each medium are prepared once (per format).
+                release_tags: dict[int, audiofile.ReleaseTags] = {}
+                for filepath, (medium_number, track_number) in files.items():
+                    medium = (release.media or {}).get(medium_number)
+                    if medium is None or track_number not in (medium.tracks or {}):
+                        log.warning("%s is not on release %s", filepath, release_id)
+                        continue
+                    one_track = records.OneTrack(
+                        release=release, medium_number=medium_number, track_number=track_number
+                    )
+                    if medium_number not in release_tags:
+                        release_tags[medium_number] = audiofile.ReleaseTags(release, medium_number)
+                    scheduler.add(
+                        str(filepath),
+                        functools.partial(
+                            self._retag_file,
+                            filepath,
+                            one_track,
+                            release_tags[medium_number],
+                            padding=settings.tags.padding,
+                        ),
+                    )
+
+    def _find_tracks(
+        self, directories: list[str | pathlib.Path]
+    ) -> Iterable[tuple[pathlib.Path, str | None, int | None, int | None]]:
+        """Yield (path, release ID, medium number, track number) for the audio files found.
+
+        If the directories have been indexed, the information comes from the index; otherwise,
+        only the tags needed are read.
+        """
+        if (indexed_files := self._find_indexed_files(directories)) is not None:
+            for indexed_file in indexed_files:
+                yield (
+                    indexed_file.path,
+                    indexed_file.musicbrainz_release_id,
+                    indexed_file.medium_number,
+                    indexed_file.track_number,
+                )
+            return
+        from audiolibrarian import audiofile  # noqa: PLC0415
+
+        wanted = {"medium_number", "musicbrainz_album_id", "track_number"}
+        for path in self._find_audio_paths(directories):
+            try:
+                fields = audiofile.AudioFile.read_fields(path, wanted)
+            except FileNotFoundError:
+                continue
+            yield (
+                path,
+                fields.get("musicbrainz_album_id"),
+                fields.get("medium_number"),
+                fields.get("track_number"),
+            )
+
+    @staticmethod
+    def _retag_file(
+        filepath: pathlib.Path,
+        one_track: records.OneTrack,
+        release_tags: audiofile.ReleaseTags | None = None,
+        *,
+        padding: int,
+    ) -> None:
+        """Write the tags of the given track to the given file."""
+        from audiolibrarian import audiofile  # noqa: PLC0415
+
+        song = audiofile.AudioFile.open(filepath, padding=padding)
+        song.one_track = one_track
+        song.write_tags(release_tags)
+
     @staticmethod
     def validate_args(args: argparse.Namespace) -> bool:
         """Validate command line arguments."""
@@ -249,6 +597,7 @@ class Rip(_Command, base.Base):
 
     command = "rip"
     help = "rip music from a CD"
+    executables = frozenset({"cd-paranoia", "eject"}) | _ENCODE_EXE
     parser = argparse.ArgumentParser()
     parser.add_argument("--artist", "-a", help="provide artist")
     parser.add_argument("--album", "-m", help="provide album")
@@ -258,6 +607,8 @@ class Rip(_Command, base.Base):
 
     def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
         """Initialize a Rip command handler."""
+        from audiolibrarian import audiosource  # noqa: PLC0415
+
         super().__init__(args, settings)
         self._source_is_cd = True
         self._audio_source = audiosource.CDAudioSource(settings)
@@ -276,14 +627,115 @@ class Version(_Command):
 
     command = "version"
     help = "display the program version"
+    uses_settings = False
 
-    def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
+    def __init__(self, args: argparse.Namespace, settings: config.Settings | None) -> None:
         """Initialize a Version command handler."""
+        from audiolibrarian import __version__  # noqa: PLC0415
+
         _, _ = args, settings
         del args, settings  # Unused.
         print(f"audiolibrarian {__version__}")
 
 
+class Watch(_Command, base.Base):
+    """AudioLibrarian tool for converting and tagging albums as they're added to a drop folder.
+
+    This class performs all of its tasks on instantiation and provides no public members or
+    methods.
+    """
+
+    command = "watch"
+    help = "convert albums as they're added to a drop folder"
+    parser = argparse.ArgumentParser(
+        description=(
+            "Watch the given drop folder, converting each album (subdirectory) once it has been "
+            "completely copied there. Nothing is asked of the user; albums that are converted are "
+            "moved to the folder's .done directory, and albums that need attention to .failed."
+        )
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=30,
+        metavar="SECONDS",
+        help="convert albums once they've been unchanged for this long (default: 30)",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=10,
+        metavar="SECONDS",
+        help="how often to look for changes, when inotify isn't available (default: 10)",
+    )
+    parser.add_argument("directory", help="drop folder")
+    executables = _DECODE_EXE | _ENCODE_EXE
+
+    def __init__(self, args: argparse.Namespace, settings: config.Settings) -> None:
+        """Initialize a Watch command handler."""
+        from audiolibrarian import watch  # noqa: PLC0415
+
+        super().__init__(args, settings)
+        self._source_is_cd = False
+        drop_dir = pathlib.Path(args.directory)
+        tracker = watch.AlbumTracker(drop_dir, settle=args.settle)
+        with watch.Watcher(drop_dir, poll_interval=args.poll) as watcher:
+            print(f"Watching {drop_dir}{'' if watcher.uses_inotify else ' (polling)'}...")
+            try:
+                while True:
+                    for album_dir in tracker.check():
+                        if not self._import_album(album_dir):
+                            tracker.skip(album_dir)  # Until it changes; we'd only fail again.
+                    watcher.wait(timeout=tracker.next_check())
+            except KeyboardInterrupt:
+                print("Stopped watching")
+
+    def _import_album(self, album_dir: pathlib.Path) -> bool:
+        """Convert the album in the given directory, then move it out of the drop folder.
+
+        Everything but the audio source (settings, normalizer, MusicBrainz session and caches)
+        is shared by all the albums. The album is moved to the drop folder's .done directory, or
+        to its .failed directory if it couldn't be converted without asking the user something.
+
+        Returns:
+            True if the album was moved out of the drop folder (False if it was left in place).
+        """
+        from audiolibrarian import audiosource  # noqa: PLC0415
+
+        print(f"Importing {album_dir}...")
+        self._audio_source = audiosource.FilesAudioSource([album_dir])
+        self._disc_number, self._disc_count = 1, 1
+        try:
+            with text.non_interactive():
+                self._get_tag_info()
+                self._convert()
+                self._write_manifest()
+        except Exception:
+            log.exception("Unable to import %s", album_dir)
+            destination = album_dir.parent / ".failed"
+        else:
+            destination = album_dir.parent / ".done"
+        try:
+            destination.mkdir(exist_ok=True)
+            destination /= album_dir.name
+            if destination.exists():
+                destination = destination.with_name(f"{album_dir.name}.{time.time_ns()}")
+            shutil.move(album_dir, destination)
+        except OSError:
+            log.exception("Unable to move %s to %s", album_dir, destination)
+            return False
+        print(f"Moved {album_dir} -> {destination}")
+        return True
+
+    @staticmethod
+    def validate_args(args: argparse.Namespace) -> bool:
+        """Validate command line arguments."""
+        if args.settle < 0 or args.poll <= 0:
+            print("Invalid --settle or --poll specification; should be positive")
+            return False
+        return _validate_directories_arg(argparse.Namespace(directories=[args.directory]))
+
+
 def _validate_directories_arg(args: argparse.Namespace) -> bool:
     for directory in args.directories:
         if not pathlib.Path(directory).is_dir():
@@ -304,4 +756,16 @@ def _validate_disc_arg(args: argparse.Namespace) -> bool:
     return True
 
 
-COMMANDS: set[Any] = {Config, Convert, Genre, Manifest, Reconvert, Rename, Rip, Version}
+COMMANDS: set[Any] = {
+    Config,
+    Convert,
+    Genre,
+    Index,
+    Manifest,
+    Reconvert,
+    Rename,
+    Retag,
+    Rip,
+    Version,
+    Watch,
+}
@@ -62,12 +62,31 @@ class EmptySettings(pydantic.BaseModel):
     """Empty settings."""
 
 
+class MusicBrainzCacheSettings(pydantic.BaseModel):
+    """Configuration settings for the MusicBrainz response cache."""
+
+    enabled: bool = True
+    offline: bool = False  # Only use cached responses; never call MusicBrainz.
+    max_size: pydantic.PositiveInt = 256  # MiB.
+    # Days before each kind of response expires.
+    artist_ttl: pydantic.NonNegativeFloat = 7
+    cover_ttl: pydantic.NonNegativeFloat = 90
+    disc_ttl: pydantic.NonNegativeFloat = 30
+    genre_ttl: pydantic.NonNegativeFloat = 30
+    release_ttl: pydantic.NonNegativeFloat = 30
+    release_group_ttl: pydantic.NonNegativeFloat = 7
+    search_ttl: pydantic.NonNegativeFloat = 1
+
+
 class MusicBrainzSettings(pydantic.BaseModel):
     """Configuration settings for MusicBrainz."""
 
+    cache: MusicBrainzCacheSettings = MusicBrainzCacheSettings()
     password: pydantic.SecretStr = pydantic.SecretStr("")
     username: str = ""
     rate_limit: pydantic.PositiveFloat = 1.5  # Seconds between requests.
+    max_retries: pydantic.NonNegativeInt = 5  # Retries of a throttled request.
+    max_backoff: pydantic.PositiveFloat = 60  # Maximum seconds between retries.
     work_dir: ExpandedPath = xdg_base_dirs.xdg_cache_home() / "audiolibrarian"
 
 
@@ -92,6 +111,13 @@ class NormalizeSettings(pydantic.BaseModel):
     wavegain: NormalizeWavegainSettings = NormalizeWavegainSettings()
 
 
+class TagsSettings(pydantic.BaseModel):
+    """Configuration settings for writing tags."""
+
+    # Bytes reserved after the tags, so they can be changed without rewriting the whole file.
+    padding: pydantic.NonNegativeInt = 8192
+
+
 class Settings(pydantic_settings.BaseSettings):
     """Configuration settings for AudioLibrarian."""
 
@@ -99,6 +125,7 @@ class Settings(pydantic_settings.BaseSettings):
     library_dir: ExpandedPath = pathlib.Path("library").resolve()
     musicbrainz: MusicBrainzSettings = MusicBrainzSettings()
     normalize: NormalizeSettings = NormalizeSettings()
+    tags: TagsSettings = TagsSettings()
     work_dir: ExpandedPath = xdg_base_dirs.xdg_cache_home() / "audiolibrarian"
 
     model_config = pydantic_settings.SettingsConfigDict(
@@ -19,11 +19,11 @@
 import argparse
 import logging
 import pathlib
-import subprocess
+import shutil
 import sys
-from typing import Final
+from collections.abc import Iterable
 
-from audiolibrarian import commands, config
+from audiolibrarian import commands
 
 log = logging.getLogger("audiolibrarian")
 
@@ -31,17 +31,6 @@ log = logging.getLogger("audiolibrarian")
 class CommandLineInterface:
     """Command line interface."""
 
-    _REQUIRED_EXE: Final[set[str]] = {
-        "cd-paranoia",
-        "eject",
-        "faad",
-        "fdkaac",
-        "flac",
-        "lame",
-        "mpg123",
-        "sndfile-convert",
-    }
-
     def __init__(self, *, parse_args: bool = True) -> None:
         """Initialize a CommandLineInterface handler."""
         if parse_args:
@@ -51,34 +40,29 @@ class CommandLineInterface:
     def execute(self) -> None:
         """Execute the command."""
         log.info("ARGS: %s", self._args)
-        if not self._check_deps():
-            sys.exit(1)
         for cmd in commands.COMMANDS:
             if self._args.command == cmd.command:
+                if not self._check_deps(cmd.executables):
+                    sys.exit(1)
                 if not cmd.validate_args(self._args):
                     sys.exit(2)
-                cmd(self._args, config.Settings())
+                settings = None
+                if cmd.uses_settings:
+                    from audiolibrarian import config  # noqa: PLC0415
+
+                    settings = config.Settings()
+                cmd(self._args, settings)
                 break
         if self._args.log_level == logging.DEBUG:
             print(pathlib.Path("/proc/self/status").read_text(encoding="utf-8"))
 
-    def _check_deps(self) -> bool:
-        """Check that all the executables defined in REQUIRED_EXE exist on the system.
+    @staticmethod
+    def _check_deps(executables: Iterable[str]) -> bool:
+        """Check that the given executables (those the command needs) exist on the system.
 
         If any of the required executables are missing, list them and return False.
         """
-        missing = []
-        for exe in self._REQUIRED_EXE:
-            try:
-                subprocess.run(  # noqa: S602
-                    f"command -v {exe}",
-                    shell=True,
-                    stdout=subprocess.DEVNULL,
-                    stderr=subprocess.DEVNULL,
-                    check=True,
-                )
-            except subprocess.CalledProcessError:
-                missing.append(exe)
+        missing = sorted(exe for exe in executables if shutil.which(exe) is None)
         if missing:
             print(f"\nMissing required executable(s): {', '.join(missing)}\n")
             return False
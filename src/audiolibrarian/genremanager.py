@@ -17,33 +17,57 @@
 #  If not, see <https://www.gnu.org/licenses/>.
 #
 import argparse
+import concurrent.futures
+import functools
+import json
 import logging
+import multiprocessing
 import pathlib
-import pickle
-import typing
 import webbrowser
-from typing import Any
+from typing import Any, Final
 
 import mutagen
-import mutagen.flac
-import mutagen.id3
-import mutagen.mp4
 
-from audiolibrarian import config, musicbrainz, text
+from audiolibrarian import audiofile, config, library, musicbrainz, text
 
 log = logging.getLogger(__name__)
 
+_ARTIST_IDS: Final[str] = "genre-artist-ids.json"  # Artist IDs of unindexed files.
+_TAG_BATCH_SIZE: Final[int] = 64  # Files tagged by a worker process at a time.
+_TAG_JOURNAL: Final[str] = "genre-tag-journal.jsonl"  # Progress of `genre --tag`.
+
 
 class GenreManager:
     """Manage genres."""
 
-    def __init__(self, args: argparse.Namespace, settings: config.MusicBrainzSettings) -> None:
-        """Initialize a GenreManager instance."""
+    def __init__(
+        self,
+        args: argparse.Namespace,
+        settings: config.MusicBrainzSettings,
+        library_index: library.LibraryIndex | None = None,
+        padding: int = audiofile.DEFAULT_PADDING,
+    ) -> None:
+        """Initialize a GenreManager instance.
+
+        If a library index is given, and the directories have been indexed, audio files and their
+        artists are found in it, after it's brought up to date (reading only new and changed
+        files); so, on an unchanged library, no audio files are read at all. Otherwise, the
+        artist-ID tags of new and changed audio files are read (see `_get_paths_by_artist`).
+
+        Genre tags are updated in place when they fit; otherwise, files are rewritten with the
+        given number of bytes of padding after the tags.
+        """
         self._args = args
         self._settings = settings
+        self._padding = padding
         self._mb = musicbrainz.MusicBrainzSession(settings=settings)
-        self._paths = self._get_all_paths()
-        self._paths_by_artist = self._get_paths_by_artist()
+        # The genre of each file, where it's known without reading the file.
+        self._genre_by_path: dict[pathlib.Path, str | None] = {}
+        if library_index is not None and library_index.is_indexed(args.directory):
+            library_index.update(args.directory)  # Only new and changed files are read.
+            self._paths_by_artist = self._get_indexed_paths_by_artist(library_index)
+        else:
+            self._paths_by_artist = self._get_paths_by_artist()
         _u, _c = self._get_genres_by_artist()
         self._user_genres_by_artist, self._community_genres_by_artist = _u, _c
         if self._args.update:
@@ -51,36 +75,50 @@ class GenreManager:
         elif self._args.tag:
             self._update_tags()
 
-    @typing.no_type_check  # The mutagen library doesn't provide type hints.
     def _update_tags(self) -> None:
-        """Set the genre tags for all songs to the user-based genre."""
+        """Set the genre tags for all songs to the user-based genre.
+
+        Files are tagged in batches by a pool of worker processes. Each file that's done is
+        recorded in a journal in the work directory, so an interrupted run picks up where it
+        stopped; files that have changed since they were recorded are done again.
+        """
+        journal_path = self._settings.work_dir / _TAG_JOURNAL
+        if todo := self._find_files_to_tag(_read_journal(journal_path)):
+            batches = [todo[i : i + _TAG_BATCH_SIZE] for i in range(0, len(todo), _TAG_BATCH_SIZE)]
+            journal_path.parent.mkdir(parents=True, exist_ok=True)
+            with (
+                journal_path.open("a", encoding="utf-8") as journal,
+                # Workers are spawned, rather than forked, as we may have threads running.
+                multiprocessing.get_context("spawn").Pool() as pool,
+            ):
+                tag_files = functools.partial(_tag_files, padding=self._padding)
+                for results in pool.imap_unordered(tag_files, batches):
+                    for filename, genre, old_genre, mtime_ns in results:
+                        if mtime_ns is None:
+                            continue  # It couldn't be tagged.
+                        if old_genre != genre:
+                            print(f"{filename}: {old_genre} --> {genre}")
+                        journal.write(json.dumps([filename, genre, mtime_ns]) + "\n")
+                    journal.flush()
+        journal_path.unlink(missing_ok=True)  # Finished; the next run starts from the top.
+
+    def _find_files_to_tag(self, done: dict[str, tuple[str, int]]) -> list[tuple[str, str]]:
+        """Return (path, genre) for the files that may need their genre tags set.
+
+        Files known (from the index) to have the genre already, and files recorded in the
+        journal (`done`) as tagged with the genre, and unchanged since, are left out.
+        """
+        todo = []
         for artist_id, paths in self._paths_by_artist.items():
-            genre = self._user_genres_by_artist.get(artist_id)
-            if not genre:
+            if not (genre := self._user_genres_by_artist.get(artist_id)):
                 continue
             for path in paths:
-                if path.suffix == ".flac":
-                    flac_song = mutagen.flac.FLAC(str(path))
-                    current_genre = flac_song.tags["genre"][0]
-                    if current_genre != genre:
-                        flac_song.tags["genre"] = genre
-                        flac_song.save()
-                        print(f"{path}: {current_genre} --> {genre}")
-                elif path.suffix == ".m4a":
-                    m4a_song = mutagen.mp4.MP4(str(path))
-                    current_genre = m4a_song.tags["\xa9gen"][0]
-                    if current_genre != genre:
-                        m4a_song.tags["\xa9gen"] = genre
-                        m4a_song.save()
-                        print(f"{path}: {current_genre} --> {genre}")
-                elif path.suffix == ".mp3":
-                    mp3_song = mutagen.File(str(path))
-                    current_genre = str(mp3_song.tags["TCON"])
-                    if current_genre != genre:
-                        id3 = mutagen.id3.ID3(str(path))
-                        id3.add(mutagen.id3.TCON(encoding=3, text=genre))
-                        id3.save()
-                        print(f"{path}: {current_genre} --> {genre}")
+                if self._genre_by_path.get(path) == genre:
+                    continue
+                recorded = done.get(str(path))
+                if recorded is None or recorded != (genre, _get_mtime_ns(path)):
+                    todo.append((str(path), genre))
+        return todo
 
     def _update_user_artists(self) -> None:
         """Pull up a web page to allow the user to set the genre.
@@ -102,38 +140,60 @@ class GenreManager:
             if i != "s":
                 webbrowser.open(f"https://musicbrainz.org/artist/{artist_id}/tags")
 
-    def _get_all_paths(self) -> list[pathlib.Path]:
-        """Return a list of paths for all files in the directories specified in the args."""
-        paths = []
-        for directory in self._args.directory:
-            paths.extend([p for p in list(pathlib.Path(directory).glob("**/*")) if p.is_file()])
-        return paths
+    def _get_indexed_paths_by_artist(
+        self, library_index: library.LibraryIndex
+    ) -> dict[str, list[pathlib.Path]]:
+        """Return a map of artist-IDs to paths representing indexed audio files by that artist."""
+        artists: dict[str, list[pathlib.Path]] = {}
+        for indexed_file in library_index.files(self._args.directory):
+            if artist_id := indexed_file.artist_id:
+                artists.setdefault(artist_id, []).append(indexed_file.path)
+                self._genre_by_path[indexed_file.path] = indexed_file.genre
+        return artists
 
     def _get_paths_by_artist(self) -> dict[str, list[pathlib.Path]]:
-        """Return a map of artist-IDs to paths representing audio files by that artist."""
+        """Return a map of artist-IDs to paths representing audio files by that artist.
+
+        Only the artist-ID tags of the audio files are read, by a pool of threads. They're kept
+        in the work directory, with the size and modification time of each file; so, files that
+        haven't changed since the last run aren't read again.
+        """
+        extensions = audiofile.AudioFile.extensions()
+        directories = [pathlib.Path(d) for d in self._args.directory]
+        paths = [
+            path
+            for directory in directories
+            for path in sorted(directory.glob("**/*"))
+            if path.suffix in extensions and path.is_file()
+        ]
+        ids_path = self._settings.work_dir / _ARTIST_IDS
+        known = _read_artist_ids(ids_path)
+        # Entries for files in other directories are kept; those for files here are replaced.
+        entries = {
+            path: entry
+            for path, entry in known.items()
+            if not any(pathlib.Path(path).is_relative_to(d) for d in directories)
+        }
+        todo: list[tuple[pathlib.Path, list[int]]] = []
+        for path in paths:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            signature = [stat.st_size, stat.st_mtime_ns]
+            if (entry := known.get(str(path))) is not None and entry[:2] == signature:
+                entries[str(path)] = entry
+            else:
+                todo.append((path, signature))
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            artist_ids = executor.map(_read_artist_id, [path for path, _ in todo])
+            for (path, signature), artist_id in zip(todo, artist_ids, strict=True):
+                entries[str(path)] = [*signature, artist_id]
+        _write_artist_ids(ids_path, entries)
         artists: dict[str, list[pathlib.Path]] = {}
-        for path in self._paths:
-            artist_id = None
-            song = mutagen.File(str(path))
-            if path.suffix == ".flac":
-                artist_id = str(
-                    song.tags.get("musicbrainz_albumartistid", [""])[0]
-                    or song.tags.get("musicbrainz_artistid", [""])[0]
-                )
-            elif path.suffix == ".m4a":
-                artist_id = (
-                    song.tags.get("----:com.apple.iTunes:MusicBrainz Album Artist Id", [""])[0]
-                    or song.tags.get("----:com.apple.iTunes:MusicBrainz Artist Id", [""])[0]
-                ).decode("utf8")
-            elif path.suffix == ".mp3":
-                artist_id = str(
-                    song.tags.get("TXXX:MusicBrainz Album Artist Id", [""])[0]
-                    or song.tags.get("TXXX:MusicBrainz Artist Id", [""])[0]
-                )
-            if artist_id:
-                if artist_id not in artists:
-                    artists[artist_id] = []
-                artists[artist_id].append(path)
+        for path in paths:
+            if (entry := entries.get(str(path))) and (artist_id := entry[2]):
+                artists.setdefault(artist_id, []).append(path)
         return artists
 
     def _get_genres_by_artist(
@@ -141,6 +201,12 @@ class GenreManager:
     ) -> tuple[dict[str, str], dict[str, dict[str, Any]]]:
         """Return two dicts mapping MusicBrainz-artist-ID to user and community.
 
+        The genres of each artist, including artists with no genres at all, are kept in the
+        MusicBrainz cache until they expire; so, repeat runs don't call MusicBrainz for known
+        artists. The others are fetched in batches, unless we're logged in (see
+        `MusicBrainzSession.get_artists_genres`). With the `refresh` argument, they're all
+        fetched again.
+
         Returns:
           user: a single genre, set in MusicBrainz by this app's user
           community: a list genre records (dicts) set in MusicBrainz by the community
@@ -148,29 +214,89 @@ class GenreManager:
         """
         user: dict[str, str] = {}
         community: dict[str, dict[str, Any]] = {}
-        user_modified = False
-        cache_file = self._settings.work_dir / "user-genres.pkl"
-        if cache_file.exists():
-            with cache_file.open(mode="rb") as cache_file_obj:
-                user = pickle.load(cache_file_obj)  # noqa: S301
-        for artist_id in self._paths_by_artist:
-            if artist_id in user:
-                log.debug("Cache hit: %s %s", artist_id, user[artist_id])
-                continue  # Already in the cache.
-            artist = self._mb.get_artist_by_id(artist_id, includes=["genres", "user-genres"])
+        artists = self._mb.get_artists_genres(self._paths_by_artist, refresh=self._args.refresh)
+        for artist_id, artist in artists.items():
             if artist["user-genres"]:
-                genre = artist["user-genres"][0]["name"].title()
-                user[artist_id] = genre
-                user_modified = True
+                user[artist_id] = artist["user-genres"][0].title()
             elif artist["genres"]:
-                community[artist_id] = {
-                    "name": artist["name"],
-                    "genres": [{"name": x["name"], "count": x["count"]} for x in artist["genres"]],
-                }
-        if user_modified:
-            cache_file.parent.mkdir(exist_ok=True)
-            with cache_file.open(mode="wb") as cache_file_obj:
-                # noinspection PyTypeChecker
-                pickle.dump(user, cache_file_obj)
-
+                community[artist_id] = {"name": artist["name"], "genres": artist["genres"]}
         return user, community
+
+
+def _get_mtime_ns(path: pathlib.Path) -> int | None:
+    # Return the modification time of the file (or None, if it's gone).
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_artist_id(path: pathlib.Path) -> str | None:
+    # Return the MusicBrainz album-artist ID of the file, or its artist ID if it hasn't one.
+    fields = {"musicbrainz_album_artist_ids", "musicbrainz_artist_ids"}
+    try:
+        values = audiofile.AudioFile.read_fields(path, fields)
+    except (OSError, mutagen.MutagenError) as err:
+        log.warning("Unable to read %s: %s", path, err)
+        return None
+    ids: list[str] = values.get("musicbrainz_album_artist_ids") or values.get(
+        "musicbrainz_artist_ids", []
+    )
+    return ids[0] if ids else None
+
+
+def _read_artist_ids(path: pathlib.Path) -> dict[str, list[Any]]:
+    # Return the [size, modification time, artist ID] of each file recorded by the last scans.
+    try:
+        with path.open(encoding="utf-8") as ids_file:
+            entries = json.load(ids_file)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_artist_ids(path: pathlib.Path, entries: dict[str, list[Any]]) -> None:
+    # Save the [size, modification time, artist ID] of each file, replacing the file in one go.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with temp_path.open("w", encoding="utf-8") as ids_file:
+        json.dump(entries, ids_file)
+    temp_path.replace(path)
+
+
+def _read_journal(journal_path: pathlib.Path) -> dict[str, tuple[str, int]]:
+    # Return the (genre, modification time) of each file recorded in the tagging journal.
+    done: dict[str, tuple[str, int]] = {}
+    if not journal_path.exists():
+        return done
+    with journal_path.open(encoding="utf-8") as journal:
+        for line in journal:
+            try:
+                path, genre, mtime_ns = json.loads(line)
+            except ValueError:
+                continue  # A partly-written line, from an interrupted run.
+            done[path] = (genre, mtime_ns)
+    log.info("Resuming; %d files were already tagged", len(done))
+    return done
+
+
+def _tag_files(
+    batch: list[tuple[str, str]], padding: int
+) -> list[tuple[str, str, str | None, int | None]]:
+    # Set the genre tag of each (path, genre) in the batch, if it isn't already set; run in a
+    # worker process. Return (path, genre, old genre, modification time) for each file; the
+    # modification time is None if the file couldn't be tagged.
+    results: list[tuple[str, str, str | None, int | None]] = []
+    for path, genre in batch:
+        try:
+            old_genres = audiofile.AudioFile.read_fields(path, {"genres"}).get("genres", [])
+            old_genre = old_genres[0] if old_genres else None
+            if old_genre != genre:
+                audiofile.AudioFile.write_fields(path, {"genres": [genre]}, padding=padding)
+            mtime_ns = pathlib.Path(path).stat().st_mtime_ns
+        except (OSError, NotImplementedError, mutagen.MutagenError) as err:
+            log.warning("Unable to tag %s: %s", path, err)
+            results.append((path, genre, None, None))
+            continue
+        results.append((path, genre, old_genre, mtime_ns))
+    return results
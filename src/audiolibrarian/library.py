@@ -0,0 +1,477 @@
+"""A persistent index of the audio files and manifests in the library."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+#
+import collections
+import concurrent.futures
+import dataclasses
+import json
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any, Final
+
+import mutagen
+import yaml
+
+from audiolibrarian import audiofile, records
+
+log = logging.getLogger(__name__)
+
+MANIFEST_FILE: Final[str] = "Manifest.yaml"
+# The fields of an audio file needed to name it (see `get_rename_path`).
+RENAME_FIELDS: Final[frozenset[str]] = frozenset(
+    {
+        "album",
+        "album_artists_sort",
+        "medium_count",
+        "medium_number",
+        "original_year",
+        "title",
+        "track_number",
+    }
+)
+_INDEXED_FIELDS: Final[frozenset[str]] = RENAME_FIELDS | {
+    "album_artists",
+    "artist",
+    "bitrate",
+    "genres",
+    "musicbrainz_album_artist_ids",
+    "musicbrainz_album_id",
+    "musicbrainz_artist_ids",
+    "musicbrainz_release_group_id",
+    "musicbrainz_track_id",
+}
+type _Stat = tuple[int, int, int]  # (size, mtime_ns, inode)
+
+
+@dataclasses.dataclass(frozen=True, kw_only=True)
+class IndexedFile:
+    """An audio file, as it was when it was indexed."""
+
+    path: pathlib.Path
+    size: int
+    mtime_ns: int
+    inode: int
+    format: str  # The file extension, without the dot.
+    bitrate: int | None = None
+    album: str | None = None
+    album_artist: str | None = None
+    artist: str | None = None
+    title: str | None = None
+    genre: str | None = None
+    medium_number: int | None = None
+    track_number: int | None = None
+    musicbrainz_album_artist_id: str | None = None
+    musicbrainz_artist_id: str | None = None
+    musicbrainz_release_group_id: str | None = None
+    musicbrainz_release_id: str | None = None
+    musicbrainz_track_id: str | None = None
+    rename_path: str | None = None  # Artist/album/disc/track path that Rename would give it.
+
+    @property
+    def artist_id(self) -> str | None:
+        """Return the MusicBrainz album-artist ID, or the artist ID if there isn't one."""
+        return self.musicbrainz_album_artist_id or self.musicbrainz_artist_id
+
+
+@dataclasses.dataclass(kw_only=True)
+class UpdateStats:
+    """What an update of the index found."""
+
+    files: int = 0  # Audio files and manifests found.
+    read: int = 0  # New or changed files that were read.
+    removed: int = 0  # Files that no longer exist, and were removed from the index.
+
+
+class LibraryIndex:
+    """An index of audio files and manifests, kept in an SQLite database in the work directory.
+
+    The index holds the tags and file information that the library-wide commands need, so they
+    can query it rather than finding and reading every file. It's only as current as its last
+    update, for each of the directories (roots) that have been indexed.
+
+    The database may be shared by any number of threads and processes.
+    """
+
+    _schema: Final[str] = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            format TEXT NOT NULL,
+            bitrate INTEGER,
+            album TEXT,
+            album_artist TEXT,
+            artist TEXT,
+            title TEXT,
+            genre TEXT,
+            medium_number INTEGER,
+            track_number INTEGER,
+            musicbrainz_album_artist_id TEXT,
+            musicbrainz_artist_id TEXT,
+            musicbrainz_release_group_id TEXT,
+            musicbrainz_release_id TEXT,
+            musicbrainz_track_id TEXT,
+            rename_path TEXT
+        );
+        CREATE INDEX IF NOT EXISTS files_artist ON files (musicbrainz_album_artist_id);
+        CREATE INDEX IF NOT EXISTS files_release ON files (musicbrainz_release_id);
+        CREATE TABLE IF NOT EXISTS manifests (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            musicbrainz_release_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS directories (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS roots (
+            path TEXT PRIMARY KEY,
+            indexed REAL NOT NULL
+        );
+    """
+    _file_columns: Final[tuple[str, ...]] = tuple(f.name for f in dataclasses.fields(IndexedFile))
+
+    def __init__(self, work_dir: pathlib.Path) -> None:
+        """Initialize a LibraryIndex, creating the database if needed.
+
+        Args:
+            work_dir: The directory in which the database (library-index.sqlite) is kept
+        """
+        self._lock = threading.Lock()
+        work_dir.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            work_dir / "library-index.sqlite",
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(self._schema)
+
+    def __del__(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def files(self, directories: Iterable[str | pathlib.Path]) -> list[IndexedFile]:
+        """Return the indexed audio files in the given directories, sorted by path."""
+        columns = ", ".join(self._file_columns)
+        files = [
+            IndexedFile(**{**dict(zip(self._file_columns, row, strict=True)), "path": path})
+            for path, row in self._select("files", columns, directories)
+        ]
+        return sorted(files, key=lambda f: f.path)
+
+    def is_indexed(self, directories: Iterable[str | pathlib.Path]) -> bool:
+        """Return True if all of the given directories are within directories that were indexed."""
+        with self._lock:
+            roots = [
+                pathlib.Path(r) for (r,) in self._connection.execute("SELECT path FROM roots")
+            ]
+        return all(
+            any(path.is_relative_to(root) for root in roots) for path in _resolve(directories)
+        )
+
+    def manifests(self, directories: Iterable[str | pathlib.Path]) -> list[pathlib.Path]:
+        """Return the paths of the indexed manifests in the given directories, sorted."""
+        return sorted(path for path, _ in self._select("manifests", "path", directories))
+
+    def move(self, old_path: pathlib.Path, new_path: pathlib.Path) -> None:
+        """Record that an indexed file (audio file or manifest) has been moved."""
+        old, new = str(old_path.resolve()), str(new_path.resolve())
+        with self._lock:
+            for table in ("files", "manifests"):
+                query = f"UPDATE {table} SET path = ? WHERE path = ?"  # noqa: S608
+                self._connection.execute(query, (new, old))
+
+    def update(
+        self, directories: Iterable[str | pathlib.Path], *, quick: bool = False
+    ) -> UpdateStats:
+        """Bring the index up to date with the audio files and manifests in the given directories.
+
+        Only new files, and files whose size, modification time or inode have changed, are read;
+        entries for files that no longer exist are removed.
+
+        Args:
+            directories: The directories to index
+            quick: If True, directories whose own modification time hasn't changed (so nothing
+                has been added to, removed from, or renamed in them) aren't listed, and their
+                files aren't checked; much faster, but files changed in place are missed
+        """
+        stats = UpdateStats()
+        for root in _resolve(directories):
+            known = {table: self._get_stats(table, root) for table in ("files", "manifests")}
+            found, directory_mtimes = self._scan(root, known, quick=quick)
+            changed = {
+                table: sorted(p for p, stat in found[table].items() if known[table].get(p) != stat)
+                for table in found
+            }
+            removed = {
+                table: [p for p in known[table] if p not in found[table]] for table in known
+            }
+            # Reading is mostly waiting for storage, so files are read by a pool of threads.
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                file_rows = [
+                    row
+                    for row in executor.map(self._read_file, map(pathlib.Path, changed["files"]))
+                    if row
+                ]
+            manifest_rows = [
+                row for p in changed["manifests"] if (row := self._read_manifest(pathlib.Path(p)))
+            ]
+            self._save(root, file_rows, manifest_rows, removed, directory_mtimes)
+            stats.files += sum(len(paths) for paths in found.values())
+            stats.read += len(file_rows) + len(manifest_rows)
+            stats.removed += sum(len(paths) for paths in removed.values())
+        return stats
+
+    def _get_directory_mtimes(self, root: pathlib.Path) -> dict[str, int]:
+        # Return the modification times of the root and the directories within it, when scanned.
+        with self._lock:
+            query = (
+                "SELECT path, mtime_ns FROM directories WHERE path = ? OR path > ? AND path < ?"
+            )
+            return dict(self._connection.execute(query, (str(root), *_path_range(root))))
+
+    def _get_stats(self, table: str, root: pathlib.Path) -> dict[str, _Stat]:
+        # Return the (size, mtime_ns, inode) of the files indexed within the root.
+        query = f"SELECT path, size, mtime_ns, inode FROM {table} WHERE path > ? AND path < ?"  # noqa: S608
+        with self._lock:
+            return {
+                path: (size, mtime_ns, inode)
+                for path, size, mtime_ns, inode in self._connection.execute(
+                    query, _path_range(root)
+                )
+            }
+
+    def _save(
+        self,
+        root: pathlib.Path,
+        file_rows: list[tuple[Any, ...]],
+        manifest_rows: list[tuple[Any, ...]],
+        removed: dict[str, list[str]],
+        directory_mtimes: dict[str, int],
+    ) -> None:
+        # Save the results of scanning the root.
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN")
+            for table, rows in (("files", file_rows), ("manifests", manifest_rows)):
+                self._connection.executemany(
+                    f"DELETE FROM {table} WHERE path = ?",  # noqa: S608
+                    [(path,) for path in removed[table]],
+                )
+                if rows:
+                    values = ", ".join("?" * len(rows[0]))
+                    self._connection.executemany(
+                        f"INSERT OR REPLACE INTO {table} VALUES ({values})",  # noqa: S608
+                        rows,
+                    )
+            self._connection.execute(
+                "DELETE FROM directories WHERE path = ? OR path > ? AND path < ?",
+                (str(root), *_path_range(root)),
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO directories VALUES (?, ?)", directory_mtimes.items()
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO roots VALUES (?, ?)", (str(root), time.time())
+            )
+
+    def _scan(
+        self, root: pathlib.Path, known: dict[str, dict[str, _Stat]], *, quick: bool
+    ) -> tuple[dict[str, dict[str, _Stat]], dict[str, int]]:
+        # Return the (size, mtime_ns, inode) of the audio files and manifests within the root,
+        # and the modification times of the directories. Paths are strings, and we use
+        # os.scandir rather than pathlib, because it's much faster for large libraries.
+        found: dict[str, dict[str, _Stat]] = {"files": {}, "manifests": {}}
+        directory_mtimes: dict[str, int] = {}
+        known_directory_mtimes = self._get_directory_mtimes(root) if quick else {}
+        contents: dict[str, list[tuple[str, str, _Stat | None]]] = collections.defaultdict(list)
+        for table, stats in known.items() if quick else ():
+            for path, stat in stats.items():
+                contents[os.path.dirname(path)].append((table, path, stat))  # noqa: PTH120
+        for path in known_directory_mtimes:
+            contents[os.path.dirname(path)].append(("directories", path, None))  # noqa: PTH120
+        directories = [str(root)]
+        while directories:
+            directory = directories.pop()
+            try:
+                mtime_ns = os.stat(directory).st_mtime_ns  # noqa: PTH116
+                directory_mtimes[directory] = mtime_ns
+                if known_directory_mtimes.get(directory) != mtime_ns:
+                    contents[directory] = self._scan_directory(directory)
+            except OSError as err:
+                log.warning("Unable to index %s: %s", directory, err)
+                continue
+            # If the directory's modification time hasn't changed, nothing has been added,
+            # removed or renamed in it, so its known contents are still its contents.
+            for table, path, stat in contents[directory]:
+                if stat is None:
+                    directories.append(path)
+                else:
+                    found[table][path] = stat
+        return found, directory_mtimes
+
+    @staticmethod
+    def _scan_directory(directory: str) -> list[tuple[str, str, _Stat | None]]:
+        # Return (table, path, stat) for the audio files and manifests in the directory, and
+        # ("directories", path, None) for its subdirectories.
+        extensions = audiofile.AudioFile.extensions()
+        contents: list[tuple[str, str, _Stat | None]] = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    contents.append(("directories", entry.path, None))
+                    continue
+                if entry.name == MANIFEST_FILE:
+                    table = "manifests"
+                elif os.path.splitext(entry.name)[1] in extensions:  # noqa: PTH122
+                    table = "files"
+                else:
+                    continue
+                if entry.is_file():
+                    stat = entry.stat()
+                    contents.append(
+                        (table, entry.path, (stat.st_size, stat.st_mtime_ns, stat.st_ino))
+                    )
+        return contents
+
+    def _select(
+        self, table: str, columns: str, directories: Iterable[str | pathlib.Path]
+    ) -> list[tuple[pathlib.Path, tuple[Any, ...]]]:
+        # Return (path, row) for the rows in the given directories.
+        results = {}
+        with self._lock:
+            for directory in _resolve(directories):
+                for row in self._connection.execute(
+                    f"SELECT {columns} FROM {table} WHERE path > ? AND path < ?",  # noqa: S608
+                    _path_range(directory),
+                ):
+                    results[row[0]] = row
+        return [(pathlib.Path(path), row) for path, row in results.items()]
+
+    @staticmethod
+    def _read_file(path: pathlib.Path) -> tuple[Any, ...] | None:
+        # Read an audio file's tags and return its row (or None, if it can't be read).
+        try:
+            stat = path.stat()
+            fields = audiofile.AudioFile.read_fields(path, _INDEXED_FIELDS)
+        except (OSError, ValueError, mutagen.MutagenError) as err:
+            log.warning("Unable to index %s: %s", path, err)
+            return None
+        rename_path = get_rename_path(fields, path.suffix)
+        indexed = IndexedFile(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            inode=stat.st_ino,
+            format=path.suffix.lstrip("."),
+            bitrate=fields.get("bitrate"),
+            album=fields.get("album"),
+            album_artist=_first(fields.get("album_artists")),
+            artist=fields.get("artist"),
+            title=fields.get("title"),
+            genre=_first(fields.get("genres")),
+            medium_number=fields.get("medium_number"),
+            track_number=fields.get("track_number"),
+            musicbrainz_album_artist_id=_first(fields.get("musicbrainz_album_artist_ids")),
+            musicbrainz_artist_id=_first(fields.get("musicbrainz_artist_ids")),
+            musicbrainz_release_group_id=fields.get("musicbrainz_release_group_id"),
+            musicbrainz_release_id=fields.get("musicbrainz_album_id"),
+            musicbrainz_track_id=fields.get("musicbrainz_track_id"),
+            rename_path=None if rename_path is None else str(rename_path),
+        )
+        return tuple(
+            str(path) if c == "path" else getattr(indexed, c) for c in LibraryIndex._file_columns
+        )
+
+    @staticmethod
+    def _read_manifest(path: pathlib.Path) -> tuple[Any, ...] | None:
+        # Read a manifest and return its row (or None, if it can't be read).
+        try:
+            stat = path.stat()
+            with path.open(encoding="utf-8") as manifest_file:
+                manifest = yaml.safe_load(manifest_file)
+        except (OSError, yaml.YAMLError) as err:
+            log.warning("Unable to index %s: %s", path, err)
+            return None
+        if not isinstance(manifest, dict):
+            log.warning("Unable to index %s: not a manifest", path)
+            return None
+        release_id = (manifest.get("musicbrainz_info") or {}).get("albumid")
+        return (
+            str(path),
+            stat.st_size,
+            stat.st_mtime_ns,
+            stat.st_ino,
+            release_id,
+            json.dumps(manifest, default=str),
+        )
+
+
+def get_rename_path(fields: dict[str, Any], suffix: str) -> pathlib.Path | None:
+    """Return where a file belongs, relative to the library, based on its tags.
+
+    Args:
+        fields: The file's fields (at least `RENAME_FIELDS`), from `AudioFile.read_fields`
+        suffix: The file's suffix (e.g. ".flac")
+
+    Returns:
+        The path (e.g. artist__the/1969__the_album/01__title.flac), or None if the file doesn't
+        have the tags needed to name it.
+    """
+    if fields.get("medium_number") is None:
+        return None
+    one_track = records.OneTrack(
+        release=records.Release(
+            album=fields.get("album"),
+            album_artists_sort=records.ListF(fields.get("album_artists_sort", [])),
+            medium_count=fields.get("medium_count"),
+            original_year=fields.get("original_year"),
+        ),
+        medium_number=fields["medium_number"],
+    )
+    track = records.Track(title=fields.get("title"), track_number=fields.get("track_number"))
+    try:
+        return one_track.get_artist_album_disc_path() / track.get_filename(suffix)
+    except ValueError:
+        return None
+
+
+def _first(values: list[Any] | None) -> Any:  # noqa: ANN401
+    # Return the first value (or None).
+    return values[0] if values else None
+
+
+def _path_range(directory: pathlib.Path) -> tuple[str, str]:
+    # Return (low, high), such that low < path < high for every path within the directory.
+    return f"{directory}{os.sep}", f"{directory}{chr(ord(os.sep) + 1)}"
+
+
+def _resolve(directories: Iterable[str | pathlib.Path]) -> list[pathlib.Path]:
+    # Return the given directories as absolute paths.
+    return [pathlib.Path(d).resolve() for d in directories]
@@ -16,29 +16,93 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import concurrent.futures
 import dataclasses
 import datetime as dt
+import email.message
+import email.utils
+import hashlib
 import http.client
 import logging
+import os
 import pprint
-import time
+import random
+import threading
+import types
+import urllib.error
+import urllib.parse
 import webbrowser
-from typing import TYPE_CHECKING, Any, Final
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any, ClassVar, Final
 
 import musicbrainzngs as mb
 import requests
-from fuzzywuzzy import fuzz
 from requests import auth
 
-from audiolibrarian import __version__, config, records, text
-
-if TYPE_CHECKING:
-    from collections.abc import Callable
+from audiolibrarian import __version__, cache, config, ratelimit, records, text
 
 log = logging.getLogger(__name__)
 _USER_AGENT_NAME = "audiolibrarian"
 _USER_AGENT_CONTACT = "audiolibrarian@jibson.com"
 mb.set_useragent(_USER_AGENT_NAME, __version__, _USER_AGENT_CONTACT)
+mb.set_rate_limit(limit_or_interval=False)  # We do our own (shared) rate limiting.
+_SEARCH_LIMIT: Final[int] = 100  # The most results a MusicBrainz search returns.
+_THROTTLED: Final[set[int]] = {
+    http.HTTPStatus.SERVICE_UNAVAILABLE,
+    http.HTTPStatus.TOO_MANY_REQUESTS,
+}
+
+
+class ThrottledError(RuntimeError):
+    """Raised when MusicBrainz says we're making too many requests."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        """Initialize a ThrottledError.
+
+        Args:
+            message: The error message
+            retry_after: Seconds the service asked us to wait before retrying (if it said)
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _get_retry_after(headers: Mapping[str, str] | email.message.Message | None) -> float | None:
+    # Return the number of seconds from a Retry-After header (seconds or an HTTP date), or None.
+    if not headers or not (value := headers.get("Retry-After")):
+        return None
+    try:
+        return max(0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0, (retry_at - dt.datetime.now(tz=dt.UTC)).total_seconds())
+
+
+_mb_safe_read = mb.musicbrainz._safe_read  # noqa: SLF001
+
+
+def _safe_read(opener: Any, req: Any, body: Any = None, **kwargs: Any) -> bytes:  # noqa: ANN401
+    # Read a musicbrainzngs response, but raise ThrottledError for a throttled request, rather
+    # than letting musicbrainzngs retry it (ignoring Retry-After and our shared rate limit); the
+    # requests are retried by MusicBrainzSession._fetch_with_retries. Other errors are handled
+    # (and retried) by musicbrainzngs, as before.
+    def open_(*args: Any) -> Any:  # noqa: ANN401
+        try:
+            return opener.open(*args)
+        except urllib.error.HTTPError as err:
+            if err.code in _THROTTLED:
+                msg = f"{err.code} - {err.url}"
+                raise ThrottledError(msg, retry_after=_get_retry_after(err.headers)) from err
+            raise
+
+    return bytes(_mb_safe_read(types.SimpleNamespace(open=open_), req, body, **kwargs))
+
+
+mb.musicbrainz._safe_read = _safe_read  # noqa: SLF001
 
 
 class MusicBrainzSession:
@@ -47,13 +111,35 @@ class MusicBrainzSession:
     It can be for things that are not supported by the musicbrainzngs library.
     """
 
-    _last_api_call = dt.datetime.now(tz=dt.UTC)
-
     def __init__(self, settings: config.MusicBrainzSettings) -> None:
         """Initialize a MusicBrainzSession."""
         self._settings = settings
         self.__session: requests.Session | None = None
         self._has_credentials = bool(settings.username and settings.password.get_secret_value())
+        self._rate_limiter = ratelimit.RateLimiter(
+            settings.work_dir / "musicbrainz-rate-limit", interval=settings.rate_limit
+        )
+        self._cover_dir = settings.work_dir / "covers"
+        days = dt.timedelta(days=1).total_seconds()
+        ttls = {
+            "artist": settings.cache.artist_ttl * days,
+            "cover": settings.cache.cover_ttl * days,
+            "disc": settings.cache.disc_ttl * days,
+            "genre": settings.cache.genre_ttl * days,
+            "release": settings.cache.release_ttl * days,
+            "release-group": settings.cache.release_group_ttl * days,
+            "search": settings.cache.search_ttl * days,
+        }
+        if not (settings.cache.enabled or settings.cache.offline):
+            # Artist genres are cached regardless (as they always have been); otherwise, every
+            # `genre` run would look up every artist again.
+            ttls = {"genre": ttls["genre"]}
+        self._cache_kinds = frozenset(ttls)  # The kinds of response that are cached.
+        self._cache = cache.Cache(
+            settings.work_dir / "musicbrainz-cache.sqlite",
+            ttls=ttls,
+            max_size=settings.cache.max_size * 1024 * 1024,
+        )
 
     def __del__(self) -> None:
         """Close a MusicBrainzSession."""
@@ -77,18 +163,78 @@ class MusicBrainzSession:
     def _get(self, path: str, params: dict[str, str]) -> dict[Any, Any]:
         # Used for direct API calls; those not supported by the python library.
         path = path.lstrip("/")
+        key = f"{path}?{urllib.parse.urlencode(sorted(params.items()))}"
+        if self._has_credentials:
+            key += f"#{self._settings.username}"  # Responses may include user data.
+        return dict(self.cached(path.split("/")[0], key, lambda: self._fetch(path, params)))
+
+    def _fetch(self, path: str, params: dict[str, str]) -> dict[Any, Any]:
+        # Make a direct API call; the caller should sleep first.
+        return dict(self._request(path, params={**params, "fmt": "json"}).json())
+
+    def _request(self, path: str, params: dict[str, str]) -> requests.Response:
+        # Make a direct API call, returning the (successful) response; the caller should sleep.
         url = f"https://musicbrainz.org/ws/2/{path}"
-        params["fmt"] = "json"
-        self.sleep()
         result = self._session.get(url, params=params)
-        while result.status_code == http.HTTPStatus.SERVICE_UNAVAILABLE:
-            log.warning("Waiting due to throttling...")
-            time.sleep(10)
-            result = self._session.get(url, params=params)
         if result.status_code != http.HTTPStatus.OK:
             msg = f"{result.status_code} - {url}"
+            if result.status_code in _THROTTLED:
+                raise ThrottledError(msg, retry_after=_get_retry_after(result.headers))
             raise RuntimeError(msg)
-        return dict(result.json())
+        return result
+
+    def _fetch_with_retries(self, fetch: Callable[[], Any]) -> Any:  # noqa: ANN401
+        # Call fetch after a rate-limit sleep; retry, with exponential backoff, while throttled.
+        attempt = 0
+        while True:
+            self.sleep()
+            try:
+                return fetch()
+            except ThrottledError as err:
+                if attempt >= self._settings.max_retries:
+                    raise
+                # "Full jitter" backoff, but never sooner than the service asked us to wait.
+                backoff = min(self._settings.max_backoff, self._settings.rate_limit * 2**attempt)
+                delay = max(err.retry_after or 0, random.uniform(0, backoff))  # noqa: S311
+                log.warning("Throttled by MusicBrainz; retrying in %.1f seconds...", delay)
+                self._rate_limiter.slow_down(delay)  # Every thread and process backs off.
+                attempt += 1
+
+    def cached(
+        self,
+        kind: str,
+        key: str,
+        fetch: Callable[[], Any],
+        *,
+        refresh: bool = False,
+    ) -> Any:  # noqa: ANN401
+        """Return a response from the cache, or fetch it from MusicBrainz (and cache it).
+
+        Args:
+            kind: The kind of response ("artist", "cover", "release", etc.); sets how long it's
+                cached for
+            key: A key that identifies the request, unique within its kind
+            fetch: A callable that makes the request; it's called after a rate-limit sleep, and
+                called again (after backing off) if MusicBrainz says we're making too many requests
+            refresh: If True, fetch the response even if it's cached (unless we're offline)
+
+        Raises:
+            cache.CacheMissError: If the response isn't cached, and we're in offline mode.
+            ThrottledError: If we're still being throttled after `max_retries` retries.
+        """
+        if kind not in self._cache_kinds:
+            return self._fetch_with_retries(fetch)
+        offline = self._settings.cache.offline
+        if (not refresh or offline) and (
+            value := self._cache.get(kind, key, stale=offline)
+        ) is not None:
+            return value
+        if offline:
+            msg = f"Not in the MusicBrainz cache (offline mode): {kind} {key}"
+            raise cache.CacheMissError(msg)
+        value = self._fetch_with_retries(fetch)
+        self._cache.put(kind, key, value)
+        return value
 
     def get_artist_by_id(
         self, artist_id: str, includes: list[str] | None = None
@@ -99,6 +245,140 @@ class MusicBrainzSession:
             params["inc"] = "+".join(includes)
         return self._get(f"artist/{artist_id}", params=params)
 
+    def get_artist_genres(self, artist_id: str, *, refresh: bool = False) -> dict[str, Any]:
+        """Return the name and genres of the given musicbrainz-artist ID.
+
+        The result has the artist's "name", the community "genres" (each with a "name" and
+        "count") and the "user-genres" (names) set by the user we're logged in as. Results,
+        including those for artists with no genres at all, are cached as "genre" entries.
+
+        Args:
+            artist_id: The musicbrainz-artist ID
+            refresh: If True, fetch the genres even if they're cached
+        """
+        key = artist_id
+        if self._has_credentials:
+            key += f"#{self._settings.username}"  # User genres are the user's.
+
+        def fetch() -> dict[str, Any]:
+            artist = self._fetch(f"artist/{artist_id}", {"inc": "genres+user-genres"})
+            return {
+                "name": artist["name"],
+                "genres": [{"name": g["name"], "count": g["count"]} for g in artist["genres"]],
+                "user-genres": [g["name"] for g in artist["user-genres"]],
+            }
+
+        return dict(self.cached("genre", key, fetch, refresh=refresh))
+
+    def get_artists_genres(
+        self, artist_ids: Iterable[str], *, refresh: bool = False
+    ) -> dict[str, dict[str, Any]]:
+        """Return the name and genres (see `get_artist_genres`) of each musicbrainz-artist ID.
+
+        When we're not logged in, artists that aren't cached are found with searches, up to 100
+        per request. Searches don't return genres, so the community genres are those of the
+        artist's tags that are genres. User genres are only returned by a lookup of the artist
+        (with auth); so, when we're logged in, and for any artist a search doesn't find, each
+        artist is looked up on its own.
+
+        Args:
+            artist_ids: The musicbrainz-artist IDs
+            refresh: If True, fetch the genres even if they're cached
+        """
+        artist_ids = list(dict.fromkeys(artist_ids))
+        found: dict[str, dict[str, Any]] = {}
+        if not self._has_credentials and not self._settings.cache.offline:
+            todo = []
+            for artist_id in artist_ids:
+                if not refresh and (value := self._cache.get("genre", artist_id)) is not None:
+                    found[artist_id] = value
+                    continue
+                todo.append(artist_id)
+            genre_names = self._get_genre_names() if todo else set()
+            for i in range(0, len(todo), _SEARCH_LIMIT):
+                batch = todo[i : i + _SEARCH_LIMIT]
+                found.update(self._search_artist_genres(batch, genre_names))
+        return {
+            artist_id: found.get(artist_id) or self.get_artist_genres(artist_id, refresh=refresh)
+            for artist_id in artist_ids
+        }
+
+    def _search_artist_genres(
+        self, artist_ids: list[str], genre_names: set[str]
+    ) -> dict[str, dict[str, Any]]:
+        # Return the name and community genres (those of their tags in genre_names) of the
+        # artists found by a single search, and cache them as "genre" entries.
+        params = {"query": f"arid:({' OR '.join(artist_ids)})", "limit": str(len(artist_ids))}
+        result = self._fetch_with_retries(lambda: self._fetch("artist", params))
+        found: dict[str, dict[str, Any]] = {}
+        for artist in result.get("artists", []):
+            if artist["id"] not in artist_ids:
+                continue
+            genres = [t for t in artist.get("tags", []) if t["name"] in genre_names]
+            found[artist["id"]] = {
+                "name": artist["name"],
+                "genres": [{"name": g["name"], "count": g["count"]} for g in genres],
+                "user-genres": [],
+            }
+            self._cache.put("genre", artist["id"], found[artist["id"]])
+        log.debug("Found %d of %d artists by searching", len(found), len(artist_ids))
+        return found
+
+    def _get_genre_names(self) -> set[str]:
+        # Return the names of all the genres MusicBrainz knows about.
+        def fetch() -> list[str]:
+            result = self._request("genre/all", params={"fmt": "txt"})
+            return [name for line in result.text.splitlines() if (name := line.strip())]
+
+        return set(self.cached("genre", "all", fetch))
+
+    def get_front_cover(self, release_id: str, size: int | None = 500) -> bytes:
+        """Return the front cover image for the given musicbrainz-release ID.
+
+        Images come from the Cover Art Archive, which isn't subject to the MusicBrainz rate limit.
+        They're kept on disk, named by their SHA-256 digest; the cache maps a release ID and size
+        to that digest.
+
+        Args:
+            release_id: The musicbrainz-release ID
+            size: The size of the image (250, 500 or 1200); None for the original
+
+        Raises:
+            cache.CacheMissError: If the image isn't cached, and we're in offline mode.
+            musicbrainzngs.NetworkError: If the Cover Art Archive can't be reached.
+            musicbrainzngs.ResponseError: If the release has no front cover.
+        """
+        key = f"{release_id}?size={size}"
+        if "cover" not in self._cache_kinds:
+            return bytes(mb.get_image_front(release_id, size=size))
+        offline = self._settings.cache.offline
+        if (digest := self._cache.get("cover", key, stale=offline)) is not None:
+            try:
+                return (self._cover_dir / str(digest)).read_bytes()
+            except FileNotFoundError:
+                log.debug("Cover file missing: %s", digest)
+        if offline:
+            msg = f"Not in the cover cache (offline mode): {key}"
+            raise cache.CacheMissError(msg)
+        data = bytes(mb.get_image_front(release_id, size=size))
+        digest = hashlib.sha256(data).hexdigest()
+        if not (path := self._cover_dir / digest).exists():
+            self._cover_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(path)  # Atomic, so other processes never see a partial image.
+        self._cache.put("cover", key, digest)
+        return data
+
+    def get_release_by_id(
+        self, release_id: str, includes: list[str] | None = None
+    ) -> dict[str, Any]:
+        """Return release for the given musicbrainz-release ID."""
+        params = {}
+        if includes is not None:
+            params["inc"] = "+".join(includes)
+        return self._get(f"release/{release_id}", params=params)
+
     def get_release_group_by_id(
         self, release_group_id: str, includes: list[str] | None = None
     ) -> dict[str, Any]:
@@ -111,17 +391,10 @@ class MusicBrainzSession:
     def sleep(self) -> None:
         """Sleep so we don't abuse the MusicBrainz API service.
 
+        The rate limit is shared by all the threads and processes using the same work directory.
         See https://musicbrainz.org/doc/MusicBrainz_API/Rate_Limiting
         """
-        since_last = dt.datetime.now(tz=dt.UTC) - MusicBrainzSession._last_api_call
-        if (
-            sleep_seconds := (
-                dt.timedelta(seconds=self._settings.rate_limit) - since_last
-            ).total_seconds()
-        ) > 0:
-            log.debug("Sleeping %s to avoid throttling...", sleep_seconds)
-            time.sleep(sleep_seconds)
-            MusicBrainzSession._last_api_call = dt.datetime.now(tz=dt.UTC)
+        self._rate_limiter.wait()
 
 
 class MusicBrainzRelease:
@@ -139,21 +412,38 @@ class MusicBrainzRelease:
         "work-rels",
         "work-level-rels",
     ]
+    _cover_executor: ClassVar[concurrent.futures.Executor] = concurrent.futures.ThreadPoolExecutor(
+        max_workers=4, thread_name_prefix="front-cover"
+    )
+    _front_covers: ClassVar[dict[str, concurrent.futures.Future[bytes]]] = {}  # In progress.
+    _front_covers_lock: ClassVar[threading.Lock] = threading.Lock()
 
     def __init__(
         self,
         release_id: str,
         settings: config.MusicBrainzSettings,
         *,
+        session: MusicBrainzSession | None = None,
         verbose: bool = False,
     ) -> None:
-        """Initialize an MusicBrainzRelease."""
+        """Initialize an MusicBrainzRelease.
+
+        Args:
+            release_id: The MusicBrainz release ID
+            settings: MusicBrainz settings
+            session: A session to share (e.g. with other releases); by default, a new one
+            verbose: Unused
+        """
         self._release_id = release_id
         self._verbose = verbose
-        self._session = MusicBrainzSession(settings=settings)
-        self._session.sleep()
-        self._release = mb.get_release_by_id(release_id, includes=self._includes)["release"]
+        self._session = session or MusicBrainzSession(settings=settings)
+        self._release = self._session.cached(
+            "release",
+            f"{release_id}?inc={'+'.join(self._includes)}",
+            lambda: mb.get_release_by_id(release_id, includes=self._includes),
+        )["release"]
         self._release_record: records.Release | None = None
+        self._front_cover = self._fetch_front_cover()  # Downloaded while we do everything else.
 
     def get_release(self) -> records.Release:
         """Return the Release record."""
@@ -161,21 +451,43 @@ class MusicBrainzRelease:
             self._release_record = self._get_release()
         return self._release_record
 
-    def _get_front_cover(self, size: int = 500) -> records.FrontCover | None:
+    def _fetch_front_cover(self, size: int = 500) -> concurrent.futures.Future[bytes] | None:
+        # Start downloading the front cover in the background (or None if there isn't one).
+        # Releases being read at the same time (e.g. the discs of a multi-disc release) share the
+        # download; later ones get the image from the cover cache.
+        if self._release.get("cover-art-archive", {}).get("front") != "true":
+            return None
+        release_id = self._release["id"]
+        key = f"{release_id}?size={size}"
+        with self._front_covers_lock:
+            if (future := self._front_covers.get(key)) is not None:
+                return future
+            future = self._cover_executor.submit(
+                self._session.get_front_cover, release_id, size=size
+            )
+            self._front_covers[key] = future
+
+        def forget(_: concurrent.futures.Future[bytes]) -> None:
+            with self._front_covers_lock:
+                self._front_covers.pop(key, None)
+
+        future.add_done_callback(forget)  # Outside the lock; it's called now if already done.
+        return future
+
+    def _get_front_cover(self) -> records.FrontCover | None:
         # Return the FrontCover object (of None).
-        if self._release["cover-art-archive"]["front"] == "true":
-            self._session.sleep()
-            try:
-                return records.FrontCover(
-                    data=mb.get_image_front(self._release["id"], size=size),
-                    desc="front",
-                    mime="image/jpeg",
-                )
-            except (
-                mb.musicbrainz.NetworkError,
-                mb.musicbrainz.ResponseError,
-            ) as err:
-                log.warning("Error getting front cover: %s", err)
+        if self._front_cover is None:
+            return None
+        try:
+            return records.FrontCover(
+                data=self._front_cover.result(), desc="front", mime="image/jpeg"
+            )
+        except (
+            cache.CacheMissError,
+            mb.musicbrainz.NetworkError,
+            mb.musicbrainz.ResponseError,
+        ) as err:
+            log.warning("Error getting front cover: %s", err)
         return None
 
     def _get_genre(self, release_group_id: str, artist_id: str) -> str:
@@ -190,9 +502,28 @@ class MusicBrainzRelease:
         if self._session._has_credentials:  # noqa: SLF001
             includes.append("user-genres")
 
-        release_group = self._session.get_release_group_by_id(release_group_id, includes=includes)
+        # A single lookup of the release, including its release-group and artists, usually gives
+        # us all the genres; we only look up the release-group or artist if they're missing.
+        release = self._session.get_release_by_id(
+            self._release_id, includes=["artist-credits", "release-groups", *includes]
+        )
+        release_group = release.get("release-group", {})
+        if "genres" not in release_group:
+            release_group = self._session.get_release_group_by_id(
+                release_group_id, includes=includes
+            )
         log.info("RELEASE_GROUP_GENRES: %s", release_group)
-        artist = self._session.get_artist_by_id(artist_id, includes=includes)
+        artist: dict[str, Any] = next(
+            (
+                credit["artist"]
+                for credit in release.get("artist-credit", [])
+                if credit.get("artist", {}).get("id") == artist_id
+            ),
+            {},
+        )
+        if "genres" not in artist:
+            # Cached, so it's looked up once for all the releases by the artist.
+            artist = self._session.get_artist_by_id(artist_id, includes=includes)
         log.info("ARTIST_GENRES: %s", artist)
         x_count: Callable[[Any], int] = lambda x: int(x["count"])  # noqa: E731
         if release_group.get("user-genres"):
@@ -403,10 +734,14 @@ class Searcher:
     __mb_session: MusicBrainzSession | None = None
 
     settings: dataclasses.InitVar[config.MusicBrainzSettings] = None
+    session: dataclasses.InitVar[MusicBrainzSession | None] = None
 
-    def __post_init__(self, settings: config.MusicBrainzSettings) -> None:
+    def __post_init__(
+        self, settings: config.MusicBrainzSettings, session: MusicBrainzSession | None
+    ) -> None:
         """Process additional variables."""
         self._settings = settings
+        self.__mb_session = session
 
     @property
     def _mb_session(self) -> MusicBrainzSession:
@@ -418,8 +753,12 @@ class Searcher:
         """Return a Release object (or None) based on a search."""
         release_id = self.mb_release_id
         if not release_id and self.disc_id:
-            self._mb_session.sleep()
-            result = mb.get_releases_by_discid(self.disc_id, includes=["artists"])
+            disc_id = self.disc_id
+            result = self._mb_session.cached(
+                "disc",
+                f"{disc_id}?inc=artists",
+                lambda: mb.get_releases_by_discid(disc_id, includes=["artists"]),
+            )
             log.info("DISC: {result}")
             if result.get("disc"):
                 release_id = result["disc"]["release-list"][0]["id"]
@@ -435,21 +774,29 @@ class Searcher:
         else:
             release_id = self._prompt_uuid("MusicBrainz Release ID: ")
 
-        return MusicBrainzRelease(release_id=release_id, settings=self._settings).get_release()
+        return MusicBrainzRelease(
+            release_id=release_id, settings=self._settings, session=self._mb_session
+        ).get_release()
 
     def _get_release_group_ids(self) -> list[str]:
         # Return release groups that fuzzy-match the search criteria.
+        from fuzzywuzzy import fuzz  # noqa: PLC0415  # Only needed when searching.
+
         artist_l = self.artist.lower()
         album_l = self.album.lower()
-        self._mb_session.sleep()
-        artist_list = mb.search_artists(query=artist_l, limit=500)["artist-list"]
+        artist_list = self._mb_session.cached(
+            "search",
+            f"artist?query={artist_l}",
+            lambda: mb.search_artists(query=artist_l, limit=500),
+        )["artist-list"]
         if not artist_list:
             return []
         artist_id = artist_list[0]["id"]
-        self._mb_session.sleep()
-        release_group_list = mb.browse_release_groups(artist=artist_id, limit=500)[
-            "release-group-list"
-        ]
+        release_group_list = self._mb_session.cached(
+            "search",
+            f"release-group?artist={artist_id}",
+            lambda: mb.browse_release_groups(artist=artist_id, limit=500),
+        )["release-group-list"]
         log.info("RELEASE_GROUPS: %s", release_group_list)
         if log.getEffectiveLevel() == logging.DEBUG:
             pprint.pp("== RELEASE_GROUPS ===================")
@@ -462,6 +809,9 @@ class Searcher:
 
     def _prompt_release_id(self, release_group_ids: list[str]) -> str:
         # Prompt for, and return a MusicBrainz release ID.
+        prompt = "\nRelease ID or URL: "
+        if not text.is_interactive():  # Don't open web pages no one will look at (e.g. in watch).
+            raise text.InputRequiredError(prompt.strip())
         print(
             "\n\nWe found the following release group(s). Use the link(s) below to "
             "find the release ID that best matches the audio files.\n"
@@ -470,7 +820,7 @@ class Searcher:
             url = f"https://musicbrainz.org/release-group/{release_group_id}"
             print(url)
             webbrowser.open(url)
-        return self._prompt_uuid("\nRelease ID or URL: ")
+        return self._prompt_uuid(prompt)
 
     @staticmethod
     def _prompt_uuid(prompt: str) -> str:
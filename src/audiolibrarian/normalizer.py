@@ -23,7 +23,6 @@ import shutil
 import subprocess
 from typing import Any, TypeVar
 
-import ffmpeg_normalize
 import pydantic
 
 from audiolibrarian import config
@@ -74,6 +73,21 @@ class Normalizer[T](abc.ABC):
         log.warning("wavegain not found, ffmpeg not found, using no normalization")
         return NoOpNormalizer(config.EmptySettings())
 
+    @property
+    def needs_files(self) -> bool:
+        """Return True if the normalizer needs the audio written out to (wav) files."""
+        return True
+
+    @property
+    def per_track(self) -> bool:
+        """Return True if each file can be normalized on its own, independent of the others."""
+        return True
+
+    @property
+    def settings(self) -> T:
+        """Return the settings specific to this normalizer type."""
+        return self._settings
+
     @abc.abstractmethod
     def normalize(self, paths: set[pathlib.Path]) -> None:
         """Normalize the given audio files.
@@ -89,6 +103,11 @@ class Normalizer[T](abc.ABC):
 class NoOpNormalizer(Normalizer[config.EmptySettings]):
     """No-op normalizer that does nothing."""
 
+    @property
+    def needs_files(self) -> bool:
+        """Return False; there's nothing to do, so no files are needed."""
+        return False
+
     def normalize(self, paths: set[pathlib.Path]) -> None:
         """Do not perform any normalization."""
         del paths  # Unused.
@@ -98,6 +117,11 @@ class NoOpNormalizer(Normalizer[config.EmptySettings]):
 class WaveGainNormalizer(Normalizer[config.NormalizeWavegainSettings]):
     """Audio normalizer using wavegain."""
 
+    @property
+    def per_track(self) -> bool:
+        """Return True unless using the "album" preset, which needs all the files at once."""
+        return self._settings.preset != "album"
+
     def normalize(self, paths: set[pathlib.Path]) -> None:
         """Normalize audio files using wavegain.
 
@@ -141,6 +165,8 @@ class FFmpegNormalizer(Normalizer[config.NormalizeFFmpegSettings]):
         if not paths:
             return
 
+        import ffmpeg_normalize  # noqa: PLC0415  # It's slow to import, and often not used.
+
         log.info("Normalizing %d files with ffmpeg-normalize...", len(paths))
 
         normalizer = ffmpeg_normalize.FFmpegNormalize(
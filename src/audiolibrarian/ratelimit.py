@@ -0,0 +1,87 @@
+"""A rate limiter shared across threads and processes."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+#
+import logging
+import pathlib
+import time
+from typing import Final
+
+import filelock
+
+log = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """A rate limiter shared by every thread and process using the same state file.
+
+    Each call to `wait` reserves the next free time slot, then sleeps until that slot arrives.
+    Slots are normally `interval` seconds apart. The time of the next free slot, and the current
+    interval, are kept in the state file, under a file lock, so requests are spaced out across all
+    the processes on the host, not just within one process.
+
+    When the service tells us we're going too fast, `slow_down` holds off every request for a
+    while, and widens the interval; the interval then shrinks back with each request.
+    """
+
+    _max_slow_down: Final[float] = 8  # The interval can grow to this many times its normal value.
+    _recovery: Final[float] = 0.9  # The interval shrinks by this factor with each request.
+
+    def __init__(self, path: pathlib.Path, interval: float) -> None:
+        """Initialize a RateLimiter.
+
+        Args:
+            path: The path of the state file; its lock file is the same path, plus ".lock"
+            interval: The minimum number of seconds between requests
+        """
+        self._path = path
+        self._interval = interval
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = filelock.FileLock(f"{path}.lock")
+
+    def slow_down(self, delay: float) -> None:
+        """Make every request wait at least delay seconds from now, and widen the interval."""
+        with self._lock:
+            next_slot, interval = self._read()
+            next_slot = max(next_slot, time.time() + delay)
+            interval = min(interval * 2, self._interval * self._max_slow_down)
+            self._write(next_slot, interval)
+
+    def wait(self) -> None:
+        """Wait until it's our turn to make a request."""
+        with self._lock:
+            now = time.time()
+            next_slot, interval = self._read()
+            slot = max(now, next_slot)
+            self._write(slot + interval, max(self._interval, interval * self._recovery))
+        if (sleep_seconds := slot - now) > 0:
+            log.debug("Sleeping %s to avoid throttling...", sleep_seconds)
+            time.sleep(sleep_seconds)
+
+    def _read(self) -> tuple[float, float]:
+        # Return the next free slot and the current interval; the caller holds the lock.
+        try:
+            next_slot, interval = (
+                float(x) for x in self._path.read_text(encoding="utf-8").split()
+            )
+        except (FileNotFoundError, ValueError):
+            return 0, self._interval
+        return next_slot, max(self._interval, interval)
+
+    def _write(self, next_slot: float, interval: float) -> None:
+        # Save the next free slot and the current interval; the caller holds the lock.
+        self._path.write_text(f"{next_slot} {interval}", encoding="utf-8")
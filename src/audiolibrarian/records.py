@@ -19,6 +19,7 @@ Useful field reference: https://github.com/metabrainz/picard/blob/master/picard/
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import copy
 import dataclasses
 import enum
 import pathlib
@@ -70,11 +71,22 @@ class Record:
 
     def __bool__(self) -> bool:
         """Return a boolean representation of the Record."""
-        return bool([x for x in dataclasses.asdict(self).values() if x is not None])
+        return any(getattr(self, f.name) is not None for f in dataclasses.fields(self))
 
-    def asdict(self) -> dict[Any, Any]:
-        """Return a dict version of the record."""
-        return dataclasses.asdict(self)
+    def asdict(self, *, recurse: bool = True, binary: bool = True) -> dict[Any, Any]:
+        """Return a dict version of the record.
+
+        Args:
+            recurse: If False, field values (including nested records) are included as they are,
+                rather than converted (records to dicts) and copied
+            binary: If False, bytes fields (e.g. cover images) are left out, at any depth
+        """
+        result = {}
+        for field in dataclasses.fields(self):
+            value = getattr(self, field.name)
+            if binary or not isinstance(value, bytes):
+                result[field.name] = _asdict_value(value, binary=binary) if recurse else value
+        return result
 
 
 # Primitive Record Types
@@ -257,3 +269,21 @@ class OneTrack(Record):
         if (self.medium_number, self.release.medium_count) == (1, 1):
             return self.release.get_artist_album_path()
         return self.release.get_artist_album_path() / f"disc{self.medium_number}"
+
+
+def _asdict_value(value: Any, *, binary: bool) -> Any:  # noqa: ANN401
+    # Return a copy of a record's field value, with records converted to dicts (as
+    # dataclasses.asdict does).
+    if isinstance(value, Record):
+        return value.asdict(binary=binary)
+    if isinstance(value, (list, tuple)):
+        return type(value)(
+            _asdict_value(v, binary=binary) for v in value if binary or not isinstance(v, bytes)
+        )
+    if isinstance(value, dict):
+        return type(value)(
+            (_asdict_value(k, binary=binary), _asdict_value(v, binary=binary))
+            for k, v in value.items()
+            if binary or not isinstance(v, bytes)
+        )
+    return copy.deepcopy(value)
@@ -16,13 +16,23 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import concurrent.futures
+import contextlib
+import os
 import pathlib
+import struct
 import subprocess
-from collections.abc import Iterable
+import threading
+from collections.abc import Callable, Iterable
 from multiprocessing import Pool
+from types import TracebackType
+from typing import IO, Self
 
 from audiolibrarian import output
 
+type Action = tuple[str, ...] | Callable[[], object]
+type Stream = tuple[str, ...] | pathlib.Path  # A command's stdin/stdout, or a file.
+
 
 def _run_command(command: tuple[str, ...]) -> None:
     """Run a single command."""
@@ -49,7 +59,229 @@ def parallel(
             dots.dot()
 
 
+class Scheduler:
+    """Context Manager that runs a graph of tasks, starting each one as soon as it can.
+
+    A task is either a command (run as a subprocess) or a callable. Each task starts as soon as
+    all the tasks named in its `after` list have finished, rather than waiting on every task
+    added before it. Leaving the context waits for all the tasks to finish, and re-raises the
+    first exception raised by any of them; once a task has failed, no new tasks are started.
+
+    Example:
+        with Scheduler("Converting...") as scheduler:
+            scheduler.add("wav", ("flac", "--decode", "song.flac"))
+            scheduler.add("mp3", ("lame", "song.wav", "song.mp3"), after=["wav"])
+            scheduler.add("m4a", ("fdkaac", "-o", "song.m4a", "song.wav"), after=["wav"])
+    """
+
+    def __init__(
+        self,
+        message: str | None,
+        max_workers: int | None = None,
+        executor: concurrent.futures.Executor | None = None,
+    ) -> None:
+        """Initialize a Scheduler.
+
+        Args:
+            message: Progress message to display (None for no progress output)
+            max_workers: Maximum number of tasks to run at once (None for the CPU count)
+            executor: An executor shared with other schedulers, so that their tasks all draw
+                from one pool of workers; it is not shut down on exit (max_workers is ignored)
+        """
+        self._dots = output.Dots(message) if message is not None else None
+        self._shared_executor = executor is not None
+        self._executor = executor or concurrent.futures.ThreadPoolExecutor(
+            max_workers or os.cpu_count()
+        )
+        self._condition = threading.Condition()
+        self._actions: dict[str, Action] = {}
+        self._blockers: dict[str, set[str]] = {}  # Unfinished prerequisites of waiting tasks.
+        self._dependents: dict[str, list[str]] = {}
+        self._finished: set[str] = set()
+        self._running = 0
+        self._error: BaseException | None = None
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Exit the context manager; wait for all tasks to finish."""
+        try:
+            self.wait()
+        except Exception:
+            if exc_type is None:
+                raise
+        finally:
+            if not self._shared_executor:
+                self._executor.shutdown()
+            if self._dots is not None:
+                self._dots.__exit__(exc_type, exc_value, traceback)
+
+    def add(self, name: str, action: Action, *, after: Iterable[str] = ()) -> None:
+        """Add a task; it will start once all the tasks named in `after` have finished.
+
+        Args:
+            name: A unique name for the task
+            action: A command to execute, or a callable to call
+            after: Names of previously added tasks that must finish before this one starts
+
+        Raises:
+            ValueError: If the name is already in use or `after` names an unknown task.
+        """
+        after = set(after)
+        with self._condition:
+            if name in self._actions:
+                msg = f"Duplicate task name: {name}"
+                raise ValueError(msg)
+            if unknown := after - self._actions.keys():
+                msg = f"Unknown task(s): {', '.join(sorted(unknown))}"
+                raise ValueError(msg)
+            self._actions[name] = action
+            self._dependents[name] = []
+            self._blockers[name] = after - self._finished
+            for blocker in self._blockers[name]:
+                self._dependents[blocker].append(name)
+            if not self._blockers[name]:
+                self._start(name)
+
+    def wait(self) -> None:
+        """Wait for all the added tasks to finish.
+
+        Raises:
+            Exception: The first exception raised by a task, if any.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: not self._running)
+            if self._error is not None:
+                raise self._error
+
+    def _finish(self, name: str, future: concurrent.futures.Future[None]) -> None:
+        # Record a finished task; start any waiting tasks that were only waiting on it.
+        with self._condition:
+            self._running -= 1
+            if (error := future.exception()) is not None:
+                self._error = self._error or error
+            else:
+                self._finished.add(name)
+                if self._dots is not None:
+                    self._dots.dot()
+                for dependent in self._dependents[name]:
+                    self._blockers[dependent].discard(name)
+                    if not self._blockers[dependent]:
+                        self._start(dependent)
+            self._condition.notify_all()
+
+    def _run(self, name: str) -> None:
+        # Run the named task.
+        action = self._actions[name]
+        if isinstance(action, tuple):
+            _run_command(action)
+        else:
+            action()
+
+    def _start(self, name: str) -> None:
+        # Start the named task; the caller must hold the lock.
+        del self._blockers[name]
+        if self._error is not None:
+            return
+        self._running += 1
+        future = self._executor.submit(self._run, name)
+        future.add_done_callback(lambda f: self._finish(name, f))
+
+
+def tee(source: Stream, sinks: Iterable[Stream], chunk_size: int = 1 << 20) -> None:
+    """Copy a stream to any number of sinks, reading it only once.
+
+    Args:
+        source: A command (whose stdout is read) or a file to read
+        sinks: Commands (whose stdin is written) or files to write
+        chunk_size: The number of bytes to copy at a time
+
+    Raises:
+        subprocess.CalledProcessError: If any of the commands fail.
+    """
+    processes: list[subprocess.Popen[bytes]] = []
+    with contextlib.ExitStack() as stack:
+        stack.callback(_kill, processes)  # Don't leave anything running if we fail.
+        reader = _open_stream(stack, processes, source, write=False)
+        writers = [_open_stream(stack, processes, sink, write=True) for sink in sinks]
+        while chunk := reader.read(chunk_size):
+            for writer in list(writers):
+                try:
+                    writer.write(chunk)
+                except BrokenPipeError:  # The command died; we'll see why when we wait on it.
+                    writers.remove(writer)
+        for writer in writers:
+            writer.close()
+        for process in processes:
+            if process.wait():
+                raise subprocess.CalledProcessError(process.returncode, process.args)
+
+
+def fix_wav_sizes(path: pathlib.Path) -> None:
+    """Set the RIFF and data chunk sizes in the header of a wav file to match the file.
+
+    Decoders writing a wav stream to a pipe can't go back and fill in the sizes, so they leave
+    placeholders; the data chunk (the last one, in a decoded stream) runs to the end of the file.
+    """
+    size = path.stat().st_size
+    with path.open("r+b") as wav:
+        riff, _, wave = struct.unpack("<4sI4s", wav.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            msg = f"Not a wav file: {path}"
+            raise ValueError(msg)
+        wav.seek(4)
+        wav.write(struct.pack("<I", min(size - 8, 0xFFFFFFFF)))
+        offset = 12
+        while offset + 8 <= size:
+            wav.seek(offset)
+            chunk_id, chunk_size = struct.unpack("<4sI", wav.read(8))
+            if chunk_id == b"data":
+                wav.seek(offset + 4)
+                wav.write(struct.pack("<I", min(size - offset - 8, 0xFFFFFFFF)))
+                return
+            offset += 8 + chunk_size + chunk_size % 2  # Chunks are padded to an even size.
+    msg = f"No data chunk in wav file: {path}"
+    raise ValueError(msg)
+
+
 def touch(paths: Iterable[pathlib.Path]) -> None:
     """Touch all files in a given path."""
     for path in paths:
         path.touch(exist_ok=True)
+
+
+def _kill(processes: list[subprocess.Popen[bytes]]) -> None:
+    """Kill (and reap) any of the given processes that are still running."""
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def _open_stream(
+    stack: contextlib.ExitStack[bool | None],
+    processes: list[subprocess.Popen[bytes]],
+    stream: Stream,
+    *,
+    write: bool,
+) -> IO[bytes]:
+    """Open a file, or start a command, and return the stream to read from or write to.
+
+    Started commands are appended to the given list of processes.
+    """
+    if isinstance(stream, pathlib.Path):
+        return stack.enter_context(stream.open("wb" if write else "rb"))
+    if write:
+        process = subprocess.Popen(stream, bufsize=0, stdin=subprocess.PIPE)  # noqa: S603
+        processes.append(process)
+        return stack.enter_context(process.stdin)
+    process = subprocess.Popen(stream, bufsize=0, stdout=subprocess.PIPE)  # noqa: S603
+    processes.append(process)
+    return stack.enter_context(process.stdout)
@@ -16,19 +16,27 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import contextlib
+import contextvars
 import pathlib
 import re
 import sys
+from collections.abc import Iterator
 from typing import Any
 
 import picard_src
 
 _DIGIT_REGEX = re.compile(r"([0-9]+)")
+_INTERACTIVE: contextvars.ContextVar[bool] = contextvars.ContextVar("interactive", default=True)
 _UUID_REGEX = re.compile(
     r"[a-f0-9]{8}-?[a-f0-9]{4}-?[a-f0-9]{4}-?[a-f0-9]{4}-?[a-f0-9]{12}", re.IGNORECASE
 )
 
 
+class InputRequiredError(RuntimeError):
+    """Raised when user input is needed, but we're not interactive."""
+
+
 def alpha_numeric_key(text: str | pathlib.Path) -> list[Any]:
     """Return a key that can be used for sorting alphanumeric strings numerically.
 
@@ -95,12 +103,23 @@ def get_uuid(text: str) -> str | None:
 
 
 def input_(prompt: str) -> str:  # pragma: no cover
-    """Sound a terminal bell then prompt the user for input."""
+    """Sound a terminal bell then prompt the user for input.
+
+    Raises:
+        InputRequiredError: If we're not interactive (see `non_interactive`).
+    """
+    if not is_interactive():
+        raise InputRequiredError(prompt.strip())
     sys.stdout.write("\a")  # Terminal bell escape char.
     sys.stdout.flush()
     return input(prompt)
 
 
+def is_interactive() -> bool:
+    """Return True if the user may be prompted for input."""
+    return _INTERACTIVE.get()
+
+
 def join(strings: list[str], joiner: str = ", ", word: str = "and") -> str:
     """Join string with joiner and word.
 
@@ -113,3 +132,13 @@ def join(strings: list[str], joiner: str = ", ", word: str = "and") -> str:
     if len(strings) == 1:
         return strings[0]
     return joiner.join(strings[:-1]) + " " + word + " " + strings[-1]
+
+
+@contextlib.contextmanager
+def non_interactive() -> Iterator[None]:
+    """Return a context manager, within which prompting for input raises InputRequiredError."""
+    token = _INTERACTIVE.set(False)
+    try:
+        yield
+    finally:
+        _INTERACTIVE.reset(token)
@@ -0,0 +1,214 @@
+"""Watch a drop folder for new albums."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+#
+import ctypes
+import ctypes.util
+import logging
+import os
+import pathlib
+import select
+import time
+import types
+from typing import Final, Self
+
+log = logging.getLogger(__name__)
+
+# From <sys/inotify.h>.
+_IN_MODIFY: Final[int] = 0x002
+_IN_ATTRIB: Final[int] = 0x004
+_IN_CLOSE_WRITE: Final[int] = 0x008
+_IN_MOVED_FROM: Final[int] = 0x040
+_IN_MOVED_TO: Final[int] = 0x080
+_IN_CREATE: Final[int] = 0x100
+_IN_DELETE: Final[int] = 0x200
+_IN_MASK: Final[int] = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+)
+_AUDIO_SUFFIXES: Final[set[str]] = {".flac", ".m4a", ".mp3", ".wav"}
+
+type _Signature = frozenset[tuple[str, int, int]]  # (path, size, mtime_ns) for each file.
+
+
+class AlbumTracker:
+    """Track the albums (subdirectories) in a drop folder, and notice when they've settled.
+
+    An album has settled when it contains audio files, and nothing in it has changed for a while;
+    that is, whatever was copying it there has finished. Subdirectories whose names start with
+    a dot are ignored.
+    """
+
+    def __init__(self, path: pathlib.Path, settle: float) -> None:
+        """Initialize an AlbumTracker.
+
+        Args:
+            path: The drop folder
+            settle: Seconds an album must be unchanged before it's considered complete
+        """
+        self._path = path
+        self._settle = settle
+        self._albums: dict[pathlib.Path, tuple[_Signature, float]] = {}  # Last change (monotonic).
+        self._skipped: dict[pathlib.Path, _Signature] = {}  # Ignored until they change.
+
+    def check(self) -> list[pathlib.Path]:
+        """Return the albums that have settled, sorted.
+
+        Albums are returned each time they're checked after they settle, until they're moved out
+        of the drop folder (or skipped; see `skip`).
+        """
+        now = time.monotonic()
+        albums = {}
+        skipped = {}
+        for album in sorted(self._path.iterdir()):
+            if album.name.startswith(".") or not album.is_dir():
+                continue
+            if not (signature := self._get_signature(album)):
+                continue
+            if self._skipped.get(album) == signature:
+                skipped[album] = signature
+                continue
+            previous_signature, changed = self._albums.get(album, (None, now))
+            albums[album] = (signature, changed if signature == previous_signature else now)
+        self._albums, self._skipped = albums, skipped
+        return [a for a, (_, changed) in albums.items() if now - changed >= self._settle]
+
+    def skip(self, album: pathlib.Path) -> None:
+        """Stop returning the album (e.g. if it can't be moved), until it changes again."""
+        if album in self._albums:
+            self._skipped[album] = self._albums.pop(album)[0]
+
+    def next_check(self) -> float | None:
+        """Return the number of seconds until the next album could settle (None if none could)."""
+        if not self._albums:
+            return None
+        now = time.monotonic()
+        return max(0, min(changed + self._settle - now for _, changed in self._albums.values()))
+
+    @staticmethod
+    def _get_signature(album: pathlib.Path) -> _Signature | None:
+        # Return the album's signature (or None, if it has no audio files).
+        signature = set()
+        for path in album.rglob("*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # It's being moved.
+            signature.add((str(path), stat.st_size, stat.st_mtime_ns))
+        if not any(pathlib.Path(p).suffix.lower() in _AUDIO_SUFFIXES for p, _, _ in signature):
+            return None
+        return frozenset(signature)
+
+
+class Watcher:
+    """Wait for changes within a directory tree.
+
+    Changes are noticed with inotify, where it's available (Linux). Elsewhere, we fall back to
+    polling; waits just time out after the poll interval, and the caller looks for changes.
+    """
+
+    def __init__(
+        self, path: pathlib.Path, *, poll_interval: float = 10, use_inotify: bool = True
+    ) -> None:
+        """Initialize a Watcher.
+
+        Args:
+            path: The root of the directory tree to watch
+            poll_interval: The longest we wait, when we can't use inotify
+            use_inotify: If False, always poll
+        """
+        self._path = path
+        self._poll_interval = poll_interval
+        self._libc: ctypes.CDLL | None = None
+        self._fd: int | None = None
+        if use_inotify:
+            self._init_inotify()
+
+    def __enter__(self) -> Self:
+        """Enter the context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: types.TracebackType | None,
+    ) -> None:
+        """Exit the context manager; stop watching."""
+        self.close()
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Return True if we're using inotify (rather than polling)."""
+        return self._fd is not None
+
+    def close(self) -> None:
+        """Stop watching."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait until something changes, or the timeout (seconds) passes.
+
+        Returns:
+            True if something changed; False if we timed out (or we're polling).
+        """
+        if self._fd is None:
+            time.sleep(
+                self._poll_interval if timeout is None else min(timeout, self._poll_interval)
+            )
+            return False
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            while os.read(self._fd, 64 * 1024):  # We only care that there were events.
+                pass
+        except BlockingIOError:
+            pass
+        self._add_watches()  # New directories need watching too.
+        return True
+
+    def _add_watches(self) -> None:
+        # Watch every directory in the tree, except hidden ones; watching a directory again is
+        # harmless.
+        if self._libc is None or self._fd is None:
+            return
+        for directory, subdirectories, _ in self._path.walk():
+            subdirectories[:] = [d for d in subdirectories if not d.startswith(".")]
+            if self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK) < 0:
+                log.debug("Unable to watch %s: %s", directory, os.strerror(ctypes.get_errno()))
+
+    def _init_inotify(self) -> None:
+        # Start watching with inotify, if we can.
+        try:
+            self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (AttributeError, OSError) as err:
+            log.info("inotify is not available (%s); polling", err)
+            return
+        if fd < 0:
+            log.info("inotify is not available (%s); polling", os.strerror(ctypes.get_errno()))
+            return
+        self._fd = fd
+        self._add_watches()
@@ -25,6 +25,8 @@ from collections.abc import Generator
 from pathlib import Path
 from typing import Any
 
+import mutagen
+import mutagen.id3
 import pytest
 
 from audiolibrarian.audiofile import audiofile
@@ -183,6 +185,40 @@ class TestAudioFile:
                     old_info.release.original_date = None  # mp3 doesn't save orig date.
                 assert new_info == old_info, f"Write/Read failed for {src.suffix}"
 
+    def test__read_fields(self, test_data: Generator[None]) -> None:
+        """Verify that the fields read agree with the records read."""
+        _ = test_data
+        extensions = (".flac", ".m4a", ".mp3")
+        for src in [p.resolve() for p in test_data_path.glob("*") if p.suffix in extensions]:
+            one_track = audiofile.AudioFile.open(src).one_track
+            fields = audiofile.AudioFile.read_fields(src, audiofile.FIELDS)
+            if one_track.release is None:  # Blank tags.
+                assert fields.keys() == {"bitrate"}, f"Fields read from blank {src}"
+                continue
+            release, medium, track = one_track.release, one_track.medium, one_track.track
+            expected = {
+                "album": release.album,
+                "album_artists": release.album_artists,
+                "album_artists_sort": release.album_artists_sort,
+                "artist": track.artist,
+                "artists": track.artists,
+                "bitrate": track.file_info.bitrate,
+                "medium_count": release.medium_count,
+                "medium_number": one_track.medium_number,
+                "musicbrainz_album_artist_ids": release.musicbrainz_album_artist_ids,
+                "musicbrainz_album_id": release.musicbrainz_album_id,
+                "musicbrainz_artist_ids": track.musicbrainz_artist_ids,
+                "musicbrainz_release_group_id": release.musicbrainz_release_group_id,
+                "musicbrainz_track_id": track.musicbrainz_track_id,
+                "original_year": release.original_year,
+                "title": track.title,
+                "track_count": medium.track_count,
+                "track_number": one_track.track_number,
+            }
+            assert fields == expected, f"Fields read from {src}"
+            fields = audiofile.AudioFile.read_fields(src, {"album", "track_number"})
+            assert fields == {"album": release.album, "track_number": one_track.track_number}
+
 
 class TestAudioFileMisc:
     """Test AudioFile miscellaneous functions."""
@@ -198,6 +234,101 @@ class TestAudioFileMisc:
             # The current file should always be around, and never be an audio file.
             audiofile.AudioFile.open(__file__)
 
+    def test__padding_callback(self) -> None:
+        """Test that padding is kept when the tags fit, and reserved when they don't."""
+        get_padding = audiofile.padding_callback(1024)
+        assert get_padding(mutagen.PaddingInfo(100, 1000)) == 100  # noqa: PLR2004
+        assert get_padding(mutagen.PaddingInfo(0, 1000)) == 0
+        assert get_padding(mutagen.PaddingInfo(-1, 1000)) == 1024  # noqa: PLR2004
+
+    def test__read_fields_id3v23(self, tmp_path: Path) -> None:
+        """Test reading the fields of an MP3 file with an ID3v2.3 tag."""
+        src = test_data_path / "01.mp3"
+        dst = tmp_path / "01.mp3"
+        dst.write_bytes(src.read_bytes())
+        audiofile.AudioFile.open(dst)._mut_file.save(v2_version=3)
+        expected = audiofile.AudioFile.read_fields(src, audiofile.FIELDS)
+        assert audiofile.AudioFile.read_fields(dst, audiofile.FIELDS) == expected
+
+    def test__read_fields_unknown(self) -> None:
+        """Test reading unknown fields."""
+        with pytest.raises(ValueError, match="Unknown field"):
+            audiofile.AudioFile.read_fields(test_data_path / "01.flac", {"album", "your_mom"})
+
+    def test__write_fields(self, tmp_path: Path) -> None:
+        """Test writing some fields, leaving the other tags as they are."""
+        for src in sorted(test_data_path.glob("01.*")):
+            dst = tmp_path / src.name
+            dst.write_bytes(src.read_bytes())
+            expected = audiofile.AudioFile.read_fields(src, audiofile.FIELDS)
+            audiofile.AudioFile.write_fields(dst, {"genres": ["Jazz", "Blues"]})
+            got = audiofile.AudioFile.read_fields(dst, audiofile.FIELDS)
+            assert got == {**expected, "genres": ["Jazz", "Blues"]}
+            audiofile.AudioFile.write_fields(dst, {"genres": []})
+            assert audiofile.AudioFile.read_fields(dst, audiofile.FIELDS) == expected
+        with pytest.raises(ValueError, match="Unknown field"):
+            audiofile.AudioFile.write_fields(test_data_path / "01.flac", {"album": "Album"})
+
+    def test__write_tags_in_place(self, tmp_path: Path) -> None:
+        """Test that tags are updated in place, within the padding, when they fit."""
+        for src in sorted(test_data_path.glob("01.*")):
+            dst = tmp_path / src.name
+            dst.write_bytes(src.read_bytes())
+            audiofile.AudioFile.open(dst, padding=1024).write_tags()  # Reserve the padding.
+            size = dst.stat().st_size
+            f = audiofile.AudioFile.open(dst, padding=1024)
+            assert f.one_track.release is not None
+            f.one_track.release.album = "A Much, Much Longer Album Title (Deluxe Edition)"
+            f.write_tags()
+            assert dst.stat().st_size == size, f"{src.name} was rewritten"
+            read_back = audiofile.AudioFile.open(dst).one_track.release
+            assert read_back is not None
+            assert read_back.album == "A Much, Much Longer Album Title (Deluxe Edition)"
+
+    def test__write_tags_mp3(self, tmp_path: Path) -> None:
+        """Test that writing MP3 tags replaces the old ones, without reading the file again."""
+        dst = tmp_path / "01.mp3"
+        dst.write_bytes((test_data_path / "01.mp3").read_bytes())
+        id3 = mutagen.id3.ID3(dst)  # type: ignore[no-untyped-call]
+        id3.save(dst, v1=2)  # Add an ID3v1 tag.
+        f = audiofile.AudioFile.open(dst)
+        f.write_tags()
+        assert dst.read_bytes()[-128:-125] != b"TAG"  # The ID3v1 tag is gone.
+        assert dict(f._mut_file.tags) == dict(mutagen.id3.ID3(dst))  # type: ignore[no-untyped-call]
+
+    def test__write_tags_release_tags(self, tmp_path: Path) -> None:
+        """Test that the release-level tags are prepared once, and shared by the tracks."""
+        release = Release(
+            album="Album",
+            front_cover=FrontCover(data=b"cover", desc="front", mime="image/jpg"),
+            media={
+                1: Medium(
+                    track_count=2,
+                    tracks={n: Track(title=f"Title {n}", track_number=n) for n in (1, 2)},
+                )
+            },
+            medium_count=1,
+        )
+        release_tags = audiofile.ReleaseTags(release, 1)
+        prepared: list[Any] = []
+        for src in sorted(test_data_path.glob("00.*")):
+            for track_number in (1, 2):
+                dst = tmp_path / f"{track_number}{src.suffix}"
+                dst.write_bytes(src.read_bytes())
+                f = audiofile.AudioFile.open(dst)
+                f.one_track = OneTrack(release=release, medium_number=1, track_number=track_number)
+                f.write_tags(release_tags)
+                prepared.append(release_tags.get(src.suffix[1:], lambda _r, _m: None))
+                one_track = audiofile.AudioFile.open(dst).read_tags()
+                assert one_track.release is not None
+                assert one_track.release.album == "Album"
+                assert one_track.release.front_cover is not None
+                assert one_track.release.front_cover.data == b"cover"
+                assert one_track.track is not None
+                assert one_track.track.title == f"Title {track_number}"
+        assert all(p is not None for p in prepared)
+        assert prepared[0::2] == prepared[1::2]  # The same, for both tracks.
+
 
 def _audio_file_copy(src_filepath: pathlib.Path) -> contextlib.closing[Any]:
     # Create a copy of the given source file and return the copy as a context-manager.
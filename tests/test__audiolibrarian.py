@@ -21,8 +21,9 @@ from pathlib import Path
 from typing import Final
 
 import pytest
+import pytest_mock
 
-from audiolibrarian import base, config
+from audiolibrarian import base, config, records, sh
 
 test_data_path = (Path(__file__).parent / "test_data").resolve()
 
@@ -121,3 +122,44 @@ class TestAudioLibrarian:
             searcher.mb_artist_id,
             searcher.mb_release_id,
         ) == expected
+
+    def test__job_dir(self, tmp_path: Path) -> None:
+        """Test that each job gets its own work directory, and that it's removed."""
+        settings = config.Settings(work_dir=tmp_path)
+        al_one = base.Base(args=Namespace(), settings=settings)
+        al_two = base.Base(args=Namespace(), settings=settings)
+        for al in al_one, al_two:
+            al._release = records.Release(musicbrainz_album_id="rid")
+            al._make_job_dir()
+        assert al_one._job_dir != al_two._job_dir
+        assert al_one._job_dir.parent == tmp_path / "jobs"
+        assert al_one._job_dir.name.startswith("rid__disc1__")
+        assert al_one._wav_dir.is_dir()
+        (al_one._flac_dir / "01__track.flac").touch()
+        assert al_one._flac_filenames == [al_one._flac_dir / "01__track.flac"]
+        assert al_two._flac_filenames == []
+
+        job_dir = al_one._job_dir
+        al_one._remove_job_dir()
+        assert not job_dir.exists()
+        assert al_one._flac_filenames == []
+        assert al_two._wav_dir.is_dir()
+
+    def test__schedule_tee(
+        self, al_base: base.Base, mocker: pytest_mock.MockFixture, tmp_path: Path
+    ) -> None:
+        """Test that the files made by an encode task are tagged by the same task."""
+        calls = mocker.Mock()
+        mocker.patch("audiolibrarian.sh.tee", calls.tee)
+        mocker.patch.object(al_base, "_tag_file", calls.tag_file)
+        commands: dict[Path, tuple[str, ...]] = {
+            tmp_path / "01__a.flac": ("flac",),
+            tmp_path / "01__a.mp3": ("lame",),
+        }
+        with sh.Scheduler(None) as scheduler:
+            al_base._schedule_tee(scheduler, "01__a.encode", ("decode",), commands)
+        assert calls.mock_calls == [
+            mocker.call.tee(("decode",), [("flac",), ("lame",)]),
+            mocker.call.tag_file(tmp_path / "01__a.flac"),
+            mocker.call.tag_file(tmp_path / "01__a.mp3"),
+        ]
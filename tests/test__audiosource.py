@@ -83,3 +83,15 @@ class TestAudioSource:
         for i in range(self._TEST_TRACK_NUMBER - 1):
             assert source_list[i] is None
         assert source_list[self._TEST_TRACK_NUMBER - 1] is not None
+
+    def test__get_decode_commands(self, audio_source: FilesAudioSource) -> None:
+        """Test decode commands."""
+        decode_commands = audio_source.get_decode_commands()
+        assert decode_commands is not None
+        assert list(decode_commands) == [self._TEST_TRACK_NUMBER]
+        assert decode_commands[self._TEST_TRACK_NUMBER][:4] == (
+            "flac",
+            "--silent",
+            "--decode",
+            "--stdout",
+        )
@@ -0,0 +1,62 @@
+"""Test the MusicBrainz cache."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+import pathlib
+
+import pytest
+
+from audiolibrarian import cache
+
+
+class TestCache:
+    """Test the persistent cache."""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        """Return the path of a cache database."""
+        return tmp_path / "cache.sqlite"
+
+    def test__get_put(self, cache_path: pathlib.Path) -> None:
+        """Test storing and retrieving JSON and bytes values, across instances."""
+        cache_ = cache.Cache(cache_path, ttls={}, max_size=1024)
+        assert cache_.get("release", "a") is None
+        cache_.put("release", "a", {"title": "The Album", "tracks": [1, 2]})
+        cache_.put("cover", "a", b"\x00image")
+        cache_ = cache.Cache(cache_path, ttls={}, max_size=1024)
+        assert cache_.get("release", "a") == {"title": "The Album", "tracks": [1, 2]}
+        assert cache_.get("cover", "a") == b"\x00image"
+        assert cache_.get("artist", "a") is None
+
+    def test__expiry(self, cache_path: pathlib.Path) -> None:
+        """Test that entries expire after their kind's time-to-live, unless stale is allowed."""
+        cache_ = cache.Cache(cache_path, ttls={"release": 0, "artist": 60}, max_size=1024)
+        cache_.put("release", "a", "release")
+        cache_.put("artist", "a", "artist")
+        assert cache_.get("release", "a") is None
+        assert cache_.get("release", "a", stale=True) == "release"
+        assert cache_.get("artist", "a") == "artist"
+
+    def test__eviction(self, cache_path: pathlib.Path) -> None:
+        """Test that the least recently used entries are evicted to keep the cache small."""
+        cache_ = cache.Cache(cache_path, ttls={}, max_size=25)
+        cache_.put("release", "a", b"a" * 10)
+        cache_.put("release", "b", b"b" * 10)
+        assert cache_.get("release", "a") is not None  # Now "b" is the least recently used.
+        cache_.put("release", "c", b"c" * 10)
+        assert cache_.get("release", "a") == b"a" * 10
+        assert cache_.get("release", "b") is None
+        assert cache_.get("release", "c") == b"c" * 10
@@ -16,13 +16,17 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import dataclasses
+import shutil
 from argparse import Namespace
 from pathlib import Path
 
 import pytest
+import pytest_mock
+import yaml
 
 # noinspection PyProtectedMember
-from audiolibrarian import __version__, commands, config
+from audiolibrarian import __version__, audiofile, audiosource, commands, config, library, text
 
 test_data_path = (Path(__file__).parent / "test_data").resolve()
 
@@ -35,12 +39,171 @@ class TestCommands:
         """Return a Settings instance."""
         return config.Settings()
 
+    def test__index_rename(
+        self, mocker: pytest_mock.MockFixture, settings: config.Settings, tmp_path: Path
+    ) -> None:
+        """Test that rename uses the library index, and keeps it up to date."""
+        settings = settings.model_copy(update={"work_dir": tmp_path / "work"})
+        library_dir = tmp_path / "library"
+        (library_dir / "artist" / "album").mkdir(parents=True)
+        shutil.copy(test_data_path / "01.flac", library_dir / "artist" / "album" / "01.flac")
+        commands.Index(args=Namespace(directories=[library_dir], quick=False), settings=settings)
+        (indexed_file,) = library.LibraryIndex(settings.work_dir).files([library_dir])
+        assert indexed_file.rename_path is not None
+
+        commands.Rename(
+            args=Namespace(dry_run=False, directories=[library_dir]), settings=settings
+        )
+        new_path = library_dir / indexed_file.rename_path
+        assert new_path.is_file()
+        assert not (library_dir / "artist").exists()
+        (indexed_file,) = library.LibraryIndex(settings.work_dir).files([library_dir])
+        assert indexed_file.path == new_path
+
+        # Files that are already correctly named aren't even opened.
+        open_ = mocker.spy(audiofile.AudioFile, "open")
+        commands.Rename(
+            args=Namespace(dry_run=False, directories=[library_dir]), settings=settings
+        )
+        open_.assert_not_called()
+
+    def test__rename_reconverted(self, settings: config.Settings, tmp_path: Path) -> None:
+        """Test that the manifest and reconvert state move with the album they belong to."""
+        settings = settings.model_copy(update={"work_dir": tmp_path / "work"})
+        library_dir = tmp_path / "library"
+        old_dir = library_dir / "artist" / "album"
+        old_dir.mkdir(parents=True)
+        shutil.copy(test_data_path / "01.flac", old_dir / "01.flac")
+        (old_dir / "Manifest.yaml").write_text("album: Album\n")
+        (old_dir / "Reconvert.yaml").write_text("outputs: {}\n")
+
+        commands.Rename(
+            args=Namespace(dry_run=False, directories=[library_dir]), settings=settings
+        )
+        (new_dir,) = {p.parent for p in library_dir.rglob("*.flac")}
+        assert (new_dir / "Manifest.yaml").read_text() == "album: Album\n"
+        assert (new_dir / "Reconvert.yaml").read_text() == "outputs: {}\n"
+        assert not (library_dir / "artist").exists()
+
+    def test__retag(
+        self, mocker: pytest_mock.MockFixture, settings: config.Settings, tmp_path: Path
+    ) -> None:
+        """Test that retag writes the MusicBrainz release to the existing files."""
+        for filename in ("01.flac", "01.m4a", "01.mp3"):
+            shutil.copy(test_data_path / filename, tmp_path)
+        release = audiofile.AudioFile.open(tmp_path / "01.flac").one_track.release
+        mock_release = mocker.patch("audiolibrarian.musicbrainz.MusicBrainzRelease")
+        mock_release.return_value.get_release.return_value = dataclasses.replace(
+            release, album="New Album"
+        )
+        commands.Retag(args=Namespace(directories=[tmp_path]), settings=settings)
+        mock_release.assert_called_once_with(
+            release_id=release.musicbrainz_album_id,
+            settings=settings.musicbrainz,
+            session=mocker.ANY,
+        )
+        for filename in ("01.flac", "01.m4a", "01.mp3"):
+            one_track = audiofile.AudioFile.open(tmp_path / filename).one_track
+            assert one_track.release.album == "New Album"
+
     def test__version(self, capsys: pytest.CaptureFixture[str], settings: config.Settings) -> None:
         """Test version command."""
         commands.Version(args=Namespace(), settings=settings)
         output: str = capsys.readouterr().out.strip()
         assert output == f"audiolibrarian {__version__}"
 
+    def test__reconvert_is_up_to_date(self, settings: config.Settings, tmp_path: Path) -> None:
+        """Test the incremental reconvert up-to-date check."""
+        reconvert = commands.Reconvert(
+            args=Namespace(albums=1, incremental=True, directories=[]), settings=settings
+        )
+        manifest_path = tmp_path / "Manifest.yaml"
+        shutil.copy(test_data_path / "Manifest.yaml", manifest_path)
+        shutil.copy(test_data_path / "01.flac", tmp_path / "01__track.flac")
+        output_path = tmp_path / "output.flac"
+        output_path.write_bytes(b"output")
+        reconvert._audio_source = audiosource.FilesAudioSource([tmp_path])
+        assert not reconvert._is_up_to_date(manifest_path)
+
+        state = reconvert._get_state(manifest_path, [output_path])
+        (tmp_path / "Reconvert.yaml").write_text(yaml.safe_dump(state))
+        assert reconvert._is_up_to_date(manifest_path)
+
+        reconvert._settings = settings.model_copy(
+            update={"tags": config.TagsSettings(padding=settings.tags.padding + 1)}
+        )
+        assert not reconvert._is_up_to_date(manifest_path)
+        reconvert._settings = settings
+
+        output_path.write_bytes(b"changed")
+        assert not reconvert._is_up_to_date(manifest_path)
+        output_path.unlink()
+        assert not reconvert._is_up_to_date(manifest_path)
+
+    def test__reconvert_albums(
+        self, mocker: pytest_mock.MockFixture, settings: config.Settings, tmp_path: Path
+    ) -> None:
+        """Test that the albums re-converted at once share one MusicBrainz session."""
+        reconvert = commands.Reconvert(
+            args=Namespace(albums=2, incremental=False, directories=[]), settings=settings
+        )
+        sessions = []
+
+        def prepare_album(self: commands.Reconvert, _: Path) -> bool:
+            sessions.append(self._mb_session)
+            return False
+
+        mocker.patch.object(commands.Reconvert, "_prepare_album", prepare_album)
+        reconvert._reconvert_albums([tmp_path / "a", tmp_path / "b"], max_albums=2)
+        assert sessions == [reconvert._mb_session] * 2
+
+    def test__watch(
+        self, mocker: pytest_mock.MockFixture, settings: config.Settings, tmp_path: Path
+    ) -> None:
+        """Test that settled albums are imported, and moved out of the drop folder."""
+        for album in ("bad", "good"):
+            (tmp_path / album).mkdir()
+            shutil.copy(test_data_path / "01.flac", tmp_path / album / "01.flac")
+        (tmp_path / ".done" / "good").mkdir(parents=True)  # A name collision.
+
+        def get_tag_info(self: commands.Watch) -> None:
+            if self._audio_source.get_source_filenames()[0].parent.name == "bad":
+                text.input_("Album: ")
+
+        mocker.patch.object(commands.Watch, "_get_tag_info", get_tag_info)
+        convert = mocker.patch.object(commands.Watch, "_convert")
+        mocker.patch.object(commands.Watch, "_write_manifest")
+        mocker.patch("audiolibrarian.watch.Watcher.wait", side_effect=KeyboardInterrupt)
+        commands.Watch(
+            args=Namespace(directory=str(tmp_path), settle=0, poll=1), settings=settings
+        )
+        convert.assert_called_once_with()
+        assert (tmp_path / ".failed" / "bad" / "01.flac").is_file()
+        (done,) = (tmp_path / ".done").glob("good.*")
+        assert (done / "01.flac").is_file()
+        assert not (tmp_path / "bad").exists()
+        assert not (tmp_path / "good").exists()
+
+    def test__watch_move_fails(
+        self, mocker: pytest_mock.MockFixture, settings: config.Settings, tmp_path: Path
+    ) -> None:
+        """Test that an album that can't be moved is left in place, and not imported again."""
+        (tmp_path / "album").mkdir()
+        shutil.copy(test_data_path / "01.flac", tmp_path / "album" / "01.flac")
+        mocker.patch.object(commands.Watch, "_get_tag_info")
+        convert = mocker.patch.object(commands.Watch, "_convert")
+        mocker.patch.object(commands.Watch, "_write_manifest")
+        mocker.patch("shutil.move", side_effect=PermissionError("Permission denied"))
+        wait = mocker.patch(
+            "audiolibrarian.watch.Watcher.wait", side_effect=[True, KeyboardInterrupt]
+        )
+        commands.Watch(
+            args=Namespace(directory=str(tmp_path), settle=0, poll=1), settings=settings
+        )
+        assert wait.call_count == 2  # noqa: PLR2004
+        convert.assert_called_once_with()
+        assert (tmp_path / "album" / "01.flac").is_file()
+
 
 class TestValidateArgs:
     """Test argument validation."""
@@ -71,3 +234,11 @@ class TestValidateArgs:
         assert not commands._validate_directories_arg(Namespace(directories=[not_exist]))
         assert not commands._validate_directories_arg(Namespace(directories=[exist, not_exist]))
         assert not commands._validate_directories_arg(Namespace(directories=[__file__, "/"]))
+
+    def test__validate_reconvert(self) -> None:
+        """Test reconvert argument validation."""
+        exist = str(test_data_path)
+        assert commands.Reconvert.validate_args(Namespace(albums=1, directories=[exist]))
+        assert commands.Reconvert.validate_args(Namespace(albums=8, directories=[exist]))
+
+        assert not commands.Reconvert.validate_args(Namespace(albums=0, directories=[exist]))
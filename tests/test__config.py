@@ -83,6 +83,7 @@ class TestSettings:
         assert settings.normalize.wavegain.gain == 5  # noqa: PLR2004
         assert settings.normalize.wavegain.preset == "radio"
         assert settings.normalize.ffmpeg.target_level == -13  # noqa: PLR2004
+        assert settings.tags.padding == 8192  # noqa: PLR2004
         assert settings.musicbrainz.rate_limit == 1.5  # noqa: PLR2004
         assert settings.musicbrainz.username == ""
         assert isinstance(settings.musicbrainz.password, pydantic.SecretStr)
@@ -0,0 +1,132 @@
+"""Test the genre manager."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+import argparse
+import json
+import os
+import pathlib
+import shutil
+
+import pytest
+import pytest_mock
+
+from audiolibrarian import audiofile, config, genremanager, library, musicbrainz
+
+test_data_path = (pathlib.Path(__file__).parent / "test_data").resolve()
+
+
+class TestGenreManager:
+    """Test the genre manager."""
+
+    @pytest.fixture
+    def library_dir(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        """Return a library directory with a few audio files (all by the same artist)."""
+        library_dir = tmp_path / "library"
+        library_dir.mkdir()
+        for name in ("01.flac", "01.m4a", "01.mp3"):
+            shutil.copy(test_data_path / name, library_dir / name)
+        return library_dir
+
+    @pytest.fixture
+    def settings(self, tmp_path: pathlib.Path) -> config.MusicBrainzSettings:
+        """Return MusicBrainz settings with a temporary work directory."""
+        return config.MusicBrainzSettings(work_dir=tmp_path / "work")
+
+    @pytest.fixture(autouse=True)
+    def artist(self, mocker: pytest_mock.MockFixture) -> None:
+        """Give every artist a user genre."""
+        artist = {"name": "Artist", "genres": [], "user-genres": ["jazz"]}
+        mocker.patch.object(
+            musicbrainz.MusicBrainzSession,
+            "get_artists_genres",
+            side_effect=lambda artist_ids, **_: dict.fromkeys(artist_ids, artist),
+        )
+
+    def test__update_tags(
+        self, library_dir: pathlib.Path, settings: config.MusicBrainzSettings
+    ) -> None:
+        """Test setting the genre tags."""
+        args = argparse.Namespace(directory=[library_dir], refresh=False, tag=True, update=False)
+        genremanager.GenreManager(args=args, settings=settings)
+        for path in sorted(library_dir.iterdir()):
+            assert audiofile.AudioFile.read_fields(path, {"genres"}) == {"genres": ["Jazz"]}
+        assert not (settings.work_dir / "genre-tag-journal.jsonl").exists()
+
+    def test__update_tags_indexed(
+        self,
+        library_dir: pathlib.Path,
+        settings: config.MusicBrainzSettings,
+        mocker: pytest_mock.MockFixture,
+    ) -> None:
+        """Test that, with the library index, files already tagged aren't read again."""
+        library_index = library.LibraryIndex(settings.work_dir)
+        library_index.update([library_dir])
+        args = argparse.Namespace(directory=[library_dir], refresh=False, tag=True, update=False)
+        genremanager.GenreManager(args=args, settings=settings, library_index=library_index)
+        genremanager.GenreManager(args=args, settings=settings, library_index=library_index)
+        read_fields = mocker.spy(audiofile.AudioFile, "read_fields")
+        genremanager.GenreManager(args=args, settings=settings, library_index=library_index)
+        read_fields.assert_not_called()
+        assert [f.genre for f in library_index.files([library_dir])] == ["Jazz"] * 3
+
+    def test__artist_ids(
+        self,
+        library_dir: pathlib.Path,
+        settings: config.MusicBrainzSettings,
+        mocker: pytest_mock.MockFixture,
+    ) -> None:
+        """Test that, without the library index, unchanged files aren't read again."""
+        args = argparse.Namespace(directory=[library_dir], refresh=False, tag=False, update=False)
+        genremanager.GenreManager(args=args, settings=settings)
+        read_fields = mocker.spy(audiofile.AudioFile, "read_fields")
+        genremanager.GenreManager(args=args, settings=settings)
+        read_fields.assert_not_called()
+        changed = library_dir / "01.flac"
+        os.utime(changed, ns=(changed.stat().st_atime_ns, changed.stat().st_mtime_ns + 1))
+        genremanager.GenreManager(args=args, settings=settings)
+        read_fields.assert_called_once_with(changed, mocker.ANY)
+
+    def test__unindexed(
+        self, library_dir: pathlib.Path, settings: config.MusicBrainzSettings
+    ) -> None:
+        """Test that directories that haven't been indexed aren't added to the library index."""
+        library_index = library.LibraryIndex(settings.work_dir)
+        args = argparse.Namespace(directory=[library_dir], refresh=False, tag=True, update=False)
+        genremanager.GenreManager(args=args, settings=settings, library_index=library_index)
+        assert not library_index.is_indexed([library_dir])
+        for path in sorted(library_dir.iterdir()):
+            assert audiofile.AudioFile.read_fields(path, {"genres"}) == {"genres": ["Jazz"]}
+
+    def test__update_tags_resume(
+        self, library_dir: pathlib.Path, settings: config.MusicBrainzSettings
+    ) -> None:
+        """Test that files recorded in the journal of an interrupted run are skipped."""
+        done, changed = library_dir / "01.flac", library_dir / "01.m4a"
+        journal_path = settings.work_dir / "genre-tag-journal.jsonl"
+        journal_path.parent.mkdir(parents=True)
+        with journal_path.open("w", encoding="utf-8") as journal:
+            for path in (done, changed):
+                journal.write(json.dumps([str(path), "Jazz", path.stat().st_mtime_ns]) + "\n")
+            journal.write('["partly written')
+        changed.touch()  # Changed since it was recorded, so it's tagged again.
+
+        args = argparse.Namespace(directory=[library_dir], refresh=False, tag=True, update=False)
+        genremanager.GenreManager(args=args, settings=settings)
+        assert audiofile.AudioFile.read_fields(done, {"genres"}) == {}
+        for path in (changed, library_dir / "01.mp3"):
+            assert audiofile.AudioFile.read_fields(path, {"genres"}) == {"genres": ["Jazz"]}
+        assert not journal_path.exists()
@@ -0,0 +1,124 @@
+"""Test the library index."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+import os
+import pathlib
+import shutil
+
+import pytest
+import pytest_mock
+
+from audiolibrarian import audiofile, library
+
+test_data_path = (pathlib.Path(__file__).parent / "test_data").resolve()
+
+
+class TestLibraryIndex:
+    """Test the library index."""
+
+    @pytest.fixture
+    def library_dir(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        """Return a library directory with a few audio files and a manifest."""
+        library_dir = tmp_path / "library"
+        for name in ("00.flac", "01.flac", "01.m4a", "01.mp3", "Manifest.yaml"):
+            (library_dir / "album").mkdir(parents=True, exist_ok=True)
+            shutil.copy(test_data_path / name, library_dir / "album" / name)
+        (library_dir / "album" / "README.md").write_text("Not audio.")
+        return library_dir
+
+    @pytest.fixture
+    def index(self, tmp_path: pathlib.Path) -> library.LibraryIndex:
+        """Return an empty library index."""
+        return library.LibraryIndex(tmp_path / "work")
+
+    def test__update(
+        self, index: library.LibraryIndex, library_dir: pathlib.Path, tmp_path: pathlib.Path
+    ) -> None:
+        """Test indexing audio files and manifests."""
+        album_dir = library_dir / "album"
+        assert not index.is_indexed([library_dir])
+        assert index.update([library_dir]).read == 5  # noqa: PLR2004
+        assert index.is_indexed([library_dir])
+        assert index.is_indexed([album_dir])
+        assert not index.is_indexed([library_dir.parent])
+
+        files = index.files([album_dir])
+        assert [f.path.name for f in files] == ["00.flac", "01.flac", "01.m4a", "01.mp3"]
+        assert [f.format for f in files] == ["flac", "flac", "m4a", "mp3"]
+        assert files[0].musicbrainz_release_id is None  # Blank tags.
+        assert files[0].rename_path is None
+        assert all(f.musicbrainz_release_id for f in files[1:])
+        assert all(f.artist_id for f in files[1:])
+        assert all(f.rename_path and f.rename_path.endswith(f.path.suffix) for f in files[1:])
+        assert index.manifests([library_dir]) == [album_dir / "Manifest.yaml"]
+        assert index.files([library_dir / "other"]) == []
+
+        # Entries for files that have gone are removed.
+        (album_dir / "01.mp3").unlink()
+        index.update([library_dir])
+        files = library.LibraryIndex(tmp_path / "work").files([album_dir])  # A new connection.
+        assert [f.path.name for f in files] == ["00.flac", "01.flac", "01.m4a"]
+
+    def test__update_incremental(
+        self,
+        index: library.LibraryIndex,
+        library_dir: pathlib.Path,
+        mocker: pytest_mock.MockFixture,
+    ) -> None:
+        """Test that only new and changed files are read, and gone files are removed."""
+        album_dir = library_dir / "album"
+        index.update([library_dir])
+        read_fields = mocker.spy(audiofile.AudioFile, "read_fields")
+        assert index.update([library_dir]) == library.UpdateStats(files=5)
+        assert index.update([library_dir], quick=True) == library.UpdateStats(files=5)
+        read_fields.assert_not_called()
+
+        # A file changed in place is only noticed without quick.
+        os.utime(album_dir / "01.flac", ns=(0, 0))
+        assert index.update([library_dir], quick=True).read == 0
+        assert index.update([library_dir]).read == 1
+        read_fields.assert_called_once_with(album_dir / "01.flac", mocker.ANY)
+
+        # New, replaced and deleted files are noticed either way.
+        shutil.copy(test_data_path / "03.flac", album_dir / "03.flac")
+        (album_dir / "01.mp3").unlink()
+        (library_dir / "new").mkdir()
+        shutil.copy(test_data_path / "Manifest.yaml", library_dir / "new" / "Manifest.yaml")
+        assert index.update([library_dir], quick=True) == library.UpdateStats(
+            files=6, read=2, removed=1
+        )
+        assert [f.path.name for f in index.files([library_dir])] == [
+            "00.flac",
+            "01.flac",
+            "01.m4a",
+            "03.flac",
+        ]
+        assert len(index.manifests([library_dir])) == 2  # noqa: PLR2004
+
+    def test__move(self, index: library.LibraryIndex, library_dir: pathlib.Path) -> None:
+        """Test recording moved files."""
+        index.update([library_dir])
+        old_path = library_dir / "album" / "01.flac"
+        new_path = library_dir / "album" / "02.flac"
+        old_path.rename(new_path)
+        index.move(old_path, new_path)
+        assert [f.path.name for f in index.files([library_dir])] == [
+            "00.flac",
+            "01.m4a",
+            "01.mp3",
+            "02.flac",
+        ]
@@ -47,12 +47,9 @@ class TestMisc:
 
     def test__check_deps_true(self, cli_: cli.CommandLineInterface) -> None:
         """Test dependency checker."""
-        # noinspection PyFinal
-        cli_._REQUIRED_EXE = {"ls", "ps"}  # type: ignore[misc]
-        assert cli_._check_deps()
+        assert cli_._check_deps({"ls", "ps"})
+        assert cli_._check_deps(set())
 
     def test__check_deps_false(self, cli_: cli.CommandLineInterface) -> None:
         """Test dependency checker."""
-        # noinspection PyFinal
-        cli_._REQUIRED_EXE = {"your_mom_goes_to_college"}  # type: ignore[misc]
-        assert not cli_._check_deps()
+        assert not cli_._check_deps({"ls", "your_mom_goes_to_college"})
@@ -16,15 +16,19 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import email.message
+import hashlib
 import logging
 import os
+import urllib.error
 from pathlib import Path
 
 import pytest
+import pytest_mock
 
-from audiolibrarian import config
+from audiolibrarian import cache, config, musicbrainz, text
 from audiolibrarian.audiofile import audiofile
-from audiolibrarian.musicbrainz import MusicBrainzRelease
+from audiolibrarian.musicbrainz import MusicBrainzRelease, MusicBrainzSession, ThrottledError
 from audiolibrarian.records import Source
 from tests.test__audiofile import _audio_file_copy
 
@@ -33,6 +37,194 @@ if log_level := os.getenv("LOG_LEVEL"):
     logging.basicConfig(level=log_level)
 
 
+class TestMusicBrainzSession:
+    """Test MusicBrainzSession."""
+
+    def test__cached(self, tmp_path: Path) -> None:
+        """Test that responses are fetched once, then served from the cache."""
+        settings = config.MusicBrainzSettings(work_dir=tmp_path, rate_limit=0.001)
+        session = MusicBrainzSession(settings=settings)
+        calls: list[str] = []
+
+        def fetch() -> dict[str, str]:
+            calls.append("fetch")
+            return {"id": "a"}
+
+        assert session.cached("artist", "a", fetch) == {"id": "a"}
+        assert MusicBrainzSession(settings=settings).cached("artist", "a", fetch) == {"id": "a"}
+        assert calls == ["fetch"]
+
+        offline = settings.model_copy(
+            update={"cache": config.MusicBrainzCacheSettings(offline=True)}
+        )
+        session = MusicBrainzSession(settings=offline)
+        assert session.cached("artist", "a", fetch) == {"id": "a"}
+        with pytest.raises(cache.CacheMissError):
+            session.cached("artist", "b", fetch)
+        assert calls == ["fetch"]
+
+    def test__get_artist_genres(self, mocker: pytest_mock.MockFixture, tmp_path: Path) -> None:
+        """Test that artist genres, even empty ones, are fetched once, unless refreshed."""
+        settings = config.MusicBrainzSettings(work_dir=tmp_path, rate_limit=0.001)
+        fetch = mocker.patch.object(
+            MusicBrainzSession,
+            "_fetch",
+            return_value={"id": "a", "name": "Artist", "genres": [], "user-genres": []},
+        )
+        expected = {"name": "Artist", "genres": [], "user-genres": []}
+
+        assert MusicBrainzSession(settings=settings).get_artist_genres("a") == expected
+        assert MusicBrainzSession(settings=settings).get_artist_genres("a") == expected
+        fetch.assert_called_once_with("artist/a", {"inc": "genres+user-genres"})
+        session = MusicBrainzSession(settings=settings)
+        assert session.get_artist_genres("a", refresh=True) == expected
+        assert fetch.call_count == 2  # noqa: PLR2004
+
+    def test__get_artist_genres_cache_disabled(
+        self, mocker: pytest_mock.MockFixture, tmp_path: Path
+    ) -> None:
+        """Test that artist genres are cached even when other responses aren't."""
+        cache_settings = config.MusicBrainzCacheSettings(enabled=False)
+        settings = config.MusicBrainzSettings(
+            cache=cache_settings, rate_limit=0.001, work_dir=tmp_path
+        )
+        fetch = mocker.patch.object(
+            MusicBrainzSession,
+            "_fetch",
+            return_value={"id": "a", "name": "Artist", "genres": [], "user-genres": []},
+        )
+        for _ in range(2):
+            session = MusicBrainzSession(settings=settings)
+            session.get_artist_genres("a")
+            session.get_artist_by_id("a")
+        assert fetch.call_args_list == [
+            mocker.call("artist/a", {"inc": "genres+user-genres"}),
+            mocker.call("artist/a", {}),
+            mocker.call("artist/a", {}),
+        ]
+
+    def test__get_artists_genres(self, mocker: pytest_mock.MockFixture, tmp_path: Path) -> None:
+        """Test that artist genres are found with one search, with lookups for artists missed."""
+        settings = config.MusicBrainzSettings(work_dir=tmp_path, rate_limit=0.001)
+        mocker.patch.object(MusicBrainzSession, "_get_genre_names", return_value={"jazz"})
+        search = {
+            "artists": [
+                {"id": "a", "name": "A", "tags": [{"name": "jazz", "count": 2}]},
+                {"id": "b", "name": "B", "tags": [{"name": "seen live", "count": 5}]},
+                {"id": "x", "name": "X"},  # Not one we asked for.
+            ]
+        }
+        lookup = {"name": "C", "genres": [], "user-genres": []}
+        fetch = mocker.patch.object(
+            MusicBrainzSession,
+            "_fetch",
+            side_effect=lambda path, _: search if path == "artist" else lookup,
+        )
+        expected = {
+            "a": {"name": "A", "genres": [{"name": "jazz", "count": 2}], "user-genres": []},
+            "b": {"name": "B", "genres": [], "user-genres": []},
+            "c": lookup,
+        }
+
+        artist_ids = ["a", "b", "c"]
+        assert MusicBrainzSession(settings=settings).get_artists_genres(artist_ids) == expected
+        assert fetch.call_args_list == [
+            mocker.call("artist", {"query": "arid:(a OR b OR c)", "limit": "3"}),
+            mocker.call("artist/c", {"inc": "genres+user-genres"}),
+        ]
+        assert MusicBrainzSession(settings=settings).get_artists_genres(artist_ids) == expected
+        assert fetch.call_count == 2  # noqa: PLR2004
+
+    def test__get_front_cover(self, mocker: pytest_mock.MockFixture, tmp_path: Path) -> None:
+        """Test that cover images are downloaded once, and kept in a content-addressed cache."""
+        settings = config.MusicBrainzSettings(work_dir=tmp_path)
+        get_image_front = mocker.patch(
+            "audiolibrarian.musicbrainz.mb.get_image_front", return_value=b"image"
+        )
+        sleep = mocker.patch.object(MusicBrainzSession, "sleep")
+
+        assert MusicBrainzSession(settings=settings).get_front_cover("r1") == b"image"
+        assert MusicBrainzSession(settings=settings).get_front_cover("r1") == b"image"
+        get_image_front.assert_called_once_with("r1", size=500)
+        sleep.assert_not_called()  # The Cover Art Archive isn't rate limited.
+        assert [p.name for p in (tmp_path / "covers").iterdir()] == [
+            hashlib.sha256(b"image").hexdigest()
+        ]
+
+        offline = settings.model_copy(
+            update={"cache": config.MusicBrainzCacheSettings(offline=True)}
+        )
+        session = MusicBrainzSession(settings=offline)
+        assert session.get_front_cover("r1") == b"image"
+        with pytest.raises(cache.CacheMissError):
+            session.get_front_cover("r1", size=250)
+
+    def test__retries(self, tmp_path: Path) -> None:
+        """Test that throttled requests are retried, up to a limit."""
+        cache_settings = config.MusicBrainzCacheSettings(enabled=False)
+        settings = config.MusicBrainzSettings(
+            cache=cache_settings, max_retries=2, rate_limit=0.001, work_dir=tmp_path
+        )
+        session = MusicBrainzSession(settings=settings)
+        calls: list[str] = []
+
+        def fetch(failures: int) -> str:
+            calls.append("fetch")
+            if len(calls) <= failures:
+                msg = "503"
+                raise ThrottledError(msg, retry_after=0.01)
+            return "ok"
+
+        assert session.cached("artist", "a", lambda: fetch(2)) == "ok"
+        assert len(calls) == 3  # noqa: PLR2004
+        calls.clear()
+        with pytest.raises(ThrottledError):
+            session.cached("artist", "a", lambda: fetch(3))
+        assert len(calls) == 3  # noqa: PLR2004
+
+    def test__retries_musicbrainzngs(
+        self, mocker: pytest_mock.MockFixture, tmp_path: Path
+    ) -> None:
+        """Test that throttled musicbrainzngs requests are retried by us, not by musicbrainzngs."""
+        headers = email.message.Message()
+        headers["Retry-After"] = "3"
+        throttled = urllib.error.HTTPError("https://musicbrainz.org", 503, "busy", headers, None)
+        response = mocker.Mock()
+        response.read.return_value = (
+            b'<metadata xmlns="http://musicbrainz.org/ns/mmd-2.0#">'
+            b'<release id="r1"><title>T</title></release></metadata>'
+        )
+        opener = mocker.patch("musicbrainzngs.compat.build_opener").return_value
+        opener.open.side_effect = [throttled, response]
+        mocker.patch.object(MusicBrainzSession, "sleep")
+        slow_down = mocker.patch("audiolibrarian.ratelimit.RateLimiter.slow_down")
+        mocker.patch("musicbrainzngs.musicbrainz.time.sleep", side_effect=AssertionError)
+
+        settings = config.MusicBrainzSettings(rate_limit=0.001, work_dir=tmp_path)
+        session = MusicBrainzSession(settings=settings)
+        release = session.cached("release", "r1", lambda: musicbrainz.mb.get_release_by_id("r1"))
+        assert release["release"]["title"] == "T"
+        assert opener.open.call_count == 2  # noqa: PLR2004
+        slow_down.assert_called_once_with(3.0)  # Retry-After is longer than the backoff.
+
+    @pytest.mark.parametrize(
+        ("headers", "expected"),
+        [
+            (None, None),
+            ({}, None),
+            ({"Retry-After": "5"}, 5),
+            ({"Retry-After": "-5"}, 0),
+            ({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}, 0),
+            ({"Retry-After": "soon"}, None),
+        ],
+    )
+    def test__get_retry_after(
+        self, headers: dict[str, str] | None, expected: float | None
+    ) -> None:
+        """Test parsing the Retry-After header."""
+        assert musicbrainz._get_retry_after(headers) == expected
+
+
 class TestMusicBrainzRelease:
     """Test MusicBrainz."""
 
@@ -44,6 +236,72 @@ class TestMusicBrainzRelease:
         """Return a Settings instance."""
         return config.Settings()
 
+    def test__get_genre(self, mocker: pytest_mock.MockFixture, tmp_path: Path) -> None:
+        """Test that genres come from the release lookup, and artists are looked up only once."""
+        mb_settings = config.MusicBrainzSettings(work_dir=tmp_path)
+        cached = MusicBrainzSession.cached
+        mocker.patch.object(
+            MusicBrainzSession,
+            "cached",
+            lambda self, kind, *args: (
+                {"release": {}} if kind == "release" else cached(self, kind, *args)
+            ),
+        )
+        mocker.patch.object(MusicBrainzSession, "sleep")
+        get_release = mocker.patch.object(
+            MusicBrainzSession,
+            "get_release_by_id",
+            return_value={
+                "artist-credit": [
+                    {"artist": {"id": "a1", "genres": [{"name": "jazz", "count": 1}]}}
+                ],
+                "release-group": {
+                    "genres": [{"name": "rock", "count": 1}, {"name": "pop", "count": 2}]
+                },
+            },
+        )
+        get_release_group = mocker.patch.object(MusicBrainzSession, "get_release_group_by_id")
+        get_artist = mocker.patch.object(
+            MusicBrainzSession, "_fetch", return_value={"genres": [{"name": "blues", "count": 1}]}
+        )
+
+        release = MusicBrainzRelease(release_id="r1", settings=mb_settings)
+        assert release._get_genre("rg1", "a1") == "pop"
+        get_release_group.assert_not_called()
+        get_artist.assert_not_called()
+
+        # Without genres in the release lookup, the artist is looked up, but only once.
+        get_release.return_value = {"release-group": {"genres": []}}
+        for release_id in ("r2", "r3"):
+            release = MusicBrainzRelease(release_id=release_id, settings=mb_settings)
+            assert release._get_genre("rg1", "a1") == "blues"
+        get_release_group.assert_not_called()
+        get_artist.assert_called_once()
+
+    def test__get_front_cover(self, mocker: pytest_mock.MockFixture, tmp_path: Path) -> None:
+        """Test that the front cover is fetched in the background, if the release has one."""
+        settings = config.MusicBrainzSettings(work_dir=tmp_path)
+        release = {"id": "r1", "cover-art-archive": {"front": "true"}}
+        cached = mocker.patch.object(
+            MusicBrainzSession, "cached", return_value={"release": release}
+        )
+        get_front_cover = mocker.patch.object(
+            MusicBrainzSession, "get_front_cover", return_value=b"image"
+        )
+
+        front_cover = MusicBrainzRelease(release_id="r1", settings=settings)._get_front_cover()
+        assert front_cover is not None
+        assert front_cover.data == b"image"
+        get_front_cover.assert_called_once_with("r1", size=500)
+
+        cached.return_value = {"release": {"id": "r2", "cover-art-archive": {"front": "false"}}}
+        assert MusicBrainzRelease(release_id="r2", settings=settings)._get_front_cover() is None
+        get_front_cover.assert_called_once()
+
+        get_front_cover.side_effect = cache.CacheMissError("offline")
+        cached.return_value = {"release": {**release, "id": "r3"}}
+        assert MusicBrainzRelease(release_id="r3", settings=settings)._get_front_cover() is None
+
     @pytest.mark.skipif(not os.getenv("EXTERNAL_TESTS"), reason="EXTERNAL_TESTS not defined")
     def test__musicbrainz_release(self, settings: config.Settings) -> None:
         """Verify that data we pull from MB service matches data from a picard-generated file."""
@@ -104,3 +362,15 @@ class TestMusicBrainzRelease:
             expected.source, got.source = None, None
 
             assert got == expected, f"Failed for {src}"
+
+
+class TestSearcher:
+    """Test Searcher."""
+
+    def test__prompt_release_id_non_interactive(self, mocker: pytest_mock.MockFixture) -> None:
+        """Test that, when we're not interactive, no web pages are opened."""
+        browser_open = mocker.patch("audiolibrarian.musicbrainz.webbrowser.open")
+        searcher = musicbrainz.Searcher(settings=config.MusicBrainzSettings())
+        with text.non_interactive(), pytest.raises(text.InputRequiredError):
+            searcher._prompt_release_id(["rg1", "rg2"])
+        browser_open.assert_not_called()
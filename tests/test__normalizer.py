@@ -202,3 +202,20 @@ def test_wavegain_normalizer_error_handling(
 
     # Verify the error was logged
     assert any("Error:" in record.message for record in caplog.records)
+
+
+def test_normalizer_per_track() -> None:
+    """Test that only the wavegain "album" preset needs all the files at once."""
+    assert normalizer_.NoOpNormalizer(config.EmptySettings()).per_track
+    assert normalizer_.FFmpegNormalizer(config.NormalizeFFmpegSettings()).per_track
+    radio = config.NormalizeWavegainSettings(preset="radio")
+    assert normalizer_.WaveGainNormalizer(radio).per_track
+    album = config.NormalizeWavegainSettings(preset="album")
+    assert not normalizer_.WaveGainNormalizer(album).per_track
+
+
+def test_normalizer_needs_files() -> None:
+    """Test that only the no-op normalizer can work without wav files."""
+    assert not normalizer_.NoOpNormalizer(config.EmptySettings()).needs_files
+    assert normalizer_.FFmpegNormalizer(config.NormalizeFFmpegSettings()).needs_files
+    assert normalizer_.WaveGainNormalizer(config.NormalizeWavegainSettings()).needs_files
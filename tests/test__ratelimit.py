@@ -0,0 +1,63 @@
+"""Test the rate limiter."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+import pathlib
+import threading
+import time
+
+from audiolibrarian import ratelimit
+
+
+class TestRateLimiter:
+    """Test the shared rate limiter."""
+
+    def test__wait(self, tmp_path: pathlib.Path) -> None:
+        """Test that requests are spaced out across limiters sharing a state file."""
+        path = tmp_path / "rate-limit"
+        limiters = [ratelimit.RateLimiter(path, interval=0.05) for _ in range(2)]
+        start = time.time()
+        threads = [threading.Thread(target=limiter.wait) for limiter in limiters * 3]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.time() - start >= 0.05 * 5
+        assert float(path.read_text().split()[0]) >= start + 0.05 * 6
+
+    def test__no_wait(self, tmp_path: pathlib.Path) -> None:
+        """Test that the first request doesn't wait, even with a corrupt state file."""
+        path = tmp_path / "rate-limit"
+        path.write_text("garbage")
+        start = time.time()
+        ratelimit.RateLimiter(path, interval=10).wait()
+        assert time.time() - start < 1
+
+    def test__slow_down(self, tmp_path: pathlib.Path) -> None:
+        """Test that slowing down holds off the next request, and widens the interval."""
+        path = tmp_path / "rate-limit"
+        interval, delay = 0.01, 0.1
+        limiter = ratelimit.RateLimiter(path, interval=interval)
+        start = time.time()
+        limiter.slow_down(delay)
+        limiter.wait()
+        assert time.time() - start >= delay
+        _, current_interval = (float(x) for x in path.read_text().split())
+        assert interval < current_interval <= interval * 2
+        for _ in range(20):
+            limiter.wait()
+        _, current_interval = (float(x) for x in path.read_text().split())
+        assert current_interval == interval
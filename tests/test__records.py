@@ -16,6 +16,8 @@
 #  You should have received a copy of the GNU General Public License along with audiolibrarian.
 #  If not, see <https://www.gnu.org/licenses/>.
 #
+import dataclasses
+
 import pytest
 
 from audiolibrarian.records import (
@@ -103,6 +105,25 @@ class TestOneTrack:
         assert one_track.track.asdict().get("artist") == "Track Artist"
         assert one_track.track.get_filename() == "03__Track_Title"
 
+    def test__record_asdict(self, one_track: OneTrack) -> None:
+        """Test converting records to dicts."""
+        release = one_track.release
+        assert release.asdict() == dataclasses.asdict(release)
+        assert release.asdict()["media"][7]["tracks"][3]["title"] == "Track Title"
+        assert release.asdict()["front_cover"]["data"] == b""
+        assert "data" not in release.asdict(binary=False)["front_cover"]
+        shallow = release.asdict(recurse=False)
+        assert shallow["front_cover"] is release.front_cover
+        assert shallow["media"] is release.media
+
+    def test__record_bool(self) -> None:
+        """Test the truthiness of records."""
+        assert not Release()
+        assert not People()
+        assert Release(album="Album")
+        assert Release(people=People())  # A nested record counts, even if it's empty.
+        assert FrontCover(data=b"")
+
     def test__get_artist_album_disc_path(self, one_track: OneTrack) -> None:
         """Test get-artist-album-disc-path."""
         assert str(one_track.get_artist_album_disc_path()) == "One,_Album_Artist/1992__Album/disc7"
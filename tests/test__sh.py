@@ -0,0 +1,127 @@
+"""Test command execution helpers."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+#
+import concurrent.futures
+import functools
+import pathlib
+import struct
+import subprocess
+import threading
+
+import pytest
+
+from audiolibrarian import sh
+
+
+class TestScheduler:
+    """Test the task scheduler."""
+
+    def test__order(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that tasks start only after the tasks they depend on have finished."""
+        finished: list[str] = []
+        lock = threading.Lock()
+
+        def task(name: str) -> None:
+            with lock:
+                finished.append(name)
+
+        with sh.Scheduler("Working") as scheduler:
+            scheduler.add("a", lambda: task("a"))
+            scheduler.add("b", lambda: task("b"), after=["a"])
+            scheduler.add("c", lambda: task("c"), after=["a"])
+            scheduler.add("d", lambda: task("d"), after=["b", "c"])
+            scheduler.add("e", ("true",))
+        assert sorted(finished) == ["a", "b", "c", "d"]
+        assert finished[0] == "a"
+        assert finished[-1] == "d"
+        assert capsys.readouterr().out.strip() == "Working....."
+
+    def test__bad_names(self) -> None:
+        """Test that duplicate and unknown task names are rejected."""
+        with sh.Scheduler("Working") as scheduler:
+            scheduler.add("a", ("true",))
+            with pytest.raises(ValueError, match="Duplicate"):
+                scheduler.add("a", ("true",))
+            with pytest.raises(ValueError, match="Unknown"):
+                scheduler.add("b", ("true",), after=["x"])
+
+    def test__failure(self) -> None:
+        """Test that a failed task raises, and its dependents never start."""
+        started: list[str] = []
+
+        def run() -> None:
+            with sh.Scheduler("Working") as scheduler:
+                scheduler.add("a", ("false",))
+                scheduler.add("b", lambda: started.append("b"), after=["a"])
+
+        with pytest.raises(subprocess.CalledProcessError):
+            run()
+        assert started == []
+
+    def test__shared_executor(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test that schedulers can share an executor, which is left running."""
+        finished: list[str] = []
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            for name in "ab":
+                with sh.Scheduler(None, executor=executor) as scheduler:
+                    scheduler.add(name, functools.partial(finished.append, name))
+            assert executor.submit(lambda: "still running").result() == "still running"
+        assert finished == ["a", "b"]
+        assert capsys.readouterr().out == ""
+
+
+class TestTee:
+    """Test the stream fan-out."""
+
+    def test__tee(self, tmp_path: pathlib.Path) -> None:
+        """Test that a command's output is written to every sink exactly once."""
+        out_file = tmp_path / "out.txt"
+        cat_file = tmp_path / "cat.txt"
+        sh.tee(("echo", "hello"), [out_file, ("sh", "-c", f"cat > {cat_file}")], chunk_size=2)
+        assert out_file.read_text() == "hello\n"
+        assert cat_file.read_text() == "hello\n"
+
+    def test__tee_file(self, tmp_path: pathlib.Path) -> None:
+        """Test that a file can be the source."""
+        in_file = tmp_path / "in.txt"
+        in_file.write_text("hello\n")
+        out_file = tmp_path / "out.txt"
+        sh.tee(in_file, [out_file])
+        assert out_file.read_text() == "hello\n"
+
+    def test__fix_wav_sizes(self, tmp_path: pathlib.Path) -> None:
+        """Test that placeholder chunk sizes, from a decoder writing to a pipe, are fixed."""
+        fmt = struct.pack("<HHIIHH", 1, 2, 44100, 176400, 4, 16)
+        header = b"RIFF" + struct.pack("<I", 0xFFFFFFFF) + b"WAVE"
+        header += b"fmt " + struct.pack("<I", len(fmt)) + fmt
+        wav = tmp_path / "stream.wav"
+        wav.write_bytes(header + b"data" + struct.pack("<I", 0) + bytes(400))
+        sh.fix_wav_sizes(wav)
+        data = wav.read_bytes()
+        assert struct.unpack("<I", data[4:8]) == (len(data) - 8,)
+        assert struct.unpack("<I", data[len(header) + 4 : len(header) + 8]) == (400,)
+
+        not_wav = tmp_path / "not.wav"
+        not_wav.write_bytes(bytes(64))
+        with pytest.raises(ValueError, match="Not a wav file"):
+            sh.fix_wav_sizes(not_wav)
+
+    def test__tee_failure(self, tmp_path: pathlib.Path) -> None:
+        """Test that a failed sink raises."""
+        with pytest.raises(subprocess.CalledProcessError):
+            sh.tee(("echo", "hello"), [tmp_path / "out.txt", ("false",)])
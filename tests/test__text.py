@@ -148,3 +148,12 @@ class TestText:
     def test__get_uuid(self, input_text: str, expected: str | None) -> None:
         """Test get-uuid."""
         assert text.get_uuid(input_text) == expected
+
+    def test__non_interactive(self) -> None:
+        """Test that prompting for input raises an error when we're not interactive."""
+        assert text.is_interactive()
+        with text.non_interactive():
+            assert not text.is_interactive()
+            with pytest.raises(text.InputRequiredError, match="Enter something:"):
+                text.input_("Enter something: ")
+        assert text.is_interactive()
@@ -0,0 +1,93 @@
+"""Test watching a drop folder."""
+
+#
+#  Copyright (c) 2000-2025 Stephen Jibson
+#
+#  This file is part of audiolibrarian.
+#
+#  Audiolibrarian is free software: you can redistribute it and/or modify it under the terms of the
+#  GNU General Public License as published by the Free Software Foundation, either version 3 of the
+#  License, or (at your option) any later version.
+#
+#  Audiolibrarian is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+#  without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See
+#  the GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License along with audiolibrarian.
+#  If not, see <https://www.gnu.org/licenses/>.
+#
+import pathlib
+import sys
+
+import pytest
+
+from audiolibrarian import watch
+
+
+class TestAlbumTracker:
+    """Test the album tracker."""
+
+    def test__check(self, tmp_path: pathlib.Path) -> None:
+        """Test that only settled albums with audio files are returned."""
+        (tmp_path / "album").mkdir()
+        (tmp_path / "album" / "01.flac").write_bytes(b"audio")
+        (tmp_path / "empty").mkdir()
+        (tmp_path / "empty" / "cover.jpg").write_bytes(b"image")
+        (tmp_path / ".done" / "old").mkdir(parents=True)
+        (tmp_path / ".done" / "old" / "01.flac").write_bytes(b"audio")
+        (tmp_path / "01.flac").write_bytes(b"audio")
+
+        tracker = watch.AlbumTracker(tmp_path, settle=3600)
+        assert tracker.check() == []
+        assert 0 < tracker.next_check() <= 3600  # noqa: PLR2004
+
+        tracker = watch.AlbumTracker(tmp_path, settle=0)
+        assert tracker.next_check() is None
+        assert tracker.check() == [tmp_path / "album"]
+        assert tracker.next_check() == 0
+
+    def test__check_changed(self, tmp_path: pathlib.Path) -> None:
+        """Test that an album that changes is no longer settled."""
+        (tmp_path / "album").mkdir()
+        (tmp_path / "album" / "01.flac").write_bytes(b"audio")
+        tracker = watch.AlbumTracker(tmp_path, settle=3600)
+        tracker._albums = {tmp_path / "album": (tracker._get_signature(tmp_path / "album"), -3600)}
+        assert tracker.check() == [tmp_path / "album"]
+        (tmp_path / "album" / "02.flac").write_bytes(b"audio")
+        assert tracker.check() == []
+
+    def test__skip(self, tmp_path: pathlib.Path) -> None:
+        """Test that a skipped album isn't returned again until it changes."""
+        (tmp_path / "album").mkdir()
+        (tmp_path / "album" / "01.flac").write_bytes(b"audio")
+        tracker = watch.AlbumTracker(tmp_path, settle=0)
+        assert tracker.check() == [tmp_path / "album"]
+        tracker.skip(tmp_path / "album")
+        assert tracker.check() == []
+        assert tracker.next_check() is None
+        (tmp_path / "album" / "02.flac").write_bytes(b"audio")
+        assert tracker.check() == [tmp_path / "album"]
+
+
+class TestWatcher:
+    """Test the watcher."""
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify requires Linux")
+    def test__wait_inotify(self, tmp_path: pathlib.Path) -> None:
+        """Test waiting for changes with inotify, including in new directories."""
+        with watch.Watcher(tmp_path) as watcher:
+            assert watcher.uses_inotify
+            assert not watcher.wait(timeout=0)
+            (tmp_path / "album").mkdir()
+            assert watcher.wait(timeout=5)
+            assert not watcher.wait(timeout=0)
+            (tmp_path / "album" / "01.flac").write_bytes(b"audio")
+            assert watcher.wait(timeout=5)
+        assert not watcher.uses_inotify
+
+    def test__wait_polling(self, tmp_path: pathlib.Path) -> None:
+        """Test waiting for changes by polling."""
+        with watch.Watcher(tmp_path, poll_interval=0.01, use_inotify=False) as watcher:
+            assert not watcher.uses_inotify
+            assert not watcher.wait()
+            assert not watcher.wait(timeout=0)